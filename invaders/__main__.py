@@ -17,12 +17,79 @@ In addition, you should have the following subfolders
 
 Moving any of these folders or files will prevent the game from working properly
 
+The game can be recorded or played back (see record.py) with the options
+
+    --record FILE     write the keys pressed in every update to FILE
+    --play FILE       play the game in FILE back in the game window
+    --play FILE --unthrottled
+                      play the game in FILE back as fast as possible, without
+                      a window, and print how long it took
+
+and can be played by the autopilot (see autopilot.py) with
+
+    --autopilot       play whole games with no one at the keyboard
+
+These options are taken out of the command line before consts.py reads the
+rest of it.
+
 Author: Walker M. White (wmw2)
 Date:   November 1, 2017 (Python 3 Version)
 """
+import sys
+import random
+
+
+def _option(name,value=True):
+    """
+    Returns: the value of the option name in sys.argv (or None if it is not
+    there), after removing the option from sys.argv
+    
+    Parameter name: the option
+    Precondition: name is a string
+    
+    Parameter value: whether the option is followed by a value
+    Precondition: value is a bool
+    """
+    if name not in sys.argv:
+        return None
+    pos=sys.argv.index(name)
+    result=sys.argv[pos+1] if value else True
+    del sys.argv[pos:pos+1+value]
+    return result
+
+
+_record=_option('--record')
+_play=_option('--play')
+_unthrottled=_option('--unthrottled',False)
+_autopilot=_option('--autopilot',False)
+
 from consts import *
 from app import *
+from record import *
+from autopilot import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    game=Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,
+                  timestep=GAME_TIMESTEP,max_substeps=GAME_MAX_SUBSTEPS)
+    if _play is not None:
+        player=InputPlayer(InputRecording.load(_play))
+        game.setPlayer(player)
+        if _unthrottled:
+            game.start()
+            elapsed=player.run(game)
+            print('%d frames in %.3f seconds (%.0f frames per second)' %
+                  (player.getPlayed(),elapsed,player.getPlayed()/max(elapsed,1e-9)))
+            sys.exit(0)
+    elif _autopilot:
+        game.setPilot(Autopilot())
+    recording=None
+    if _record is not None:
+        seed=GAME_SEED if GAME_SEED is not None else random.getrandbits(63)
+        recording=InputRecording(seed)
+        game.setRecorder(recording)
+    try:
+        game.run()
+    finally:
+        if recording is not None:
+            recording.save(_record)
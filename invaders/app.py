@@ -17,7 +17,9 @@ import cornell
 from consts import *#GAME_WIDTH,GAME_HEIGHT,WELCOME_TEXT_SIZE
 from game2d import *
 from wave import *
+from history import *
 import models
+import random
 
 
 
@@ -58,7 +60,7 @@ class Invaders(GameApp):
         _state: the current state of the game represented as a value from
                 consts.py
                 [one of STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE, STATE_PAUSED,
-                STATE_CONTINUE, STATE_COMPLETE]
+                STATE_CONTINUE, STATE_COMPLETE, STATE_HISTORY]
         _wave:  the subcontroller for a single wave, which manages the ships and
                 aliens
                 [Wave, or None if there is no wave currently active]
@@ -94,7 +96,27 @@ class Invaders(GameApp):
                 [Sound]
     _soundLose: sound that plays when player loses wave
                 [Sound]
+    _seeds: the random numbers the seed of each new wave is drawn from, so
+                that one seed (see setSeed) fixes every wave of the game
+                [random.Random]
+    _recorder: the recording the input of every update is added to
+                [InputRecording, or None if the game is not recorded]
+    _player: the recording the input of every update is taken from
+                [InputPlayer, or None if the game is played from the keyboard]
+    _pilot: the scripted player that presses the keys of every update
+                [Autopilot, or None if the game is played from the keyboard]
+    _history: the latest states of the wave, for the debug history mode
+                [History]
+    _shownWave: the wave whose images are attached to the view
+                [Wave, or None if no wave is shown]
+    _config: the settings every wave of the game starts from, taken from the
+                recording when one is played back [WaveConfig]
     """
+    # the recorder, player and pilot are set before the game starts, so they
+    # are not reset by start
+    _recorder=None
+    _player=None
+    _pilot=None
     
     # DO NOT MAKE A NEW INITIALIZER!
     
@@ -124,12 +146,25 @@ class Invaders(GameApp):
         self._soundLabel.linecolor=TEXT_COLOR
         self._soundStatus=True
         self._numWins=0
+        self._history=History()
+        self._config=WaveConfig()
+        if self._player is not None:
+            self.input=self._player.getInput()
+            self.setSeed(self._player.getSeed())
+            self._config=self._player.getRecording().getConfig()
+        elif self._recorder is not None:
+            self.setSeed(self._recorder.getSeed())
+        else:
+            self.setSeed(GAME_SEED)
+        if self._pilot is not None:
+            self.input=self._pilot.getInput()
         self._state=STATE_INACTIVE
         self._background=GImage(
             x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
             width=GAME_WIDTH,height=GAME_HEIGHT, source=BACKGROUND)
         self._lastkeys=0
         self._wave=None
+        self._shownWave=None
         if(self._state==STATE_INACTIVE):
             self._text=GLabel(text="Press 'S' to Play")
             self._text.font_size=WELCOME_TEXT_SIZE
@@ -186,23 +221,52 @@ class Invaders(GameApp):
         You are allowed to add more states if you wish. Should you do so, you
         should describe them here.
         
+        STATE_HISTORY: A debug state for finding out what happened in the
+        wave.  Pressing 'h' during STATE_ACTIVE stops the wave at its latest
+        state in _history.  The left and right arrows then step back and
+        forward through the states, and pressing 'h' again plays on from the
+        state shown (the later states are forgotten).
+        
+        If the game is played from a recording, the input and dt are taken
+        from the recording instead.  If it is played by the autopilot, the
+        autopilot presses the keys for the state of the game first.  If it is recorded, the input and dt are
+        added to the recording, followed by the checksum of the wave after the
+        update (0 if there is no wave).
+        
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self._wasSPressed()
-        self._wasMPressed()
-        self._wasUPressed()
-        if (self._state==STATE_NEWWAVE): #change from new wave to active
-            self._wave=Wave(ALIEN_SPEED*(3/4)**self._numWins,self._soundStatus)
-            self._state=STATE_ACTIVE
-        if(self._state==STATE_ACTIVE):
-            self._checkDirectionKeyPress(dt)
-        if(self._state==STATE_CONTINUE):
-            self._state=STATE_ACTIVE
-            self._text=None
-            self._wave.setShip(Ship())
-        self._determinieWinOrLose()
-        self._wasEnterPressed()        
+        if self._player is not None:
+            dt=self._player.next(dt)
+        if self._pilot is not None:
+            self._pilot.next(self._state,
+                             None if self._wave is None else self._wave.getSim())
+        if self._recorder is not None:
+            self._recorder.record(self.input,dt)
+        self._wasHPressed()
+        if(self._state==STATE_HISTORY):
+            self._scrubHistory()
+        else:
+            self._wasSPressed()
+            self._wasMPressed()
+            self._wasUPressed()
+            if (self._state==STATE_NEWWAVE): #change from new wave to active
+                self._wave=Wave(self._config.getSpeed()*(3/4)**self._numWins,
+                                self._soundStatus,config=self._config,
+                                seed=self._seeds.getrandbits(64))
+                self._history.clear()
+                self._state=STATE_ACTIVE
+            if(self._state==STATE_ACTIVE):
+                self._checkDirectionKeyPress(dt)
+                self._history.record(self._wave.getSim())
+            if(self._state==STATE_CONTINUE):
+                self._state=STATE_ACTIVE
+                self._text=None
+                self._wave.setShip(Ship())
+            self._determinieWinOrLose()
+            self._wasEnterPressed()
+        if self._recorder is not None:
+            self._recorder.check(0 if self._wave is None else self._wave.checksum())
                 
     def draw(self):
         """
@@ -215,16 +279,74 @@ class Invaders(GameApp):
         in Wave. In order to draw them, you either need to add getters for these
         attributes or you need to add a draw method to class Wave.  We suggest
         the latter.  See the example subcontroller.py from class.
+        
+        The background and the images of the wave stay attached to the view
+        (see GView.attach), so only the messages are drawn every frame.
         """
         # IMPLEMENT ME
-        self._background.draw(self.view)
-        if (self._text!=None):
-            self._text.draw(self.view)
+        self.view.attach(self._background)
+        shown=None
+        if(self._state==STATE_ACTIVE or self._state==STATE_PAUSED or
+           self._state==STATE_HISTORY):
+            shown=self._wave
+        if(self._shownWave is not None and self._shownWave is not shown):
+            self._shownWave.hide(self.view)
+        self._shownWave=shown
         if(self._state==STATE_ACTIVE or self._state==STATE_PAUSED):
-            self._wave.draw(self.view)
+            self._wave.show(self.view,self.alpha)
             self._soundLabel.draw(self.view)
+        elif(self._state==STATE_HISTORY):
+            self._wave.show(self.view)
+        if (self._text!=None):
+            self._text.draw(self.view)
+        
+    
+    
+    def setSeed(self,seed):
+        """
+        Sets the seed of the random numbers of the game.  Every wave started
+        after this gets its own seed drawn from it, so a game with the same
+        seed and the same key presses plays out the same.  start sets it to
+        GAME_SEED.
+        
+        Parameter: seed is the seed, or None for a different game every time
+        Precondition: seed is None or an int
+        """
+        assert seed is None or type(seed)==int, '%s is not a valid seed' % repr(seed)
+        self._seeds=random.Random(seed)
+    
+    def setRecorder(self,recorder):
+        """
+        Sets the recording that the input of every update is added to.  Call
+        this before the game starts, so that the game is seeded with the seed
+        of the recording.
+        
+        Parameter: recorder is the recording, or None to stop recording
+        Precondition: recorder is None or an InputRecording
+        """
+        self._recorder=recorder
+    
+    def setPlayer(self,player):
+        """
+        Sets the recording that the input of every update is taken from.  Call
+        this before the game starts, so that the game is seeded with the seed
+        of the recording and reads the input of the player.
         
+        Parameter: player is the player of the recording
+        Precondition: player is an InputPlayer
+        """
+        self._player=player
     
+    def setPilot(self,pilot):
+        """
+        Sets the scripted player that presses the keys of every update, so the
+        game plays itself.  Call this before the game starts, so that the game
+        reads the input of the pilot.
+        
+        Parameter: pilot is the scripted player
+        Precondition: pilot is an Autopilot
+        """
+        self._pilot=pilot
     
     # HELPER METHODS FOR THE STATES GO HERE
     def _wasSPressed(self):
@@ -270,6 +392,54 @@ class Invaders(GameApp):
         self._text.linecolor=TEXT_COLOR
     
     
+    def _wasHPressed(self):
+        """
+        determines if 'h' was pressed on its own this frame and if it was,
+        stops the wave at its latest saved state (during STATE_ACTIVE) or plays
+        on from the state shown (during STATE_HISTORY)
+        """
+        pressed=(self._lastkeys==0 and self.input.is_key_down('h'))
+        if pressed and self._state==STATE_ACTIVE and len(self._history)>0:
+            self._state=STATE_HISTORY
+            frame=self._history.seek(self._wave.getSim(),len(self._history)-1)
+            self._historyState(frame)
+        elif pressed and self._state==STATE_HISTORY:
+            self._history.resume()
+            self._state=STATE_ACTIVE
+            self._text=None
+        self._lastkeys=self.input.key_count
+        
+    def _scrubHistory(self):
+        """
+        steps back through _history while the left arrow is held, and forward
+        while the right arrow is held, one saved state per frame
+        """
+        index=self._history.getCursor()
+        if self.input.is_key_down('left') and index>0:
+            index-=1
+        elif self.input.is_key_down('right') and index<len(self._history)-1:
+            index+=1
+        else:
+            return
+        frame=self._history.seek(self._wave.getSim(),index)
+        self._historyState(frame)
+        
+    def _historyState(self,frame):
+        """
+        changes _text for the debug history mode
+        
+        Parameter: frame is the frame of the wave shown
+        Precondition: frame is an int >= 0
+        """
+        self._text=GLabel(
+                    text="frame "+str(frame)+" of "+str(self._history.getFrame())+
+                    "\n arrows to step, 'h' to play")
+        self._text.font_size=PAUSED_TEXT_SIZE
+        self._text.font_name= TEXT_FONT
+        self._text.x=GAME_WIDTH/2
+        self._text.y=GAME_HEIGHT/2
+        self._text.linecolor=TEXT_COLOR
+        
     def _pausedState(self):
         """
         changes _text for a paused game
@@ -0,0 +1,310 @@
+"""
+Autopilot module for Alien Invaders
+
+This module contains Autopilot, a scripted player that presses keys on a
+FakeInput (see record.py) the way a person at the keyboard would.  It plays
+whole games with nobody there: it starts each wave, plays it, continues after
+losing a ship and dismisses the message at the end of the wave.  Start the
+game with
+
+    python invaders --autopilot
+
+to watch it play (add --record FILE to keep the game), or run this module
+directly to play as fast as possible without a window, for example
+
+    python autopilot.py --minutes 480 --record soak.invr
+
+plays eight hours of game time and prints how many frames it ran per second.
+
+While a wave is being played, the autopilot aims at the bottom alien of the
+nearest column, leading it by the time its shot takes to get there, and fires
+only once the ship is lined up under that point and has no bolt on screen.
+Before every move it predicts where each alien bolt will cross the ship and
+moves out of the way of any that would hit it.
+
+Only flags are accepted.  consts.py reads its positional command line
+arguments when it is imported, so they are hidden from it here.
+"""
+import sys
+_argv=sys.argv
+sys.argv=sys.argv[:1]
+from consts import *
+from record import *
+from replay import *
+sys.argv=_argv
+import argparse
+import math
+import random
+import time
+
+
+class Autopilot(object):
+    """
+    A class to play Alien Invaders through a FakeInput.
+
+    Invaders calls next at the start of every update (see Invaders.setPilot),
+    before it reads the keys.  On the screens that wait for a key, the
+    autopilot lets go of every key and waits for _wait frames, and then
+    presses the key that moves the game on for one frame.
+
+    INSTANCE ATTRIBUTES:
+        _input: the input the game reads [FakeInput]
+        _wait:  the number of frames to wait on a screen before pressing its
+                key [int >= 0]
+        _idle:  the number of frames waited on the current screen [int >= 0]
+    """
+
+    # the key that moves the game on from each screen that waits for one
+    _KEYS={STATE_INACTIVE:'s',STATE_PAUSED:'s',STATE_COMPLETE:'enter'}
+
+    # GETTERS
+    def getInput(self):
+        """
+        Returns: the input the game should read
+        """
+        return self._input
+
+    def getWait(self):
+        """
+        Returns: the number of frames to wait on a screen before pressing its
+        key
+        """
+        return self._wait
+
+    # INITIALIZER
+    def __init__(self,wait=AUTOPILOT_WAIT):
+        """
+        Initializer: creates an autopilot with no keys held down
+
+        Parameter wait: the number of frames to wait on a screen before
+        pressing its key
+        Precondition: wait is an int >= 0
+        """
+        assert type(wait)==int and wait>=0, '%s is not a valid wait' % repr(wait)
+        self._input=FakeInput()
+        self._wait=wait
+        self._idle=0
+
+    # METHODS TO PLAY
+    def next(self,state,sim):
+        """
+        Sets the input to the keys to press on the next update
+
+        Parameter state: the state of the game before the update
+        Precondition: state is one of the STATE_ constants
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim, or None if there is no wave
+        """
+        if state==STATE_ACTIVE:
+            self._idle=0
+            key=self.choose(sim)
+            self._input.set(() if key=='' else (key,))
+            return
+        key=self._KEYS.get(state)
+        if key is None or self._input.key_count>0 or self._idle<self._wait:
+            self._idle+=1
+            self._input.set(())
+        else:
+            self._idle=0
+            self._input.set((key,))
+
+    def choose(self,sim):
+        """
+        Returns: the key to hold down on the next frame of sim, one of '',
+        'left', 'right' or 'up'
+
+        The key that gets the ship to its target (or fires, if the ship is
+        under it) is chosen if no alien bolt would hit the ship while holding
+        it.  Otherwise it is the first of staying, moving left and moving right
+        that no bolt would hit, or the one that is hit latest if every one is.
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim
+        """
+        ship=sim.getShip()
+        if ship is None:
+            return ''
+        movement=sim.getConfig().getShipMovement()
+        target=self._target(sim,ship)
+        want=''
+        if target is None:
+            want=''
+        elif target<ship.x-movement:
+            want='left'
+        elif target>ship.x+movement:
+            want='right'
+        elif sim.getBolts().getPlayer() is None:
+            # the test of WaveSim._isNotPlayerBolt, so the shot is not wasted
+            want='up'
+        best=None
+        latest=-1
+        for key in (want,'','left','right'):
+            hit=self._hitTime(sim,ship,key)
+            if hit is None:
+                return key
+            if hit>latest:
+                best=key
+                latest=hit
+        return best
+
+    # HELPER METHODS
+    def _target(self,sim,ship):
+        """
+        Returns: the x coordinate to fire from to hit the bottom alien of the
+        column nearest the ship, or None if every alien is dead
+
+        The alien is led by the steps it will march before a bolt fired now
+        reaches it, if the formation does not turn in that time.
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim
+
+        Parameter ship: the ship of sim
+        Precondition: ship is a SimShip
+        """
+        formation=sim.getAliens()
+        xs=formation.getX()
+        ys=formation.getY()
+        config=sim.getConfig()
+        step=ALIEN_H_WALK if sim.getAlienDirection()=='right' else -ALIEN_H_WALK
+        target=None
+        for c in formation.getAlive().any(axis=0).nonzero()[0]:
+            r=formation.bottomRow(c)
+            frames=max(ys[r,c]-ALIEN_HEIGHT/2-ship.top,0)/config.getBoltSpeed()
+            x=float(xs[r,c])+step*int(frames*GAME_TIMESTEP/config.getSpeed())
+            x=min(max(x,SHIP_WIDTH/2),GAME_WIDTH-SHIP_WIDTH/2)
+            if target is None or abs(x-ship.x)<abs(target-ship.x):
+                target=x
+        return target
+
+    def _hitTime(self,sim,ship,key):
+        """
+        Returns: the number of frames until the first alien bolt hits the ship
+        if key is held down, or None if no bolt would hit it soon
+
+        Each bolt keeps falling at its speed, and hits the ship if it comes
+        within reach of it at any time while it passes the ship.  A bolt is
+        only counted if it reaches the ship before the ship could cross the
+        bolt's width and its own, since further bolts can still be dodged
+        later.
+
+        Parameter sim: the wave being played
+        Precondition: sim is a WaveSim
+
+        Parameter ship: the ship of sim
+        Precondition: ship is a SimShip
+
+        Parameter key: the key held down
+        Precondition: key is one of '', 'left', 'right' or 'up'
+        """
+        movement=sim.getConfig().getShipMovement()
+        step=-movement if key=='left' else movement if key=='right' else 0
+        reach=(SHIP_WIDTH+BOLT_WIDTH)/2+movement
+        horizon=2*reach/movement+1
+        first=None
+        for bolt in sim.getBolts().getAliens():
+            if bolt.top<ship.bottom:
+                continue
+            fall=-bolt.getVel()
+            start=max(bolt.bottom-ship.top,0)/fall
+            if start>horizon or (first is not None and start>=first):
+                continue
+            near=self._shipX(ship,step,start)
+            far=self._shipX(ship,step,(bolt.top-ship.bottom)/fall)
+            if min(near,far)-reach<bolt.x<max(near,far)+reach:
+                first=start
+        return first
+
+    def _shipX(self,ship,step,frames):
+        """
+        Returns: the x coordinate of ship after moving step pixels a frame for
+        the given frames, stopping at the edges of the window
+
+        Parameter ship: the ship
+        Precondition: ship is a SimShip
+
+        Parameter step: the pixels moved each frame (negative to the left)
+        Precondition: step is a number (int or float)
+
+        Parameter frames: the frames to move for
+        Precondition: frames is a number (int or float) >= 0
+        """
+        x=ship.x+step*math.ceil(frames)
+        return min(max(x,SHIP_WIDTH/2),GAME_WIDTH-SHIP_WIDTH/2)
+
+
+def fly(minutes,seed=None,recording=None):
+    """
+    Returns: a tuple (frames,waves,seconds) of the frames and waves played and
+    the seconds it took
+
+    Plays the game without a window for the given minutes of game time, one
+    GAME_TIMESTEP per frame, as fast as possible.
+
+    Parameter minutes: the game time to play
+    Precondition: minutes is a number (int or float) >= 0
+
+    Parameter seed: the seed of the game (see Invaders.setSeed)
+    Precondition: seed is None or an int
+
+    Parameter recording: the recording to add every frame to, or None
+    Precondition: recording is None or an InputRecording
+    """
+    pilot=Autopilot()
+    input=pilot.getInput()
+    session=Session(seed,None if recording is None else recording.getConfig())
+    waves=0
+    start=time.perf_counter()
+    frames=int(minutes*60/GAME_TIMESTEP)
+    for frame in range(frames):
+        sim=session.getSim()
+        pilot.next(session.getState(),sim)
+        session.update(input,GAME_TIMESTEP)
+        if session.getSim() is not None and session.getSim() is not sim:
+            waves+=1
+        if recording is not None:
+            recording.record(input,GAME_TIMESTEP)
+            recording.check(session.checksum())
+    return (frames,waves,time.perf_counter()-start)
+
+
+def parser():
+    """
+    Returns: the command line parser of the autopilot
+    """
+    p=argparse.ArgumentParser(description='Play Alien Invaders with the '
+                              'autopilot, without a window.')
+    p.add_argument('--minutes',type=float,default=10.0,
+                   help='minutes of game time to play (default: 10)')
+    p.add_argument('--seed',type=int,default=None,
+                   help='seed of the game (default: a random seed)')
+    p.add_argument('--record',default=None,metavar='FILE',
+                   help='write the game to FILE (see record.py)')
+    return p
+
+
+def main(argv=None):
+    """
+    Runs the autopilot
+
+    Returns: 0
+
+    Parameter argv: the command line arguments, or None to use sys.argv
+    Precondition: argv is None or a list of strings
+    """
+    args=parser().parse_args(argv)
+    if args.minutes<0:
+        parser().error('minutes must be at least 0')
+    seed=args.seed if args.seed is not None else random.getrandbits(63)
+    recording=None if args.record is None else InputRecording(seed)
+    frames,waves,elapsed=fly(args.minutes,seed,recording)
+    if recording is not None:
+        recording.save(args.record)
+    print('%d frames, %d waves in %.3f seconds (%.0f frames per second)' %
+          (frames,waves,elapsed,frames/max(elapsed,1e-9)))
+    return 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
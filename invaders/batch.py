@@ -0,0 +1,504 @@
+"""
+Batched simulation module for Alien Invaders
+
+This module contains WaveBatch, which runs many independent waves in lockstep.
+Instead of one WaveSim object per wave, the state of every wave is kept in
+NumPy arrays with the wave as the first axis (waves x rows x cols for the
+aliens, waves x max_bolts for the alien bolts), and step advances all of the
+waves by one frame with vectorized operations.  The Python overhead of a frame
+is paid once for the whole batch instead of once per wave.
+
+The rules are the ones in WaveSim: the aliens march and drop the same way, the
+bolts move and are swept against the aliens and the ship the same way, and the
+waves complete under the same conditions.  Like InvadersEnv, a destroyed ship
+is replaced in the middle of the screen on the same frame.  Two things differ:
+the random numbers come from a NumPy generator, so a wave does not fire the
+same bolts as a WaveSim with the same seed, and an alien bolt is not fired if
+its wave already has max_bolts alien bolts on screen.
+"""
+from consts import *
+from config import *
+import numpy as np
+
+
+class WaveBatch(object):
+    """
+    A class to run a batch of waves of Alien Invaders one frame at a time.
+
+    Every wave in a batch has the same number of rows and columns.  The aliens
+    of a wave all move together, so their positions are not stored.  Instead,
+    each wave has an offset (how far the formation has marched and dropped),
+    and the position of alien (r,c) is its starting position plus the offset.
+
+    Waves that are complete are frozen until they are reset.  The actions are
+    the ACTION_* constants in consts.py, and the observations have the same
+    layout as the ones from InvadersEnv.
+
+    INSTANCE ATTRIBUTES:
+        _size:     the number of waves [int > 0]
+        _speed:    the number of seconds between alien steps of each wave
+                   [1d ndarray of float64 > 0]
+        _rng:      the random number generator for alien fire
+                   [numpy.random.Generator]
+        _startX:   the starting x coordinate of each column [1d ndarray]
+        _startY:   the starting y coordinate of each row [1d ndarray]
+        _alive:    whether each alien is alive [waves x rows x cols ndarray
+                   of bool]
+        _offsetX:  how far each formation has marched [1d ndarray of float64]
+        _offsetY:  how far each formation has dropped [1d ndarray of float64]
+        _direction: 1 if the aliens are marching right, -1 if left
+                   [1d ndarray of int8]
+        _time:     the time since the last alien step [1d ndarray of float64]
+        _alienStep: the alien steps since the last alien bolt
+                   [1d ndarray of int]
+        _alienFire: the alien steps between alien bolts [1d ndarray of float64]
+        _shipX:    the x coordinate of each ship [1d ndarray of float64]
+        _shipAlive: whether each ship is on screen [1d ndarray of bool]
+        _lives:    the lives left in each wave [1d ndarray of int]
+        _complete: one of NOT_COMPLETE, DLINE_CROSSED, ALIENS_KILLED or
+                   LIVES_LOST for each wave [1d ndarray of int8]
+        _playerActive: whether each wave has a player bolt [1d ndarray of bool]
+        _playerX:  the x coordinate of each player bolt [1d ndarray of float64]
+        _playerY:  the y coordinate of each player bolt [1d ndarray of float64]
+        _playerPrev: the y coordinate of each player bolt before its last
+                   move [1d ndarray of float64]
+        _boltActive: whether each alien bolt slot is in use [waves x max_bolts
+                   ndarray of bool]
+        _boltX:    the x coordinate of each alien bolt [waves x max_bolts
+                   ndarray of float64]
+        _boltY:    the y coordinate of each alien bolt [waves x max_bolts
+                   ndarray of float64]
+        _boltPrev: the y coordinate of each alien bolt before its last move
+                   [waves x max_bolts ndarray of float64]
+    """
+    # the horizontal movement and fire flag for each action, indexed by action
+    MOVES=np.array([0,-1,1,0,-1,1],dtype=np.int8)
+    FIRES=np.array([False,False,False,True,True,True])
+
+    # the y coordinate of the center of every ship
+    SHIP_Y=SHIP_BOTTOM+SHIP_HEIGHT/2
+
+    # GETTERS
+    def getSize(self):
+        """
+        Returns: the number of waves in the batch
+        """
+        return self._size
+
+    def getShape(self):
+        """
+        Returns: the grid size of the formations as a (rows,cols) tuple
+        """
+        return self._alive.shape[1:]
+
+    def getAlive(self):
+        """
+        Returns: the array of alien alive flags (do not modify it)
+        """
+        return self._alive
+
+    def getAlienX(self):
+        """
+        Returns: a new waves x rows x cols array of alien x coordinates
+        """
+        rows=self._alive.shape[1]
+        x=self._startX[np.newaxis,:]+self._offsetX[:,np.newaxis]
+        return np.repeat(x[:,np.newaxis,:],rows,axis=1)
+
+    def getAlienY(self):
+        """
+        Returns: a new waves x rows x cols array of alien y coordinates
+        """
+        cols=self._alive.shape[2]
+        y=self._startY[np.newaxis,:]-self._offsetY[:,np.newaxis]
+        return np.repeat(y[:,:,np.newaxis],cols,axis=2)
+
+    def getShipX(self):
+        """
+        Returns: the array of ship x coordinates (do not modify it)
+        """
+        return self._shipX
+
+    def getLives(self):
+        """
+        Returns: the array of lives left in each wave (do not modify it)
+        """
+        return self._lives
+
+    def getWaveComplete(self):
+        """
+        Returns: the array of completion codes of each wave (do not modify it)
+        """
+        return self._complete
+
+    def getPlayerBolts(self):
+        """
+        Returns: a tuple (active,x,y) of the arrays for the player bolts (do
+        not modify them).  x and y are only meaningful where active is True
+        """
+        return (self._playerActive,self._playerX,self._playerY)
+
+    def getAlienBolts(self):
+        """
+        Returns: a tuple (active,x,y) of the waves x max_bolts arrays for the
+        alien bolts (do not modify them).  x and y are only meaningful where
+        active is True
+        """
+        return (self._boltActive,self._boltX,self._boltY)
+
+    def observationSize(self):
+        """
+        Returns: the number of entries in the observation of one wave
+        """
+        rows,cols=self.getShape()
+        return 8+3*OBSERVED_BOLTS+rows*cols
+
+    # INITIALIZER
+    def __init__(self,size,speed=ALIEN_SPEED,rows=ALIEN_ROWS,cols=ALIENS_IN_ROW,
+                 seed=None,max_bolts=BATCH_MAX_BOLTS):
+        """
+        Initializer: creates size new waves of aliens (rows x cols)
+
+        Parameter: size is the number of waves
+        Precondition: size is an int > 0
+
+        Parameter: speed is the number of seconds between alien steps, for all
+        of the waves or for each one
+        Precondition: speed is a float > 0, or a sequence of size floats > 0
+
+        Parameter: rows is the number of rows of aliens
+        Precondition: rows is an int in 1..10
+
+        Parameter: cols is the number of aliens per row
+        Precondition: cols is an int in 1..15
+
+        Parameter: seed is the seed for alien fire, or None for a random one
+        Precondition: seed is None or an int
+
+        Parameter: max_bolts is the most alien bolts a wave can have on screen
+        Precondition: max_bolts is an int > 0
+        """
+        assert type(size)==int and size>0, '%s is not a valid size' % repr(size)
+        assert type(max_bolts)==int and max_bolts>0, \
+            '%s is not a valid bolt limit' % repr(max_bolts)
+        self._size=size
+        self._speed=np.empty(size)
+        self._speed[:]=speed
+        self._rng=np.random.default_rng(seed)
+        config=WaveConfig(rows,cols)
+        self._startX=np.array(config.getColumnX())
+        self._startY=np.array(config.getRowY())
+        self._alive=np.empty((size,rows,cols),dtype=bool)
+        self._offsetX=np.empty(size)
+        self._offsetY=np.empty(size)
+        self._direction=np.empty(size,dtype=np.int8)
+        self._time=np.empty(size)
+        self._alienStep=np.empty(size,dtype=int)
+        self._alienFire=np.empty(size)
+        self._shipX=np.empty(size)
+        self._shipAlive=np.empty(size,dtype=bool)
+        self._lives=np.empty(size,dtype=int)
+        self._complete=np.empty(size,dtype=np.int8)
+        self._playerActive=np.empty(size,dtype=bool)
+        self._playerX=np.zeros(size)
+        self._playerY=np.zeros(size)
+        self._playerPrev=np.zeros(size)
+        self._boltActive=np.empty((size,max_bolts),dtype=bool)
+        self._boltX=np.zeros((size,max_bolts))
+        self._boltY=np.zeros((size,max_bolts))
+        self._boltPrev=np.zeros((size,max_bolts))
+        self.reset()
+
+    # METHODS TO RUN THE WAVES
+    def reset(self,which=None):
+        """
+        Starts new waves in place of some (or all) of the waves in the batch.
+
+        Parameter: which is the waves to reset, or None for all of them
+        Precondition: which is None, an array of size bools, or a sequence of
+        wave indices
+        """
+        if which is None:
+            which=slice(None)
+        elif np.asarray(which).dtype==bool:
+            which=np.flatnonzero(which)
+        n=len(self._offsetX[which])
+        self._alive[which]=True
+        self._offsetX[which]=0
+        self._offsetY[which]=0
+        self._direction[which]=1
+        self._time[which]=0
+        self._alienStep[which]=0
+        self._alienFire[which]=self._rng.uniform(1,BOLT_RATE,n)
+        self._shipX[which]=GAME_WIDTH/2
+        self._shipAlive[which]=True
+        self._lives[which]=SHIP_LIVES
+        self._complete[which]=NOT_COMPLETE
+        self._playerActive[which]=False
+        self._boltActive[which]=False
+
+    def step(self,actions,dt=GAME_TIMESTEP):
+        """
+        Advances every wave that is not complete by one frame.
+
+        Returns: a tuple (rewards,dones,events) of arrays with one entry per
+        wave.  rewards are computed as in InvadersEnv, dones is True for the
+        waves that are complete (including the ones that were already
+        complete), and events has the EVENT_* flags of each wave's frame
+
+        Parameter: actions is the action for each wave
+        Precondition: actions is a sequence of size ACTION_* constants
+
+        Parameter: dt, the time in seconds of the frame
+        Precondition: dt is number (int or float)
+        """
+        actions=np.asarray(actions)
+        live=self._complete==NOT_COMPLETE
+        events=np.zeros(self._size,dtype=np.int8)
+        self._time[live]+=dt
+        fire=self.FIRES[actions] & live & ~self._playerActive
+        self._playerActive|=fire
+        self._playerX[fire]=self._shipX[fire]
+        self._playerY[fire]=self.SHIP_Y
+        self._playerPrev[fire]=self.SHIP_Y
+        events[fire]|=EVENT_SHIP_FIRED
+        self._moveShips(self.MOVES[actions]*live)
+        stepping=live & (self._time>self._speed)
+        if stepping.any():
+            self._moveAliens(stepping,events)
+            self._time[stepping]-=self._speed[stepping]
+        self._moveBolts(live)
+        self._checkBoltColAlien(live,events)
+        self._checkBoltColShip(live,events)
+        self._removeOffscreenBolts()
+        self._updateComplete(live)
+        rewards=np.zeros(self._size)
+        rewards[(events & EVENT_ALIEN_HIT)!=0]+=REWARD_ALIEN_HIT
+        rewards[(events & EVENT_SHIP_HIT)!=0]+=REWARD_SHIP_HIT
+        ended=live & (self._complete!=NOT_COMPLETE)
+        rewards[ended & (self._complete==ALIENS_KILLED)]+=REWARD_WIN
+        rewards[ended & (self._complete!=ALIENS_KILLED)]+=REWARD_LOSE
+        respawn=~self._shipAlive & (self._complete==NOT_COMPLETE)
+        self._shipX[respawn]=GAME_WIDTH/2
+        self._shipAlive[respawn]=True
+        return (rewards,self._complete!=NOT_COMPLETE,events)
+
+    def observe(self,out=None):
+        """
+        Returns: the observations of every wave, as a waves x observationSize
+        array of float32.  Row k has the same layout as an observation from
+        InvadersEnv, except that alien bolts at the same height are ordered
+        by slot.
+
+        Parameter: out is the array to write the observations into, or None
+        to make a new one
+        Precondition: out is None or a waves x observationSize array of float32
+        """
+        if out is None:
+            out=np.empty((self._size,self.observationSize()),dtype=np.float32)
+        out[:,0]=np.where(self._shipAlive,self._shipX/GAME_WIDTH,0)
+        out[:,1]=self._lives/SHIP_LIVES
+        out[:,2]=(self._startX[0]+self._offsetX)/GAME_WIDTH
+        out[:,3]=(self._startY[0]-self._offsetY)/GAME_HEIGHT
+        out[:,4]=self._direction
+        out[:,5]=self._playerActive
+        out[:,6]=np.where(self._playerActive,self._playerX/GAME_WIDTH,0)
+        out[:,7]=np.where(self._playerActive,self._playerY/GAME_HEIGHT,0)
+        bolts=out[:,8:8+3*OBSERVED_BOLTS].reshape(self._size,OBSERVED_BOLTS,3)
+        bolts[:]=0
+        n=min(OBSERVED_BOLTS,self._boltActive.shape[1])
+        order=np.argsort(np.where(self._boltActive,self._boltY,np.inf),
+                         axis=1,kind='stable')[:,:n]
+        active=np.take_along_axis(self._boltActive,order,1)
+        bolts[:,:n,0]=active
+        bolts[:,:n,1]=np.where(active,np.take_along_axis(self._boltX,order,1)
+                               /GAME_WIDTH,0)
+        bolts[:,:n,2]=np.where(active,np.take_along_axis(self._boltY,order,1)
+                               /GAME_HEIGHT,0)
+        out[:,8+3*OBSERVED_BOLTS:]=self._alive.reshape(self._size,-1)
+        return out
+
+    # HELPER METHODS
+    def _moveShips(self,moves):
+        """
+        moves each ship SHIP_MOVEMENT in the direction given, stopping at the
+        edges of the screen
+
+        Parameter moves: -1 to move a ship left, 1 to move it right, 0 to not
+        move it
+        Precondition: moves is an array of size ints
+        """
+        x=self._shipX+moves*SHIP_MOVEMENT
+        np.clip(x,SHIP_WIDTH/2,GAME_WIDTH-SHIP_WIDTH/2,out=x)
+        np.copyto(self._shipX,x,where=(moves!=0) & self._shipAlive)
+
+    def _moveAliens(self,stepping,events):
+        """
+        moves the aliens of the stepping waves ALIEN_H_WALK to the right or to
+        the left, or ALIEN_V_SEP down if they have reached the edge, and fires
+        an alien bolt in the waves where one is due
+
+        Parameter stepping: the waves whose aliens step
+        Precondition: stepping is an array of size bools
+
+        Parameter events: the events of each wave, which are updated
+        Precondition: events is an array of size ints
+        """
+        waves=np.flatnonzero(stepping)
+        cols=self._alive.shape[2]
+        columns=self._alive[waves].any(axis=1)
+        has=columns.any(axis=1)
+        waves=waves[has]
+        columns=columns[has]
+        if len(waves)==0:
+            return
+        leftCol=columns.argmax(axis=1)
+        rightCol=cols-1-columns[:,::-1].argmax(axis=1)
+        direction=self._direction[waves]
+        offset=self._offsetX[waves]
+        right=self._startX[rightCol]+offset+ALIEN_WIDTH/2
+        left=self._startX[leftCol]+offset-ALIEN_WIDTH/2
+        drop=np.where(direction>0,GAME_WIDTH-right<=ALIEN_H_SEP,
+                      left<=ALIEN_H_SEP)
+        self._offsetX[waves]=offset+np.where(drop,0,direction*ALIEN_H_WALK)
+        self._offsetY[waves]+=np.where(drop,ALIEN_V_SEP,0)
+        self._direction[waves]=np.where(drop,-direction,direction)
+        self._alienStep[waves]+=1
+        firing=self._alienStep[waves]>=self._alienFire[waves]
+        if firing.any():
+            self._fireAlienBolts(waves[firing],columns[firing],events)
+
+    def _fireAlienBolts(self,waves,columns,events):
+        """
+        fires a bolt in each of the waves from the bottom alien of a random
+        column, chosen from the columns that still have aliens
+
+        Parameter waves: the waves that fire
+        Precondition: waves is an array of wave indices
+
+        Parameter columns: whether each column of each wave has a living alien
+        Precondition: columns is a len(waves) x cols array of bools, with at
+        least one True in each row
+
+        Parameter events: the events of each wave, which are updated
+        Precondition: events is an array of size ints
+        """
+        rows=self._alive.shape[1]
+        n=len(waves)
+        self._alienStep[waves]=0
+        self._alienFire[waves]=self._rng.uniform(1,BOLT_RATE,n)
+        pick=(self._rng.random(n)*columns.sum(axis=1)).astype(int)
+        col=(columns.cumsum(axis=1)>pick[:,np.newaxis]).argmax(axis=1)
+        row=rows-1-self._alive[waves,::-1,col].argmax(axis=1)
+        free=~self._boltActive[waves]
+        room=free.any(axis=1)
+        waves=waves[room]
+        slot=free[room].argmax(axis=1)
+        x=self._startX[col[room]]+self._offsetX[waves]
+        y=(self._startY[row[room]]-self._offsetY[waves]-ALIEN_HEIGHT/2-
+           BOLT_HEIGHT/2)
+        self._boltActive[waves,slot]=True
+        self._boltX[waves,slot]=x
+        self._boltY[waves,slot]=y
+        self._boltPrev[waves,slot]=y
+        events[waves]|=EVENT_ALIEN_FIRED
+
+    def _moveBolts(self,live):
+        """
+        moves every bolt of the live waves, remembering where it was
+
+        Parameter live: the waves that are not complete
+        Precondition: live is an array of size bools
+        """
+        np.copyto(self._playerPrev,self._playerY)
+        np.copyto(self._boltPrev,self._boltY)
+        self._playerY[self._playerActive & live]+=BOLT_SPEED
+        self._boltY[self._boltActive & live[:,np.newaxis]]-=BOLT_SPEED
+
+    def _checkBoltColAlien(self,live,events):
+        """
+        kills the first alien that each player bolt passed over in its last
+        move, and removes the bolt.  as in WaveSim, the first alien is the one
+        the bolt reached first (top row first if it reached several at once)
+
+        Parameter live: the waves that are not complete
+        Precondition: live is an array of size bools
+
+        Parameter events: the events of each wave, which are updated
+        Precondition: events is an array of size ints
+        """
+        waves=np.flatnonzero(self._playerActive & live)
+        if len(waves)==0:
+            return
+        cols=self._alive.shape[2]
+        x=self._playerX[waves][:,np.newaxis,np.newaxis]
+        prev=self._playerPrev[waves][:,np.newaxis,np.newaxis]
+        y=self._playerY[waves][:,np.newaxis,np.newaxis]
+        ax=self._startX[np.newaxis,np.newaxis,:]+\
+            self._offsetX[waves][:,np.newaxis,np.newaxis]
+        ay=self._startY[np.newaxis,:,np.newaxis]-\
+            self._offsetY[waves][:,np.newaxis,np.newaxis]
+        hit=(np.abs(ax-x)<(ALIEN_WIDTH+BOLT_WIDTH)/2) & \
+            (prev-BOLT_HEIGHT/2<ay+ALIEN_HEIGHT/2) & \
+            (y+BOLT_HEIGHT/2>ay-ALIEN_HEIGHT/2) & self._alive[waves]
+        t=np.maximum((ay-ALIEN_HEIGHT/2-prev-BOLT_HEIGHT/2)/(y-prev),0)
+        t=np.where(hit,t,np.inf).reshape(len(waves),-1)
+        first=t.min(axis=1)
+        found=np.isfinite(first)
+        key=(t==first[:,np.newaxis]).argmax(axis=1)[found]
+        waves=waves[found]
+        self._alive[waves,key//cols,key%cols]=False
+        self._playerActive[waves]=False
+        events[waves]|=EVENT_ALIEN_HIT
+
+    def _checkBoltColShip(self,live,events):
+        """
+        destroys each ship that an alien bolt passed over in its last move,
+        and removes the bolt (the one in the lowest slot if there are several)
+
+        Parameter live: the waves that are not complete
+        Precondition: live is an array of size bools
+
+        Parameter events: the events of each wave, which are updated
+        Precondition: events is an array of size ints
+        """
+        ship=(live & self._shipAlive)[:,np.newaxis]
+        hit=(self._boltActive & ship &
+             (np.abs(self._boltX-self._shipX[:,np.newaxis])<
+              (SHIP_WIDTH+BOLT_WIDTH)/2) &
+             (self._boltY-BOLT_HEIGHT/2<self.SHIP_Y+SHIP_HEIGHT/2) &
+             (self._boltPrev+BOLT_HEIGHT/2>self.SHIP_Y-SHIP_HEIGHT/2))
+        waves=np.flatnonzero(hit.any(axis=1))
+        if len(waves)==0:
+            return
+        slot=hit[waves].argmax(axis=1)
+        self._boltActive[waves,slot]=False
+        self._shipAlive[waves]=False
+        self._lives[waves]-=1
+        events[waves]|=EVENT_SHIP_HIT
+
+    def _removeOffscreenBolts(self):
+        """
+        removes the bolts that have gone off the top or bottom of the screen
+        """
+        self._playerActive&=self._playerY-BOLT_HEIGHT/2<GAME_HEIGHT
+        self._boltActive&=self._boltY+BOLT_HEIGHT/2>0
+
+    def _updateComplete(self,live):
+        """
+        sets the completion code of each live wave based on whether all lives
+        are lost, the aliens are below the dline, or all aliens are killed
+
+        Parameter live: the waves that are not complete
+        Precondition: live is an array of size bools
+        """
+        rows=self._alive.shape[1]
+        occupied=self._alive.any(axis=2)
+        anyRow=occupied.any(axis=1)
+        bottom=rows-1-occupied[:,::-1].argmax(axis=1)
+        y=self._startY[bottom]-self._offsetY
+        crossed=anyRow & (y-ALIEN_HEIGHT/2<DEFENSE_LINE)
+        code=np.where(self._lives==0,LIVES_LOST,
+             np.where(crossed,DLINE_CROSSED,
+             np.where(anyRow,NOT_COMPLETE,ALIENS_KILLED)))
+        self._complete[live]=code[live]
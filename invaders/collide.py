@@ -0,0 +1,298 @@
+"""
+Collision support for 2D games.
+
+This module provides a broad-phase spatial hash for axis-aligned bounding boxes.
+Objects are registered in a uniform grid of cells, and a query only returns the
+objects registered in the cells that the query box overlaps.  The caller then
+does the exact (narrow-phase) test on those candidates only.
+
+It also provides a swept (continuous) box test.  Testing only where a fast object
+ends up each step lets it jump past thin targets; the swept test checks the whole
+path it moved along instead.  The swept functions take boxes as tuples
+(left,bottom,right,top).
+
+This module does not use Kivy, so it can be used in headless simulations.  It
+sits outside of the package game2d because importing that package imports Kivy;
+game2d imports its classes from here for the graphical game.
+"""
+import math
+
+
+def swept_aabb(box,dx,dy,target):
+    """
+    Returns: the fraction of a move at which a moving box first overlaps a target, 
+    or None if it does not overlap it during the move.
+    
+    The box moves in a straight line from its position by (dx,dy).  The result is 
+    a value t in 0..1 such that the box moved by (t*dx,t*dy) is the first position 
+    overlapping the target.  If the box already overlaps the target, the result is 0. 
+    Boxes that only touch along an edge do not overlap.
+    
+    :param box: The moving box at the start of the move
+    :type box:  4-element tuple (left,bottom,right,top) of numbers
+    
+    :param dx: The horizontal distance moved
+    :type dx:  ``int`` or ``float``
+    
+    :param dy: The vertical distance moved
+    :type dy:  ``int`` or ``float``
+    
+    :param target: The box that does not move
+    :type target:  4-element tuple (left,bottom,right,top) of numbers
+    """
+    enter = 0.0
+    leave = 1.0
+    for lo, hi, tlo, thi, d in ((box[0],box[2],target[0],target[2],dx),
+                                (box[1],box[3],target[1],target[3],dy)):
+        if d == 0:
+            if hi <= tlo or lo >= thi:
+                return None
+        else:
+            t0 = (tlo-hi)/d
+            t1 = (thi-lo)/d
+            if t0 > t1:
+                t0, t1 = t1, t0
+            enter = max(enter,t0)
+            leave = min(leave,t1)
+            if enter >= leave:
+                return None
+    return enter
+
+
+def swept_bounds(box,dx,dy):
+    """
+    Returns: the smallest box containing every position of a box during a move.
+    
+    This is the box to use for a broad-phase query (see :class:`GSpatialHash`) 
+    before calling :func:`swept_aabb`.
+    
+    :param box: The moving box at the start of the move
+    :type box:  4-element tuple (left,bottom,right,top) of numbers
+    
+    :param dx: The horizontal distance moved
+    :type dx:  ``int`` or ``float``
+    
+    :param dy: The vertical distance moved
+    :type dy:  ``int`` or ``float``
+    """
+    return (min(box[0],box[0]+dx), min(box[1],box[1]+dy),
+            max(box[2],box[2]+dx), max(box[3],box[3]+dy))
+
+
+class GSpatialHash(object):
+    """
+    A class representing a uniform grid for broad-phase collision detection.
+
+    Each object is registered with a key and a bounding box given by its left,
+    bottom, right and top edges.  The key can be any hashable value. The grid is
+    unbounded; cells are only created when something is registered in them.
+
+    Boxes should be about the size of a cell or smaller.  A box that is much
+    larger than a cell is stored in every cell it overlaps.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellwidth(self):
+        """
+        The width of a grid cell.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._cellwidth
+
+    @property
+    def cellheight(self):
+        """
+        The height of a grid cell.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._cellheight
+
+
+    # BUILT-IN METHODS
+    def __init__(self,cellwidth,cellheight):
+        """
+        Creates a new, empty spatial hash.
+
+        :param cellwidth: The width of a grid cell
+        :type cellwidth:  ``int`` or ``float`` > 0
+
+        :param cellheight: The height of a grid cell
+        :type cellheight:  ``int`` or ``float`` > 0
+        """
+        assert type(cellwidth) in [int,float] and cellwidth > 0, \
+            '%s is not a valid cell width' % repr(cellwidth)
+        assert type(cellheight) in [int,float] and cellheight > 0, \
+            '%s is not a valid cell height' % repr(cellheight)
+        self._cellwidth = cellwidth
+        self._cellheight = cellheight
+        self._cells = {}
+        self._ranges = {}
+
+    def __len__(self):
+        """
+        :return: The number of objects registered in this hash.
+        :rtype:  ``int``
+        """
+        return len(self._ranges)
+
+    def __contains__(self,key):
+        """
+        :return: True if ``key`` is registered in this hash.
+        :rtype:  ``bool``
+        """
+        return key in self._ranges
+
+
+    # PUBLIC METHODS
+    def insert(self,key,left,bottom,right,top):
+        """
+        Registers an object with the given bounding box.
+
+        If ``key`` is already registered, this is the same as :meth:`move`.
+
+        :param key: The object key
+        :type key:  any hashable value
+
+        :param left: The left edge of the bounding box
+        :type left:  ``int`` or ``float``
+
+        :param bottom: The bottom edge of the bounding box
+        :type bottom:  ``int`` or ``float``
+
+        :param right: The right edge of the bounding box
+        :type right:  ``int`` or ``float``
+
+        :param top: The top edge of the bounding box
+        :type top:  ``int`` or ``float``
+        """
+        if key in self._ranges:
+            self.move(key,left,bottom,right,top)
+            return
+        cells = self._range(left,bottom,right,top)
+        self._ranges[key] = cells
+        self._add(key,cells)
+
+    def move(self,key,left,bottom,right,top):
+        """
+        Changes the bounding box of a registered object.
+
+        The object is only moved between cells if the cells that it overlaps have
+        changed, so small movements are cheap.
+
+        :param key: The object key
+        :type key:  a key registered in this hash
+
+        :param left: The left edge of the bounding box
+        :type left:  ``int`` or ``float``
+
+        :param bottom: The bottom edge of the bounding box
+        :type bottom:  ``int`` or ``float``
+
+        :param right: The right edge of the bounding box
+        :type right:  ``int`` or ``float``
+
+        :param top: The top edge of the bounding box
+        :type top:  ``int`` or ``float``
+        """
+        cells = self._range(left,bottom,right,top)
+        old = self._ranges[key]
+        if cells != old:
+            self._discard(key,old)
+            self._ranges[key] = cells
+            self._add(key,cells)
+
+    def remove(self,key):
+        """
+        Unregisters an object.
+
+        Nothing happens if ``key`` is not registered.
+
+        :param key: The object key
+        :type key:  any hashable value
+        """
+        if key in self._ranges:
+            self._discard(key,self._ranges.pop(key))
+
+    def clear(self):
+        """
+        Unregisters every object.
+        """
+        self._cells.clear()
+        self._ranges.clear()
+
+    def copy(self):
+        """
+        Returns: A new spatial hash with the same objects registered in it.
+
+        The keys are not copied, so the new hash has the same keys as this one.
+        """
+        other = GSpatialHash(self._cellwidth,self._cellheight)
+        other._cells = {cell: set(keys) for cell, keys in self._cells.items()}
+        other._ranges = dict(self._ranges)
+        return other
+
+    def query(self,left,bottom,right,top):
+        """
+        Returns: The set of keys registered in the cells overlapped by this box.
+
+        This is a broad-phase test.  Every object overlapping the box is in the
+        result, but the result may also have objects that are only nearby.
+
+        :param left: The left edge of the query box
+        :type left:  ``int`` or ``float``
+
+        :param bottom: The bottom edge of the query box
+        :type bottom:  ``int`` or ``float``
+
+        :param right: The right edge of the query box
+        :type right:  ``int`` or ``float``
+
+        :param top: The top edge of the query box
+        :type top:  ``int`` or ``float``
+        """
+        x0, y0, x1, y1 = self._range(left,bottom,right,top)
+        result = set()
+        cells = self._cells
+        for cx in range(x0,x1+1):
+            for cy in range(y0,y1+1):
+                cell = cells.get((cx,cy))
+                if cell:
+                    result.update(cell)
+        return result
+
+
+    # HIDDEN METHODS
+    def _range(self,left,bottom,right,top):
+        """
+        Returns: The cells overlapped by a box, as a tuple (x0,y0,x1,y1)
+        """
+        return (math.floor(left/self._cellwidth), math.floor(bottom/self._cellheight),
+                math.floor(right/self._cellwidth), math.floor(top/self._cellheight))
+
+    def _add(self,key,cells):
+        """
+        Adds key to every cell in the range cells
+        """
+        x0, y0, x1, y1 = cells
+        for cx in range(x0,x1+1):
+            for cy in range(y0,y1+1):
+                cell = self._cells.get((cx,cy))
+                if cell is None:
+                    self._cells[(cx,cy)] = {key}
+                else:
+                    cell.add(key)
+
+    def _discard(self,key,cells):
+        """
+        Removes key from every cell in the range cells, dropping empty cells
+        """
+        x0, y0, x1, y1 = cells
+        for cx in range(x0,x1+1):
+            for cy in range(y0,y1+1):
+                cell = self._cells[(cx,cy)]
+                cell.discard(key)
+                if not cell:
+                    del self._cells[(cx,cy)]
@@ -0,0 +1,220 @@
+"""
+Wave settings module for Alien Invaders
+
+This module contains WaveConfig, the settings of a single wave: the size of the
+formation, how fast the aliens and bolts move, how often the aliens fire and
+how many lives the player has.  The defaults are the values in consts.py (after
+the command line has been read), but each wave can be given its own WaveConfig,
+so one process can run many waves with different settings at the same time.
+
+A WaveConfig also works out the values that follow from its settings once, when
+it is created: the starting position of every column and row of aliens, and the
+image of every row.
+"""
+from consts import *
+
+
+class WaveConfig(object):
+    """
+    A class to hold the settings of a wave.
+
+    A WaveConfig does not change once it is made.  Use replace to make a
+    config that differs in some settings.
+
+    INSTANCE ATTRIBUTES:
+        _rows:      the number of rows of aliens [int in 1..10]
+        _cols:      the number of aliens per row [int in 1..15]
+        _speed:     the number of seconds between alien steps [float > 0]
+        _boltRate:  the most alien steps between alien bolts [number >= 1]
+        _boltSpeed: the number of pixels a bolt moves per update [number > 0]
+        _shipMovement: the number of pixels the ship moves per update
+                    [number > 0]
+        _lives:     the number of lives the player starts with [int > 0]
+        _columnX:   the starting x coordinate of the aliens in each column
+                    [tuple of cols floats]
+        _rowY:      the starting y coordinate of the aliens in each row
+                    [tuple of rows floats]
+        _rowTypes:  the index in ALIEN_IMAGES of the image of each row
+                    [tuple of rows ints]
+    """
+
+    # GETTERS
+    def getRows(self):
+        """
+        Returns: the number of rows of aliens
+        """
+        return self._rows
+
+    def getCols(self):
+        """
+        Returns: the number of aliens per row
+        """
+        return self._cols
+
+    def getSpeed(self):
+        """
+        Returns: the number of seconds between alien steps
+        """
+        return self._speed
+
+    def getBoltRate(self):
+        """
+        Returns: the most alien steps between alien bolts
+        """
+        return self._boltRate
+
+    def getBoltSpeed(self):
+        """
+        Returns: the number of pixels a bolt moves per update
+        """
+        return self._boltSpeed
+
+    def getShipMovement(self):
+        """
+        Returns: the number of pixels the ship moves per update
+        """
+        return self._shipMovement
+
+    def getLives(self):
+        """
+        Returns: the number of lives the player starts with
+        """
+        return self._lives
+
+    def getColumnX(self):
+        """
+        Returns: the starting x coordinate of the aliens in each column, left
+        to right
+        """
+        return self._columnX
+
+    def getRowY(self):
+        """
+        Returns: the starting y coordinate of the aliens in each row, top to
+        bottom
+        """
+        return self._rowY
+
+    def getOrigin(self):
+        """
+        Returns: the starting position (x,y) of the top left alien
+        """
+        return (self._columnX[0],self._rowY[0])
+
+    def getAlienType(self,row):
+        """
+        Returns: the index in ALIEN_IMAGES of the image of the aliens in row.
+        The images change every two rows, starting from the bottom row.
+
+        Parameter row: the row (0 is the top row)
+        Precondition: row is an int in 0..getRows()-1
+        """
+        return self._rowTypes[row]
+
+    def getAlienImage(self,row):
+        """
+        Returns: the image file of the aliens in row
+
+        Parameter row: the row (0 is the top row)
+        Precondition: row is an int in 0..getRows()-1
+        """
+        return ALIEN_IMAGES[self._rowTypes[row]]
+
+    # INITIALIZER
+    def __init__(self,rows=ALIEN_ROWS,cols=ALIENS_IN_ROW,speed=ALIEN_SPEED,
+                 boltRate=BOLT_RATE,boltSpeed=BOLT_SPEED,
+                 shipMovement=SHIP_MOVEMENT,lives=SHIP_LIVES):
+        """
+        Initializer: creates the settings of a wave
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int in 1..10
+
+        Parameter cols: the number of aliens per row
+        Precondition: cols is an int in 1..15
+
+        Parameter speed: the number of seconds between alien steps
+        Precondition: speed is a number (int or float) > 0
+
+        Parameter boltRate: the most alien steps between alien bolts
+        Precondition: boltRate is a number (int or float) >= 1
+
+        Parameter boltSpeed: the number of pixels a bolt moves per update
+        Precondition: boltSpeed is a number (int or float) > 0
+
+        Parameter shipMovement: the number of pixels the ship moves per update
+        Precondition: shipMovement is a number (int or float) > 0
+
+        Parameter lives: the number of lives the player starts with
+        Precondition: lives is an int > 0
+        """
+        assert type(rows)==int and 1<=rows<=10, '%s is not a valid row count' % repr(rows)
+        assert type(cols)==int and 1<=cols<=15, \
+            '%s is not a valid column count' % repr(cols)
+        assert type(speed) in [int,float] and speed>0, \
+            '%s is not a valid speed' % repr(speed)
+        assert type(boltRate) in [int,float] and boltRate>=1, \
+            '%s is not a valid bolt rate' % repr(boltRate)
+        assert type(boltSpeed) in [int,float] and boltSpeed>0, \
+            '%s is not a valid bolt speed' % repr(boltSpeed)
+        assert type(shipMovement) in [int,float] and shipMovement>0, \
+            '%s is not a valid ship movement' % repr(shipMovement)
+        assert type(lives)==int and lives>0, '%s is not a valid life count' % repr(lives)
+        self._rows=rows
+        self._cols=cols
+        self._speed=speed
+        self._boltRate=boltRate
+        self._boltSpeed=boltSpeed
+        self._shipMovement=shipMovement
+        self._lives=lives
+        self._columnX=tuple(float(ALIEN_H_SEP*(c+1)+int(round(ALIEN_WIDTH/2))+
+                                  ALIEN_WIDTH*c) for c in range(cols))
+        self._rowY=tuple(GAME_HEIGHT-ALIEN_CEILING-ALIEN_V_SEP*r-ALIEN_HEIGHT/2-
+                         ALIEN_HEIGHT*r for r in range(rows))
+        self._rowTypes=tuple(((rows-1-r)//2)%len(ALIEN_IMAGES)
+                             for r in range(rows))
+
+    def __eq__(self,other):
+        """
+        Returns: True if other is a WaveConfig with the same settings
+        """
+        return isinstance(other,WaveConfig) and self._settings()==other._settings()
+
+    def __hash__(self):
+        """
+        Returns: a hash of the settings, so configs can be dictionary keys
+        """
+        return hash(self._settings())
+
+    def __repr__(self):
+        """
+        Returns: an unambiguous string representation of the settings
+        """
+        return ('WaveConfig(rows=%r, cols=%r, speed=%r, boltRate=%r, '
+                'boltSpeed=%r, shipMovement=%r, lives=%r)' % self._settings())
+
+    # METHODS TO MAKE NEW CONFIGS
+    def replace(self,**settings):
+        """
+        Returns: a new config with the same settings as this one, except for
+        the ones given
+
+        Parameter settings: the settings to change, by the names of the
+        initializer parameters (for example, replace(speed=0.5))
+        Precondition: each setting meets the precondition of the initializer
+        """
+        values={'rows':self._rows,'cols':self._cols,'speed':self._speed,
+                'boltRate':self._boltRate,'boltSpeed':self._boltSpeed,
+                'shipMovement':self._shipMovement,'lives':self._lives}
+        for name in settings:
+            assert name in values, '%s is not a setting' % repr(name)
+        values.update(settings)
+        return WaveConfig(**values)
+
+    # HELPER METHODS
+    def _settings(self):
+        """
+        Returns: the settings as a tuple, in the order of the initializer
+        """
+        return (self._rows,self._cols,self._speed,self._boltRate,
+                self._boltSpeed,self._shipMovement,self._lives)
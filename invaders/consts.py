@@ -14,7 +14,6 @@ was labeled for reuse, commercial and noncommercial
 CITATION: both win.wav and Lose.wav are permitted for commercial use under
 Creative Commons Attribution 4.0 International Liscense
 """
-import cornell
 import sys
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
@@ -92,6 +91,10 @@ ALIEN_SPEED = 1.0
 ALIEN_BOLT_SOUND='pew2.wav'
 #sound when alien destroyed
 ALIEN_HIT_SOUND='pop1.wav'
+# the width of a cell in the collision grid (one alien and its separation)
+COLLISION_CELL_WIDTH = ALIEN_WIDTH+ALIEN_H_SEP
+# the height of a cell in the collision grid (one alien and its separation)
+COLLISION_CELL_HEIGHT = ALIEN_HEIGHT+ALIEN_V_SEP
 
 ### BOLT CONSTANTS ###
 
@@ -107,6 +110,10 @@ BOLT_RATE   = 5
 BOLT_LINECOLOR='white'
 # the line color of the bolts
 BOLT_FILLCOLOR='red'
+# the number of bolt images a wave keeps for reuse
+BOLT_POOL_SIZE = 32
+# the most alien bolts a wave in a WaveBatch can have on screen at once
+BATCH_MAX_BOLTS = 16
 
 ##Complete conditoins##
 NOT_COMPLETE=0 #game is not complete
@@ -114,6 +121,41 @@ DLINE_CROSSED=1 #game complete bc dline crosssed
 ALIENS_KILLED=2 #game complete bc all aliens killed
 LIVES_LOST=3 #game complete because all lives lost
 
+##Wave events, combined as bit flags in the value returned by update##
+EVENT_SHIP_FIRED=1 #the ship fired a bolt
+EVENT_ALIEN_FIRED=2 #an alien fired a bolt
+EVENT_ALIEN_HIT=4 #an alien was destroyed
+EVENT_SHIP_HIT=8 #the ship was destroyed
+
+##Environment actions (see env.py)##
+ACTION_NOOP=0 #do nothing
+ACTION_LEFT=1 #move the ship left
+ACTION_RIGHT=2 #move the ship right
+ACTION_FIRE=3 #fire a bolt
+ACTION_LEFT_FIRE=4 #fire a bolt and move the ship left
+ACTION_RIGHT_FIRE=5 #fire a bolt and move the ship right
+# the number of environment actions
+ACTION_COUNT=6
+
+##Environment rewards (see env.py)##
+REWARD_ALIEN_HIT=1.0 #for each alien destroyed
+REWARD_SHIP_HIT=-5.0 #for each life lost
+REWARD_WIN=10.0 #when all of the aliens are killed
+REWARD_LOSE=-10.0 #when the aliens cross the dline or all lives are lost
+# the number of alien bolts (lowest first) in an observation
+OBSERVED_BOLTS=8
+
+##Raster observations (see observe.py)##
+# the default size of a raster observation, in cells
+RASTER_WIDTH=84
+RASTER_HEIGHT=84
+# the value of each kind of object in a raster observation (0 is empty)
+RASTER_DLINE=48
+RASTER_ALIEN_BOLT=96
+RASTER_PLAYER_BOLT=160
+RASTER_SHIP=208
+RASTER_ALIEN=255
+
 ### GAME CONSTANTS ###
 
 #sound that plays when player wins wave
@@ -121,6 +163,37 @@ WIN_SOUND='win.wav'
 #sound that plays when player loses
 LOSE_SOUND='Lose.wav'
 
+# the number of seconds simulated by each update (the game runs at a fixed rate
+# no matter the frame rate of the display)
+GAME_TIMESTEP = 1/60
+# the most updates to run in one frame when the game falls behind
+GAME_MAX_SUBSTEPS = 5
+# the seed of the random numbers of a game, or None for a different game every
+# time (every wave gets its own stream of random numbers from this seed, so two
+# games with the same seed and the same inputs play out the same)
+GAME_SEED = None
+# the keys read by the game, which are the keys an input recording stores
+RECORD_KEYS = ('left','right','up','s','enter','m','u','h')
+# the ending of input recording files, for finding them in a folder
+RECORD_SUFFIX = '.invr'
+# the number of columns across the window in the heatmaps of a recording corpus
+HEATMAP_BINS = 64
+# the number of frames of a recording drawn by a worker of the renderer at a time
+RENDER_CHUNK = 120
+# the hundredths of a second that the time of every GIF frame is a multiple of
+# (browsers show frames shorter than 2 hundredths for much longer)
+GIF_TICK = 2
+# the number of frames the autopilot waits on a screen before pressing its key
+AUTOPILOT_WAIT = 30
+# the most bytes of wave states kept for the debug history mode (press 'h')
+HISTORY_BUDGET = 8*1024*1024
+# the number of frames between wave states kept for the debug history mode
+HISTORY_EVERY = 1
+# the number of frames between checksums of the wave in an input recording
+# (1 checks every frame, 0 turns the checksums off); one a second keeps an
+# hour of play to about 14 kilobytes of checksums
+RECORD_CHECKSUM_EVERY = 60
+
 # state before the game has started
 STATE_INACTIVE = 0 
 # state when we are initializing a new wave
@@ -133,6 +206,8 @@ STATE_PAUSED   = 3
 STATE_CONTINUE = 4
 #: state when the game is complete (won or lost)
 STATE_COMPLETE = 5
+# state when the game is stopped to step through the history of the wave
+STATE_HISTORY = 6
 
 
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
@@ -144,6 +219,7 @@ everything after the word python. So if you start the game typing
     
 Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take advantage of 
 this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED.
+A fourth argument, as in python invaders 3 4 0.5 42, sets GAME_SEED.
 """
 try:
     rows = int(sys.argv[1])
@@ -166,4 +242,9 @@ try:
 except:
     pass # Use original value
 
+try:
+    GAME_SEED = int(sys.argv[4])
+except:
+    pass # Use original value
+
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
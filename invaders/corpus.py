@@ -0,0 +1,256 @@
+"""
+Recording corpus indexer for Alien Invaders
+
+This module replays a large collection of input recordings (see record.py)
+without a window and reports how every wave in them went.  For example
+
+    python corpus.py games/ --index waves.csv --heatmaps heat.npz
+
+replays every recording under games/ in parallel worker processes.  It writes
+one CSV line per wave with its length, how it ended, the lives lost and the
+accuracy of the player, and saves NumPy histograms of where across the window
+the ship was hit and where aliens crossed the defense line.
+
+Recordings are read one at a time and only a few are in flight at once, so the
+memory used does not grow with the size of the corpus.  Each line of the index
+is written as soon as its recording has been replayed.
+
+Only flags and paths are accepted.  consts.py reads its positional command
+line arguments when it is imported, so they are hidden from it here.
+"""
+import sys
+_argv=sys.argv
+sys.argv=sys.argv[:1]
+from consts import *
+from record import *
+from replay import *
+sys.argv=_argv
+import argparse
+import collections
+import csv
+import multiprocessing
+import os
+import numpy as np
+
+# the columns of the index, in order
+INDEX_FIELDS = ('recording','wave','start_frame','frames','seconds','complete',
+                'lives_lost','shots','hits','accuracy')
+
+
+def recordings(paths):
+    """
+    Yields: every recording file in paths, in sorted order.  A folder is
+    searched (with its subfolders) for files ending in RECORD_SUFFIX.
+
+    Parameter paths: the files and folders to search
+    Precondition: paths is an iterable of strings
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for folder,dirs,files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(RECORD_SUFFIX):
+                    yield os.path.join(folder,name)
+
+
+def _bin(x,bins):
+    """
+    Returns: the heatmap column of the x coordinate x
+
+    Parameter x: the x coordinate
+    Precondition: x is a number (int or float)
+
+    Parameter bins: the number of columns
+    Precondition: bins is an int > 0
+    """
+    return min(max(int(x*bins/GAME_WIDTH),0),bins-1)
+
+
+def analyze(path,bins=HEATMAP_BINS):
+    """
+    Returns: a tuple (rows,hits,crossings) for the recording in path, where
+    rows is a list of dictionaries, one per wave, with the keys INDEX_FIELDS,
+    hits counts the times the ship was hit in each column of the window, and
+    crossings counts the aliens that crossed the defense line in each column
+
+    A wave that is still going when the recording ends has the complete code
+    NOT_COMPLETE.  Stepping through the debug history (see Invaders) is not
+    undone in the counts.
+
+    Parameter path: the recording file
+    Precondition: path is a string
+
+    Parameter bins: the number of columns of the histograms
+    Precondition: bins is an int > 0
+    """
+    recording=InputRecording.load(path)
+    session=Session(recording.getSeed(),recording.getConfig())
+    player=InputPlayer(recording)
+    input=player.getInput()
+    rows=[]
+    hits=np.zeros(bins,dtype=np.int64)
+    crossings=np.zeros(bins,dtype=np.int64)
+    current=None
+    stats=None
+    for frame in range(recording.getFrames()):
+        sim=session.getSim()
+        events=session.update(input,player.next())
+        if sim is None and session.getSim() is not None:
+            current=session.getSim()
+            stats={'recording':path,'wave':len(rows),'start_frame':frame,
+                   'lives':current.getLives(),'shots':0,'hits':0}
+            sim=current
+        if events & EVENT_SHIP_FIRED:
+            stats['shots']+=1
+        if events & EVENT_ALIEN_HIT:
+            stats['hits']+=1
+        if events & EVENT_SHIP_HIT:
+            hits[_bin(sim.getLastHitX(),bins)]+=1
+        if current is not None and session.getSim() is not current:
+            rows.append(_finish(current,stats,frame+1,crossings))
+            current=None
+    if current is not None:
+        rows.append(_finish(current,stats,recording.getFrames(),crossings))
+    return (rows,hits,crossings)
+
+
+def _finish(sim,stats,end,crossings):
+    """
+    Returns: the index row of a wave, after adding the aliens that crossed
+    the defense line in it (if any) to crossings
+
+    Parameter sim: the wave
+    Precondition: sim is a WaveSim
+
+    Parameter stats: the counts kept for the wave by analyze
+    Precondition: stats is a dictionary
+
+    Parameter end: the frame after the last frame of the wave
+    Precondition: end is an int
+
+    Parameter crossings: the histogram of alien crossings
+    Precondition: crossings is a 1d array of int64
+    """
+    complete=sim.getWaveComplete()
+    if complete==DLINE_CROSSED:
+        formation=sim.getAliens()
+        below=formation.getAlive()&(formation.getY()-ALIEN_HEIGHT/2<DEFENSE_LINE)
+        xs=formation.getX()[below]
+        crossings+=np.histogram(xs,bins=len(crossings),range=(0,GAME_WIDTH))[0]
+    frames=end-stats['start_frame']
+    shots=stats['shots']
+    return {'recording':stats['recording'],'wave':stats['wave'],
+            'start_frame':stats['start_frame'],'frames':frames,
+            'seconds':frames*GAME_TIMESTEP,'complete':complete,
+            'lives_lost':stats['lives']-sim.getLives(),'shots':shots,
+            'hits':stats['hits'],
+            'accuracy':stats['hits']/shots if shots else 0.0}
+
+
+def _analyze(task):
+    """
+    Returns: analyze for a (path,bins) tuple, or (path,message) if the
+    recording could not be read, so that one bad file does not stop the pool
+    """
+    path,bins=task
+    try:
+        return analyze(path,bins)
+    except (OSError,ValueError) as e:
+        return (path,str(e))
+
+
+def stream(paths,workers=None,bins=HEATMAP_BINS,window=None):
+    """
+    Yields: the result of _analyze for every recording in paths, in order
+
+    At most window recordings are being replayed or waiting to be read at any
+    time, so the paths can come from a generator over any number of files.
+
+    Parameter paths: the recording files
+    Precondition: paths is an iterable of strings
+
+    Parameter workers: the number of worker processes, or None for one per
+    core
+    Precondition: workers is None or an int > 0
+
+    Parameter bins: the number of columns of the histograms
+    Precondition: bins is an int > 0
+
+    Parameter window: the most recordings in flight, or None for four per
+    worker
+    Precondition: window is None or an int > 0
+    """
+    workers=workers or os.cpu_count() or 1
+    window=window or 4*workers
+    with multiprocessing.Pool(workers) as pool:
+        pending=collections.deque()
+        for path in paths:
+            pending.append(pool.apply_async(_analyze,((path,bins),)))
+            if len(pending)>=window:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def parser():
+    """
+    Returns: the command line parser of the corpus indexer
+    """
+    p=argparse.ArgumentParser(description='Replay a corpus of Alien Invaders '
+                              'recordings and index every wave in it.')
+    p.add_argument('paths',nargs='+',
+                   help='recordings, or folders to search for *%s files' % RECORD_SUFFIX)
+    p.add_argument('--index',default='index.csv',
+                   help='CSV file to write the waves to (default: index.csv)')
+    p.add_argument('--heatmaps',default='heatmaps.npz',
+                   help='NumPy file to write the histograms to '
+                   '(default: heatmaps.npz)')
+    p.add_argument('--bins',type=int,default=HEATMAP_BINS,
+                   help='columns across the window in each histogram')
+    p.add_argument('--workers',type=int,default=None,
+                   help='worker processes (default: one per core)')
+    return p
+
+
+def main(argv=None):
+    """
+    Runs the corpus indexer
+
+    Returns: 0 if every recording was read, or 1 if not
+
+    Parameter argv: the command line arguments, or None to use sys.argv
+    Precondition: argv is None or a list of strings
+    """
+    args=parser().parse_args(argv)
+    if args.bins<1:
+        parser().error('bins must be at least 1')
+    hits=np.zeros(args.bins,dtype=np.int64)
+    crossings=np.zeros(args.bins,dtype=np.int64)
+    count=0
+    waves=0
+    status=0
+    with open(args.index,'w',newline='') as out:
+        writer=csv.DictWriter(out,fieldnames=INDEX_FIELDS)
+        writer.writeheader()
+        for result in stream(recordings(args.paths),args.workers,args.bins):
+            if type(result[1])==str:
+                print('%s: %s' % result,file=sys.stderr)
+                status=1
+                continue
+            rows,h,c=result
+            writer.writerows(rows)
+            hits+=h
+            crossings+=c
+            count+=1
+            waves+=len(rows)
+    np.savez(args.heatmaps,ship_hits=hits,dline_crossings=crossings,
+             edges=np.linspace(0,GAME_WIDTH,args.bins+1))
+    print('%d recordings, %d waves' % (count,waves))
+    return status
+
+
+if __name__=='__main__':
+    sys.exit(main())
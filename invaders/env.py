@@ -0,0 +1,190 @@
+"""
+Training environment module for Alien Invaders
+
+This module contains an environment for training agents to play a wave of
+Alien Invaders.  It has the reset/step interface of a Gym environment, but does
+not import gym.  It runs WaveSim directly, so no window, sound or Kivy clock is
+needed, and every step is one frame of GAME_TIMESTEP seconds.
+
+The actions are the ACTION_* constants in consts.py.  The observation is a
+flat float32 array built straight from the simulation (see InvadersEnv.observe),
+and the reward is made from the events that WaveSim.update returns.
+"""
+from consts import *
+from config import *
+from sim import *
+import numpy as np
+
+
+class InvadersEnv(object):
+    """
+    A class to play a wave of Alien Invaders one frame at a time.
+
+    Call reset to start a new wave, then call step with an action until it
+    says the wave is done.  When the ship is destroyed and there are lives
+    left, a new ship is put in the middle of the screen on the same frame, so
+    there is no paused state to get through.
+
+    The observation has these entries, all scaled to about -1..1:
+        0:  the x coordinate of the ship, over GAME_WIDTH
+        1:  the number of lives left, over SHIP_LIVES
+        2:  the x coordinate of the top left slot of the formation, over
+            GAME_WIDTH (dead aliens keep moving, so this is the offset of the
+            whole formation)
+        3:  the y coordinate of the same slot, over GAME_HEIGHT
+        4:  1 if the aliens are marching right, -1 if they are marching left
+        5:  1 if the player bolt is on screen, 0 otherwise
+        6,7: the x and y coordinates of the player bolt (0 if there is none)
+        then, for each of the OBSERVED_BOLTS lowest alien bolts: 1 if it is
+            there (0 otherwise), and its x and y coordinates
+        then, 1 or 0 for each slot of the formation (row by row): whether the
+            alien in that slot is alive
+
+    INSTANCE ATTRIBUTES:
+        _config: the settings of each wave [WaveConfig]
+        _rows:  the number of rows of aliens [int in 1..10]
+        _cols:  the number of aliens per row [int in 1..15]
+        _limit: the number of frames after which a wave is stopped
+                [int > 0, or None for no limit]
+        _sim:   the wave being played [WaveSim, or None before reset]
+        _frame: the number of frames played in this wave [int >= 0]
+        _done:  whether the wave is over [bool]
+        _obs:   the buffer that observe writes into [1d ndarray of float32]
+    """
+    # the direction and fire flag for each action, indexed by action
+    DIRECTIONS=('','left','right','','left','right')
+    FIRES=(False,False,False,True,True,True)
+
+    # GETTERS
+    def getSim(self):
+        """
+        Returns: the wave being played, or None before the first reset
+        """
+        return self._sim
+
+    def getFrame(self):
+        """
+        Returns: the number of frames played in this wave
+        """
+        return self._frame
+
+    def observationSize(self):
+        """
+        Returns: the number of entries in an observation
+        """
+        return 8+3*OBSERVED_BOLTS+self._rows*self._cols
+
+    # INITIALIZER
+    def __init__(self,speed=ALIEN_SPEED,rows=ALIEN_ROWS,cols=ALIENS_IN_ROW,
+                 limit=None):
+        """
+        Initializer: creates an environment for waves of aliens (rows x cols).
+        Call reset before the first step.
+
+        Parameter: speed is the number of seconds between alien steps
+        Precondition: speed is a float > 0
+
+        Parameter: rows is the number of rows of aliens
+        Precondition: rows is an int in 1..10
+
+        Parameter: cols is the number of aliens per row
+        Precondition: cols is an int in 1..15
+
+        Parameter: limit is the number of frames after which a wave is done
+        even if it is not complete
+        Precondition: limit is None or an int > 0
+        """
+        assert limit is None or (type(limit)==int and limit>0), \
+            '%s is not a valid frame limit' % repr(limit)
+        self._config=WaveConfig(rows,cols,speed)
+        self._rows=rows
+        self._cols=cols
+        self._limit=limit
+        self._sim=None
+        self._frame=0
+        self._done=True
+        self._obs=np.zeros(self.observationSize(),dtype=np.float32)
+
+    # ENVIRONMENT METHODS
+    def reset(self,seed=None):
+        """
+        Starts a new wave.
+
+        Returns: the first observation of the wave
+
+        Parameter: seed is the seed for alien fire, or None for a random one
+        Precondition: seed is None or an int
+        """
+        self._sim=WaveSim(self._config,seed)
+        self._frame=0
+        self._done=False
+        return self.observe()
+
+    def step(self,action):
+        """
+        Plays one frame of the wave.
+
+        Returns: a tuple (observation,reward,done,info).  done is True if the
+        wave is complete or the frame limit was reached.  info is a dictionary
+        with the keys 'events' (the EVENT_* flags of the frame), 'complete'
+        (the value of getWaveComplete), 'lives' and 'frame'
+
+        Parameter: action is the action to take
+        Precondition: action is one of the ACTION_* constants, and reset has
+        been called since the last time step returned done
+        """
+        assert not self._done, 'the wave is over; call reset'
+        sim=self._sim
+        events=sim.update(GAME_TIMESTEP,self.DIRECTIONS[action],
+                          self.FIRES[action])
+        self._frame=self._frame+1
+        reward=0.0
+        if(events & EVENT_ALIEN_HIT):
+            reward=reward+REWARD_ALIEN_HIT
+        if(events & EVENT_SHIP_HIT):
+            reward=reward+REWARD_SHIP_HIT
+        complete=sim.getWaveComplete()
+        if(complete==ALIENS_KILLED):
+            reward=reward+REWARD_WIN
+        elif(complete!=NOT_COMPLETE):
+            reward=reward+REWARD_LOSE
+        elif(sim.getShip() is None):
+            sim.resetShip()
+        self._done=(complete!=NOT_COMPLETE or
+                    (self._limit is not None and self._frame>=self._limit))
+        info={'events':events,'complete':complete,'lives':sim.getLives(),
+              'frame':self._frame}
+        return (self.observe(),reward,self._done,info)
+
+    def observe(self):
+        """
+        Returns: the observation of the current frame (see the class
+        specification).  The array is reused by the next call to observe (or
+        step or reset), so copy it to keep it.
+        """
+        obs=self._obs
+        obs[:]=0
+        sim=self._sim
+        ship=sim.getShip()
+        if ship is not None:
+            obs[0]=ship.x/GAME_WIDTH
+        obs[1]=sim.getLives()/SHIP_LIVES
+        formation=sim.getAliens()
+        obs[2]=formation.getX()[0,0]/GAME_WIDTH
+        obs[3]=formation.getY()[0,0]/GAME_HEIGHT
+        obs[4]=1.0 if sim.getAlienDirection()=='right' else -1.0
+        bolts=sim.getBolts()
+        player=bolts.getPlayer()
+        if player is not None:
+            obs[5]=1.0
+            obs[6]=player.x/GAME_WIDTH
+            obs[7]=player.y/GAME_HEIGHT
+        aliens=sorted(bolts.getAliens(),key=lambda b: b.y)[:OBSERVED_BOLTS]
+        i=8
+        for bolt in aliens:
+            obs[i]=1.0
+            obs[i+1]=bolt.x/GAME_WIDTH
+            obs[i+2]=bolt.y/GAME_HEIGHT
+            i=i+3
+        obs[8+3*OBSERVED_BOLTS:]=formation.getAlive().ravel()
+        return obs
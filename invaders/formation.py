@@ -0,0 +1,390 @@
+"""
+Alien formation module for Alien Invaders
+
+This module contains the formation engine used by WaveSim.  Instead of a 2d list
+of alien objects, the formation keeps the position, state and image of every
+alien in NumPy arrays (one entry per grid slot), so that marching and
+dropping are single vectorized operations.
+
+The formation also keeps a bitboard index of which aliens are alive: an int
+bitmask per row (bit c is set if the alien in column c is alive) and the list of
+columns that still have aliens.  The index is updated on every kill, and answers
+the extent, firing and live count queries without scanning the grid.
+
+Nothing in this module draws.  Wave copies the positions to its alien sprites
+when it draws the wave.
+"""
+from consts import *
+from config import *
+import numpy as np
+import zlib
+
+
+class Formation(object):
+    """
+    A class to represent the grid of aliens in a wave.
+
+    Row 0 is the top row of the formation and column 0 is the left column.
+    Dead aliens keep their slot (and keep moving with the formation) but have
+    _alive set to False.
+
+    INSTANCE ATTRIBUTES:
+        _x:     the x coordinate of the center of each alien
+                [rows x cols ndarray of float64]
+        _y:     the y coordinate of the center of each alien
+                [rows x cols ndarray of float64]
+        _alive: whether each alien is still alive [rows x cols ndarray of bool]
+        _type:  the index in ALIEN_IMAGES of the image for each alien
+                [rows x cols ndarray of int8]
+        _rowMasks: bit c of _rowMasks[r] is set if alien (r,c) is alive
+                [list of int >= 0, one per row]
+        _columns: the columns with at least one living alien, left to right
+                [sorted list of int]
+        _count: the number of aliens still alive [int >= 0]
+        _px:    the value of _x when remember was last called
+                [rows x cols ndarray of float64]
+        _py:    the value of _y when remember was last called
+                [rows x cols ndarray of float64]
+        _moved: whether the formation has moved since remember was last called
+                [bool]
+        _lerpX: the buffer that lerpX writes into [rows x cols ndarray of float64]
+        _lerpY: the buffer that lerpY writes into [rows x cols ndarray of float64]
+    """
+
+    # GETTERS
+    def getX(self):
+        """
+        Returns: the array of alien x coordinates (do not modify it)
+        """
+        return self._x
+
+    def getY(self):
+        """
+        Returns: the array of alien y coordinates (do not modify it)
+        """
+        return self._y
+
+    def getAlive(self):
+        """
+        Returns: the array of alien alive flags (do not modify it)
+        """
+        return self._alive
+
+    def getType(self):
+        """
+        Returns: the array of alien image indices (do not modify it)
+        """
+        return self._type
+
+    def getShape(self):
+        """
+        Returns: the grid size of the formation as a (rows,cols) tuple
+        """
+        return self._alive.shape
+
+    # INITIALIZER
+    def __init__(self,config=None):
+        """
+        Initializer: creates a full formation of aliens at the top of the
+        screen, a distance ALIEN_CEILING from the top of the window.
+
+        Parameter config: the settings of the wave (the number of rows and
+        columns and where they start), or None for the defaults
+        Precondition: config is None or a WaveConfig
+        """
+        if config is None:
+            config=WaveConfig()
+        rows=config.getRows()
+        cols=config.getCols()
+        self._x=np.empty((rows,cols))
+        self._y=np.empty((rows,cols))
+        self._x[:]=config.getColumnX()
+        self._y[:]=np.array(config.getRowY())[:,np.newaxis]
+        self._alive=np.ones((rows,cols),dtype=bool)
+        self._type=np.empty((rows,cols),dtype=np.int8)
+        self._type[:]=np.array([config.getAlienType(r)
+                                for r in range(rows)])[:,np.newaxis]
+        self._rowMasks=[(1<<cols)-1]*rows
+        self._columns=list(range(cols))
+        self._count=rows*cols
+        self._px=self._x.copy()
+        self._py=self._y.copy()
+        self._moved=False
+        self._lerpX=np.empty((rows,cols))
+        self._lerpY=np.empty((rows,cols))
+
+    def copy(self):
+        """
+        Returns: a new formation in the same state as this one
+        """
+        other=Formation.__new__(Formation)
+        other._x=self._x.copy()
+        other._y=self._y.copy()
+        other._alive=self._alive.copy()
+        other._type=self._type
+        other._rowMasks=list(self._rowMasks)
+        other._columns=list(self._columns)
+        other._count=self._count
+        other._px=self._px.copy()
+        other._py=self._py.copy()
+        other._moved=self._moved
+        other._lerpX=np.empty_like(self._x)
+        other._lerpY=np.empty_like(self._y)
+        return other
+
+    # METHODS TO SAVE AND RESTORE THE STATE
+    def snapshot(self):
+        """
+        Returns: the state of the formation as a tuple, for restore
+
+        The tuple holds copies, so later changes to the formation do not
+        change it.  The alien types are not included, since they never change.
+        """
+        return (self._x.copy(),self._y.copy(),self._alive.copy(),
+                tuple(self._rowMasks),tuple(self._columns),self._count,
+                self._px.copy(),self._py.copy(),self._moved)
+
+    def checksum(self,crc=0):
+        """
+        Returns: a CRC-32 of the positions and living aliens of the formation,
+        continuing from crc
+
+        Parameter crc: the CRC-32 of anything hashed before the formation
+        Precondition: crc is an int in 0..2**32-1
+        """
+        crc=zlib.crc32(self._x,crc)
+        crc=zlib.crc32(self._y,crc)
+        return zlib.crc32(self._alive,crc)
+
+    def pack(self):
+        """
+        Returns: the state of the formation packed into bytes, for unpack
+
+        This is smaller than a snapshot: the aliens always move together, so
+        only the x coordinate of each column and the y coordinate of each row
+        are kept, and the alive flags are kept as bits.
+        """
+        lines=np.concatenate((self._x[0],self._y[:,0],self._px[0],self._py[:,0]))
+        return (lines.tobytes()+np.packbits(self._alive).tobytes()+
+                (b'\x01' if self._moved else b'\x00'))
+
+    def unpack(self,data):
+        """
+        Puts the formation back in a state returned by pack
+
+        Parameter data: the packed state
+        Precondition: data was returned by pack on a formation of the same
+        shape
+        """
+        rows,cols=self._alive.shape
+        lines=np.frombuffer(data,dtype=np.float64,count=2*(rows+cols))
+        self._x[:]=lines[:cols]
+        self._y[:]=lines[cols:cols+rows,np.newaxis]
+        self._px[:]=lines[cols+rows:2*cols+rows]
+        self._py[:]=lines[2*cols+rows:,np.newaxis]
+        bits=np.frombuffer(data,dtype=np.uint8,offset=lines.nbytes,
+                           count=(rows*cols+7)//8)
+        self._alive[:]=np.unpackbits(bits,count=rows*cols).reshape(rows,cols)
+        self._rowMasks=[sum(1<<int(c) for c in line.nonzero()[0])
+                        for line in self._alive]
+        self._columns=[int(c) for c in self._alive.any(axis=0).nonzero()[0]]
+        self._count=int(self._alive.sum())
+        self._moved=data[-1]==1
+
+    def restore(self,state):
+        """
+        Puts the formation back in a state returned by snapshot.  The same
+        state can be restored any number of times.
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot on a formation of the
+        same shape
+        """
+        x,y,alive,masks,columns,count,px,py,moved=state
+        np.copyto(self._x,x)
+        np.copyto(self._y,y)
+        np.copyto(self._alive,alive)
+        self._rowMasks=list(masks)
+        self._columns=list(columns)
+        self._count=count
+        np.copyto(self._px,px)
+        np.copyto(self._py,py)
+        self._moved=moved
+
+    # METHODS TO MOVE THE FORMATION
+    def march(self,dx):
+        """
+        Moves every alien dx horizontally.
+
+        Parameter dx: the horizontal distance (positive is to the right)
+        Precondition: dx is a number (int or float)
+        """
+        self._x+=dx
+        self._moved=True
+
+    def drop(self,dy):
+        """
+        Moves every alien dy down the screen.
+
+        Parameter dy: the vertical distance (positive is down)
+        Precondition: dy is a number (int or float)
+        """
+        self._y-=dy
+        self._moved=True
+
+    def remember(self):
+        """
+        Saves the current positions as the previous positions.  Nothing is
+        copied if the formation has not moved since the last call.
+        """
+        if self._moved:
+            np.copyto(self._px,self._x)
+            np.copyto(self._py,self._y)
+            self._moved=False
+
+    def lerpX(self,alpha):
+        """
+        Returns: the x coordinates alpha of the way from the previous positions
+        to the current ones.  The array is reused by the next call to lerpX, so
+        do not keep it.
+
+        Parameter alpha: the fraction of the way to go
+        Precondition: alpha is a number in 0..1
+        """
+        np.subtract(self._x,self._px,out=self._lerpX)
+        self._lerpX*=alpha
+        self._lerpX+=self._px
+        return self._lerpX
+
+    def lerpY(self,alpha):
+        """
+        Returns: the y coordinates alpha of the way from the previous positions
+        to the current ones.  The array is reused by the next call to lerpY, so
+        do not keep it.
+
+        Parameter alpha: the fraction of the way to go
+        Precondition: alpha is a number in 0..1
+        """
+        np.subtract(self._y,self._py,out=self._lerpY)
+        self._lerpY*=alpha
+        self._lerpY+=self._py
+        return self._lerpY
+
+    # METHODS TO QUERY THE FORMATION
+    def count(self):
+        """
+        Returns: the number of aliens still alive
+        """
+        return self._count
+
+    def leftColumn(self):
+        """
+        Returns: the left most column with a living alien, or -1 if all of the
+        aliens are dead
+        """
+        if not self._columns:
+            return -1
+        return self._columns[0]
+
+    def rightColumn(self):
+        """
+        Returns: the right most column with a living alien, or -1 if all of the
+        aliens are dead
+        """
+        if not self._columns:
+            return -1
+        return self._columns[-1]
+
+    def left(self):
+        """
+        Returns: the left edge of the left most living alien, or None if all of
+        the aliens are dead
+        """
+        if not self._columns:
+            return None
+        return float(self._x[0,self._columns[0]])-ALIEN_WIDTH/2
+
+    def right(self):
+        """
+        Returns: the right edge of the right most living alien, or None if all
+        of the aliens are dead
+        """
+        if not self._columns:
+            return None
+        return float(self._x[0,self._columns[-1]])+ALIEN_WIDTH/2
+
+    def bottomRow(self,col):
+        """
+        Returns: the row of the bottom most living alien in column col, or -1
+        if the column is empty
+
+        Parameter col: the column to check
+        Precondition: col is a valid column index
+        """
+        bit=1<<col
+        for r in range(len(self._rowMasks)-1,-1,-1):
+            if self._rowMasks[r] & bit:
+                return r
+        return -1
+
+    def randomColumn(self,rng):
+        """
+        Returns: a column chosen uniformly from the columns with a living alien,
+        or -1 if all of the aliens are dead
+
+        Parameter rng: the random number generator to use
+        Precondition: rng has a randrange method (like the random module)
+        """
+        if not self._columns:
+            return -1
+        return self._columns[rng.randrange(len(self._columns))]
+
+    def crossed(self,line):
+        """
+        Returns: True if the bottom of a living alien is below line
+
+        Only the bottom most row with a living alien needs to be checked, since
+        every alien in a row has the same y coordinate.
+
+        Parameter line: the y coordinate of the line
+        Precondition: line is a number (int or float)
+        """
+        for r in range(len(self._rowMasks)-1,-1,-1):
+            if self._rowMasks[r]:
+                return float(self._y[r,0])-ALIEN_HEIGHT/2<line
+        return False
+
+    def box(self,row,col):
+        """
+        Returns: the box of the alien at (row,col) as a tuple (left,bottom,
+        right,top) of floats
+
+        Parameter row: the row of the alien
+        Precondition: row is a valid row index
+
+        Parameter col: the column of the alien
+        Precondition: col is a valid column index
+        """
+        x=float(self._x[row,col])
+        y=float(self._y[row,col])
+        return (x-ALIEN_WIDTH/2,y-ALIEN_HEIGHT/2,x+ALIEN_WIDTH/2,y+ALIEN_HEIGHT/2)
+
+    # METHOD TO DESTROY AN ALIEN
+    def kill(self,row,col):
+        """
+        Marks the alien at (row,col) as dead and updates the index.
+
+        Parameter row: the row of the alien
+        Precondition: row is a valid row index
+
+        Parameter col: the column of the alien
+        Precondition: col is a valid column index
+        """
+        bit=1<<col
+        if not self._rowMasks[row] & bit:
+            return
+        self._alive[row,col]=False
+        self._rowMasks[row]&=~bit
+        self._count-=1
+        if self.bottomRow(col)==-1:
+            self._columns.remove(col)
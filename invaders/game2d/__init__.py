@@ -4,13 +4,23 @@ A module to support simple 2D game development.
 This module is a simple wrapper around Kivy interfaces to make 2D game development
 simpler for students in CS 1110.
 
+The collision support does not use Kivy, so it lives in the module collide.py
+next to this package, where headless simulations can import it without importing
+Kivy.  It is also available from here.  Everything else needs Kivy.
+
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
-from .grectangle import GRectangle, GEllipse, GImage, GLabel
-from .gsprite import GSprite
-from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+import importlib.util
+
+from collide import GSpatialHash, swept_aabb, swept_bounds
+
+if importlib.util.find_spec('kivy') is not None:
+    from .gobject import GObject, GScene
+    from .grectangle import GRectangle, GEllipse, GImage, GLabel
+    from .gsprite import GSprite
+    from .gbatch import GSpriteBatch
+    from .gpath import GPath, GTriangle, GPolygon
+    from .gview import GInput, GView
+    from .sound import Sound, SoundLibrary
+    from .app import GameApp
@@ -34,7 +34,17 @@ class GameApp(kivy.app.App):
     goes in this method.
     
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
-    thing you should have in this method are calls to ``self.view.draw()``.
+    thing you should have in this method are calls to ``self.view.draw()``.  Objects
+    that stay on screen can instead be attached to the view once (see :class:`GView`).
+    
+    By default :meth:`update` is called once per animation frame with the time since 
+    the last frame.  If you set a ``timestep``, the game instead runs in fixed-timestep 
+    mode: :meth:`update` is called with exactly ``timestep`` seconds as many times as 
+    needed to catch up with the real time that has passed (but never more than 
+    ``max_substeps`` times in one frame).  The time left over is available as the 
+    fraction ``alpha`` of a step, so that :meth:`draw` can show objects part of the way 
+    between their last two positions.  This keeps the game speed the same no matter 
+    the frame rate of the display.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
@@ -63,7 +73,59 @@ class GameApp(kivy.app.App):
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
     
+    @property
+    def timestep(self):
+        """
+        The number of seconds per call to ``update`` in fixed-timestep mode
+        
+        If this value is None, the game is not in fixed-timestep mode, and ``update``
+        is called once per frame with the time since the last frame.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
+    @timestep.setter
+    def timestep(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._timestep = value
+        self._accumulator = 0.0
+        self._alpha = 1.0
+    
+    @property
+    def max_substeps(self):
+        """
+        The most calls to ``update`` in a single frame in fixed-timestep mode
+        
+        If the game falls further behind than this, the extra time is dropped so that
+        the game slows down instead of freezing while it tries to catch up.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._max_substeps
+    
+    @max_substeps.setter
+    def max_substeps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._max_substeps = value
+    
+    
     # IMMUTABLE PROPERTIES
+    @property
+    def alpha(self):
+        """
+        The fraction of a timestep that has passed since the last call to ``update``
+        
+        In fixed-timestep mode, objects should be drawn this fraction of the way from
+        their position before the last ``update`` to their position after it.  If the
+        game is not in fixed-timestep mode, this value is always 1.
+        
+        **Invariant**: Must be a float in the range 0..1.
+        """
+        return self._alpha
+    
     @property
     def width(self):
         """
@@ -102,10 +164,22 @@ class GameApp(kivy.app.App):
         Use this attribute to get information about the mouse and keyboard.  See the
         class :class:`GInput` for more information.
         
-        **Invariant**: Must be instance of :class:`GInput`
+        This attribute may be replaced by any object with the key methods of
+        :class:`GInput` (``is_key_down`` and ``key_count``), such as input played back
+        from a recording.  Replace it in ``start``, since the window creates a new
+        :class:`GInput` before the game starts.
+        
+        **Invariant**: Must be instance of :class:`GInput`, or an object with the same
+        key methods
         """
         return self._input
     
+    @input.setter
+    def input(self,value):
+        assert hasattr(value,'is_key_down') and hasattr(value,'key_count'), \
+            'value %s is not an input' % repr(value)
+        self._input = value
+    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -232,6 +306,8 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('timestep', None)
+        m = keywords.pop('max_substeps', 5)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
@@ -241,6 +317,8 @@ class GameApp(kivy.app.App):
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self.timestep = t
+        self.max_substeps = m
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -344,14 +422,30 @@ class GameApp(kivy.app.App):
         Processes a single animation frame.
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        important issues behind the scenes, particularly with clearing the window and
+        updating the objects attached to it.  In fixed-timestep mode, it calls `update`
+        once per whole timestep that has passed and sets `alpha` to the fraction of a
+        timestep left over.
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
         self.view.clear()
-        self.update(dt)
+        if self._timestep is None:
+            self.update(dt)
+        else:
+            self._accumulator += dt
+            steps = 0
+            while self._accumulator >= self._timestep and steps < self._max_substeps:
+                self.update(self._timestep)
+                self._accumulator -= self._timestep
+                steps += 1
+            if self._accumulator >= self._timestep:
+                # Too far behind; drop the whole steps we could not catch up
+                self._accumulator %= self._timestep
+            self._alpha = self._accumulator/self._timestep
         self.draw()
+        self.view._sync()
     
     def _setpaths(self):
         """
@@ -0,0 +1,342 @@
+"""
+A module to support drawing many copies of one image at once.
+
+A sprite batch draws any number of rectangles (sprites) that share one texture as a
+single Kivy mesh.  An image drawn with :class:`GImage` needs seven graphics instructions,
+so a screen full of them spends most of its time on instructions.  A sprite batch
+needs the same seven however many sprites it has, and moving a sprite only changes
+its four corners in the vertex buffer of the mesh.
+"""
+from array import array
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.clock import Clock
+from .gobject import GObject
+from .app import GameApp
+
+
+# #mark -
+class GSpriteBatch(GObject):
+    """
+    A class representing many sprites drawn from the same texture.
+
+    The texture is given by a JPEG, PNG, or GIF file whose name is stored in the
+    attribute `source`.  Image files should be stored in the **Images** directory so
+    that Kivy can find them without the complete path name.
+
+    Each sprite is a rectangle with its own center, size and region of the texture
+    (the whole texture by default).  Sprites are made with :meth:`add`, which returns
+    the index of the new sprite, and changed with :meth:`move`, :meth:`resize` and
+    :meth:`set_visible` using that index.  Sprites are drawn in the order of their
+    indices.  The sprite positions are relative to the batch, so the attributes ``x``,
+    ``y``, ``angle`` and ``scale`` of the batch move, turn and scale every sprite at
+    once.  If you define ``fillcolor``, every sprite is tinted by that color.  There
+    is no color per sprite: the vertices only hold a position and a texture
+    coordinate, since Kivy's default shader has no vertex color.  Sprites that need
+    different tints go in different batches.
+
+    Changes to the sprites are sent to the graphics card once per animation frame, no
+    matter how many sprites changed.  One batch holds at most :const:`MAX_SPRITES`
+    sprites.
+    """
+    # The floats per vertex (x, y, u, v) and per sprite (four corners)
+    _VERTEX = 4
+    _SPRITE = 16
+
+    # The most sprites a mesh can index
+    MAX_SPRITES = 16384
+
+    # MUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of sprites in this batch, including hidden ones.
+        
+        **invariant**. Value is an int >= 0.
+        """
+        return len(self._visible)-len(self._free)
+    
+    @property
+    def source(self):
+        """
+        The source file for the texture of the sprites.
+
+        **invariant**. Value is a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        assert value is None or GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        if self._defined:
+            self._reset()
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new sprite batch with no sprites.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to draw
+        sprites from the image ``alien1.png``, use the constructor::
+
+            GSpriteBatch(source='alien1.png')
+
+        This class supports the all same keywords as :class:`GObject`; the only new
+        keyword is ``source``.  See the documentation of :class:`GObject` for the other
+        supported keywords.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self.source   = keywords['source'] if 'source' in keywords else None
+        self._boxes   = array('f')
+        self._regions = []
+        self._visible = []
+        self._free    = []
+        self._vertices = array('f')
+        self._indices  = array('H')
+        self._texture = None
+        self._mesh    = None
+        self._dirty   = False
+        self._grown   = False
+        self._trigger = Clock.create_trigger(self._flush,-1)
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def add(self,x,y,width,height,region=None):
+        """
+        Adds a new sprite to this batch.
+
+        The sprite reuses the index of a removed sprite if there is one.
+
+        :param x: the horizontal coordinate of the sprite center
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical coordinate of the sprite center
+        :type y:  ``int`` or ``float``
+
+        :param width: the width of the sprite
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: the height of the sprite
+        :type height:  ``int`` or ``float`` > 0
+
+        :param region: the pixel rectangle (left, bottom, width, height) of the texture
+            to show, or None for the whole texture
+        :type region:  4-element tuple of ints or None
+
+        :return: the index of the new sprite
+        :rtype:  ``int``
+        """
+        assert type(width) in [int,float] and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) in [int,float] and height > 0, '%s is not a valid height' % repr(height)
+        assert region is None or (type(region) == tuple and len(region) == 4), \
+                '%s is not a valid region' % repr(region)
+        if self._free:
+            index = self._free.pop()
+            self._boxes[4*index:4*index+4] = array('f',(x,y,width,height))
+            self._regions[index] = region
+            self._visible[index] = True
+        else:
+            assert len(self._visible) < self.MAX_SPRITES, 'this batch is full'
+            index = len(self._visible)
+            self._boxes.extend((x,y,width,height))
+            self._regions.append(region)
+            self._visible.append(True)
+            self._vertices.extend([0.0]*self._SPRITE)
+            first = 4*index
+            self._indices.extend((first,first+1,first+2,first+2,first+3,first))
+            self._grown = True
+        self._texcoords(index)
+        self._place(index)
+        return index
+
+    def move(self,index,x,y):
+        """
+        Moves the center of a sprite to (x,y).
+
+        :param index: the sprite to move
+        :type index:  ``int`` returned by :meth:`add`
+
+        :param x: the new horizontal coordinate of the sprite center
+        :type x:  ``int`` or ``float``
+
+        :param y: the new vertical coordinate of the sprite center
+        :type y:  ``int`` or ``float``
+        """
+        self._boxes[4*index]   = x
+        self._boxes[4*index+1] = y
+        self._place(index)
+
+    def resize(self,index,width,height):
+        """
+        Changes the size of a sprite, keeping its center.
+
+        :param index: the sprite to resize
+        :type index:  ``int`` returned by :meth:`add`
+
+        :param width: the new width of the sprite
+        :type width:  ``int`` or ``float`` > 0
+
+        :param height: the new height of the sprite
+        :type height:  ``int`` or ``float`` > 0
+        """
+        assert type(width) in [int,float] and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) in [int,float] and height > 0, '%s is not a valid height' % repr(height)
+        self._boxes[4*index+2] = width
+        self._boxes[4*index+3] = height
+        self._place(index)
+
+    def is_visible(self,index):
+        """
+        :return: True if the sprite is shown
+        :rtype:  ``bool``
+
+        :param index: the sprite to check
+        :type index:  ``int`` returned by :meth:`add`
+        """
+        return self._visible[index]
+
+    def set_visible(self,index,visible):
+        """
+        Shows or hides a sprite.
+
+        A hidden sprite keeps its index, position and size, and can still be moved.
+
+        :param index: the sprite to show or hide
+        :type index:  ``int`` returned by :meth:`add`
+
+        :param visible: whether to show the sprite
+        :type visible:  ``bool``
+        """
+        if self._visible[index] != visible:
+            self._visible[index] = visible
+            self._place(index)
+
+    def remove(self,index):
+        """
+        Removes a sprite from this batch.
+
+        The index of the sprite may be given to the next sprite added.
+
+        :param index: the sprite to remove
+        :type index:  ``int`` returned by :meth:`add`
+        """
+        self.set_visible(index,False)
+        self._free.append(index)
+
+    def clear(self):
+        """
+        Removes every sprite from this batch.
+        """
+        del self._boxes[:]
+        del self._vertices[:]
+        del self._indices[:]
+        self._regions = []
+        self._visible = []
+        self._free = []
+        self._grown = True
+        self._changed()
+
+
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        self._texture = None if self._source is None else GameApp.load_texture(self._source)
+        for index in range(len(self._visible)):
+            self._texcoords(index)
+        self._mesh = Mesh(vertices=self._vertices,indices=self._indices,
+                          mode='triangles',texture=self._texture)
+        self._dirty = False
+        self._grown = False
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
+
+    def _texcoords(self,index):
+        """
+        Writes the texture coordinates of the corners of a sprite to the vertex buffer.
+
+        Parameter index: the sprite
+        Precondition: index is a valid sprite index
+        """
+        if self._texture is None:
+            coords = (0.0,0.0,1.0,0.0,1.0,1.0,0.0,1.0)
+        elif self._regions[index] is None:
+            coords = self._texture.tex_coords
+        else:
+            coords = self._texture.get_region(*self._regions[index]).tex_coords
+        pos = self._SPRITE*index+2
+        for corner in range(4):
+            self._vertices[pos]   = coords[2*corner]
+            self._vertices[pos+1] = coords[2*corner+1]
+            pos += self._VERTEX
+        self._changed()
+
+    def _place(self,index):
+        """
+        Writes the positions of the corners of a sprite to the vertex buffer.
+
+        The corners of a hidden sprite are all put at its center, so it has no area.
+
+        Parameter index: the sprite
+        Precondition: index is a valid sprite index
+        """
+        x, y, w, h = self._boxes[4*index:4*index+4]
+        if not self._visible[index]:
+            w = h = 0.0
+        left  = x-w/2.0
+        right = x+w/2.0
+        bottom = y-h/2.0
+        top    = y+h/2.0
+        v = self._vertices
+        pos = self._SPRITE*index
+        v[pos]    = left
+        v[pos+1]  = bottom
+        v[pos+4]  = right
+        v[pos+5]  = bottom
+        v[pos+8]  = right
+        v[pos+9]  = top
+        v[pos+12] = left
+        v[pos+13] = top
+        self._changed()
+
+    def _changed(self):
+        """
+        Schedules the vertex buffer to be sent to the mesh before the next frame.
+        """
+        if not self._dirty:
+            self._dirty = True
+            self._trigger()
+
+    def _flush(self,dt=None):
+        """
+        Sends the vertex buffer (and the indices, if sprites were added) to the mesh.
+
+        This method is called by the Kivy clock before the frame is drawn, once for all
+        of the changes made in that frame.
+
+        :param dt: time in seconds since it was scheduled (ignored)
+        :type dt:  ``int`` or ``float``
+        """
+        if self._mesh is None:
+            return
+        if self._grown:
+            self._mesh.indices = self._indices
+            self._grown = False
+        if self._dirty:
+            self._mesh.vertices = self._vertices
+            self._dirty = False
@@ -319,6 +319,13 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every 
     animation frame, as the game is constantly clearing the window.
     
+    Alternatively, you can :meth:`attach` an object once.  An attached object stays
+    on the screen, showing its current position and settings, until you :meth:`detach`
+    it.  The window is not cleared of attached objects, so drawing many objects that
+    stay on screen this way is much faster than drawing them again every frame.
+    Attached objects are drawn in the order they were attached, underneath anything
+    drawn with :meth:`draw`.  Do not both attach and draw the same object.
+    
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should 
     only use the one provided in the `view` attribute of :class:`GameApp`. 
@@ -337,6 +344,8 @@ class GView(FloatLayout):
         """
         FloatLayout.__init__(self)
         self._frame = InstructionGroup()
+        self._retained = InstructionGroup()
+        self._attached = {}
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
@@ -364,8 +373,75 @@ class GView(FloatLayout):
         """
         self._frame.clear()
     
+    def attach(self,obj):
+        """
+        Adds the given object to the view until it is detached.
+        
+        An attached object does not need to be drawn every animation frame.  It is drawn
+        after any object attached before it.  Attaching an object that is already 
+        attached does nothing, so it is safe to attach an object every frame.
+        
+        :param obj: the object to attach
+        :type obj:  :class:`GObject`
+        """
+        if obj in self._attached:
+            return
+        try:
+            cache = obj._cache
+        except:
+            raise IOError('Cannot attach %s since it was not initialized properly' % repr(obj))
+        self._attached[obj] = cache
+        self._retained.add(cache)
+    
+    def detach(self,obj):
+        """
+        Removes the given object from the view.
+        
+        Detaching an object that is not attached does nothing.
+        
+        :param obj: the object to detach
+        :type obj:  :class:`GObject`
+        """
+        cache = self._attached.pop(obj,None)
+        if not cache is None:
+            self._retained.remove(cache)
+    
+    def detach_all(self):
+        """
+        Removes every attached object from the view.
+        """
+        self._attached.clear()
+        self._retained.clear()
+    
+    def is_attached(self,obj):
+        """
+        :return: True if the given object is attached to this view
+        :rtype:  ``bool``
+        
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+        """
+        return obj in self._attached
+    
     
     # HIDDEN METHODS
+    def _sync(self):
+        """
+        Updates the instructions of the attached objects that changed.
+        
+        Changes to the position, size or angle of an object change its Kivy instructions
+        in place.  Other changes (like the color or the text) rebuild its drawing cache.
+        This method swaps the new cache in for the old one, in the same place, for just
+        the objects whose cache was rebuilt.  It is called for you at the end of every
+        animation frame.
+        """
+        for obj, cache in self._attached.items():
+            if not obj._cache is cache:
+                pos = self._retained.indexof(cache)
+                self._retained.remove(cache)
+                self._retained.insert(pos,obj._cache)
+                self._attached[obj] = obj._cache
+    
     def _reset(self,obj=None,value=None):
         """
         Resets the view canvas in response to a resizing event
@@ -375,4 +451,5 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        self.canvas.add(self._retained)
         self.canvas.add(self._frame)
@@ -0,0 +1,188 @@
+"""
+Wave history module for Alien Invaders
+
+This module contains History, a ring buffer of packed WaveSim states (see
+WaveSim.pack) that is filled as a wave is played.  It keeps as many of the
+latest states as fit in a memory budget, dropping the oldest, so that a wave
+can be stepped back and forth through its recent past.  Invaders uses it for
+its debug history mode (press 'h' during a wave).
+
+A packed wave is a few hundred bytes and takes a few microseconds to make, so
+the history can be kept on every frame.  The state of the random number
+generator is kept separately, and only when it has changed, since it is larger
+than the rest of the wave and only changes when an alien fires.
+"""
+from consts import *
+import array
+import collections
+
+
+class History(object):
+    """
+    A class to keep the latest states of a wave within a memory budget.
+
+    Each entry is a list [frame,data,rng,cost]: the number of the frame the
+    state was saved after, the packed wave, the random number state as a tuple
+    (version,bytes,gauss) with the internal state packed into bytes (shared by
+    entries with the same state) and the bytes the entry is charged for.  The
+    random number state is charged to the oldest entry that holds it.  Entries
+    are numbered from 0 (the oldest) to len(history)-1.
+
+    INSTANCE ATTRIBUTES:
+        _budget:  the most bytes of packed states to keep [int > 0]
+        _every:   the number of frames between saved states [int > 0]
+        _entries: the saved states, oldest first [deque of list]
+        _size:    the bytes charged to the entries [int >= 0]
+        _frame:   the number of frames recorded [int >= 0]
+        _cursor:  the entry last restored by seek, or -1 [int]
+        _rng:     the last random number state saved, and its packed form
+                  [tuple (state,packed), or None]
+    """
+
+    # GETTERS
+    def getBudget(self):
+        """
+        Returns: the most bytes of packed states to keep
+        """
+        return self._budget
+
+    def getEvery(self):
+        """
+        Returns: the number of frames between saved states
+        """
+        return self._every
+
+    def getSize(self):
+        """
+        Returns: the bytes used by the saved states
+        """
+        return self._size
+
+    def getFrame(self):
+        """
+        Returns: the number of frames recorded since the wave started
+        """
+        return self._frame
+
+    def getCursor(self):
+        """
+        Returns: the entry last restored by seek, or -1 if there is none
+        """
+        return self._cursor
+
+    def getEntryFrame(self,index):
+        """
+        Returns: the frame the state in entry index was saved after
+
+        Parameter index: the entry
+        Precondition: index is an int in 0..len(self)-1
+        """
+        return self._entries[index][0]
+
+    def __len__(self):
+        """
+        Returns: the number of saved states
+        """
+        return len(self._entries)
+
+    # INITIALIZER
+    def __init__(self,budget=HISTORY_BUDGET,every=HISTORY_EVERY):
+        """
+        Initializer: creates an empty history
+
+        Parameter budget: the most bytes of packed states to keep
+        Precondition: budget is an int > 0
+
+        Parameter every: the number of frames between saved states
+        Precondition: every is an int > 0
+        """
+        assert type(budget)==int and budget>0, '%s is not a valid budget' % repr(budget)
+        assert type(every)==int and every>0, '%s is not a valid interval' % repr(every)
+        self._budget=budget
+        self._every=every
+        self._entries=collections.deque()
+        self._size=0
+        self._frame=0
+        self._cursor=-1
+        self._rng=None
+
+    # METHODS TO SAVE AND RESTORE STATES
+    def clear(self):
+        """
+        Removes every saved state and starts counting frames from 0
+        """
+        self._entries.clear()
+        self._size=0
+        self._frame=0
+        self._cursor=-1
+        self._rng=None
+
+    def record(self,sim):
+        """
+        Counts a frame of sim, and saves its state if it is a frame to save.
+        Call this after every update of the wave.
+
+        Parameter sim: the wave
+        Precondition: sim is a WaveSim
+        """
+        self._frame+=1
+        if (self._frame-1)%self._every:
+            return
+        data=sim.pack()
+        cost=len(data)
+        state=sim.getRandomState()
+        if self._rng is None or self._rng[0]!=state:
+            self._rng=(state,(state[0],array.array('I',state[1]).tobytes(),
+                              state[2]))
+            cost+=len(self._rng[1][1])
+        self._entries.append([self._frame,data,self._rng[1],cost])
+        self._size+=cost
+        self._cursor=-1
+        while self._size>self._budget and len(self._entries)>1:
+            self._drop()
+
+    def seek(self,sim,index):
+        """
+        Returns: the frame of the state restored
+
+        Puts sim back in the state saved in entry index.  The entries after it
+        are kept, so seek can move forward again, until resume is called.
+
+        Parameter sim: the wave to restore
+        Precondition: sim is the WaveSim the states were recorded from
+
+        Parameter index: the entry to restore
+        Precondition: index is an int in 0..len(self)-1
+        """
+        frame,data,rng,cost=self._entries[index]
+        sim.unpack(data)
+        sim.setRandomState((rng[0],tuple(array.array('I',rng[1])),rng[2]))
+        self._cursor=index
+        return frame
+
+    def resume(self):
+        """
+        Removes the states after the one last restored by seek, so the wave can
+        be played on from it.  Nothing happens if nothing has been restored.
+        """
+        if self._cursor<0:
+            return
+        while len(self._entries)>self._cursor+1:
+            self._size-=self._entries.pop()[3]
+        self._frame=self._entries[-1][0]
+        self._rng=None
+        self._cursor=-1
+
+    # HELPER METHODS
+    def _drop(self):
+        """
+        removes the oldest entry, moving the charge for its random number state
+        to the next entry if that entry shares it
+        """
+        frame,data,rng,cost=self._entries.popleft()
+        self._size-=cost
+        if self._entries and self._entries[0][2] is rng:
+            self._entries[0][3]+=len(rng[1])
+            self._size+=len(rng[1])
+        if self._cursor>=0:
+            self._cursor=max(self._cursor-1,0)
@@ -12,10 +12,11 @@ screen. You only need a new class when you add extra features to an object.
 So technically Bolt, which has a velocity, is really the only model that needs
 to have its own class.
 
-With that said, we have included the subclasses for Ship and Aliens.  That is
-because there are a lot of constants in consts.py for initializing the objects,
-and you might want to add a custom initializer.  With that said, feel free to
-keep the pass underneath the class definitions if you do not want to do that.
+With that said, we have included the subclass for Ship.  That is because there
+are a lot of constants in consts.py for initializing the object, and you might
+want to add a custom initializer.  There is no Alien class: the aliens are
+sprites in a GSpriteBatch (see Wave), and their positions and collisions are
+worked out in formation.py and sim.py.
 
 You are free to add even more models to this module.  You may wish to do this
 when you add new features to your game, such as power-ups.  If you are unsure
@@ -25,10 +26,11 @@ about whether to make a new class or not, please ask on Piazza.
 # 12/3/17
 """
 from consts import *
+from config import *
 from game2d import *
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than
-# consts.py.  If you need extra information from Gameplay, then it should be
+# consts.py (and the settings in config.py).  If you need extra information from Gameplay, then it should be
 # a parameter in your method, and Wave should pass it as a argument when it
 # calls the method.
 
@@ -59,39 +61,47 @@ class Ship(GImage):
     list them below.
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    _movement: the number of pixels the ship moves per update
+                [int or float > 0]
     """
     pass
     
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     
     # INITIALIZER TO CREATE A NEW SHIP
-    def __init__(self):
+    def __init__(self,config=None):
         """
         Initializer: Creates a ship cenetered in the middle of the screen
         with bottom a distance SHIP_BOTTOM from the bottom of the window.
         ship is a GImage and its source is ship.png
+        
+        Parameter config: the settings of the wave, or None for the defaults
+        Precondition: config is None or a WaveConfig
         """
+        if config is None:
+            config=WaveConfig()
         xx=GAME_WIDTH/2
         yy=SHIP_BOTTOM+SHIP_HEIGHT/2
         super().__init__(
             x=xx, y=yy, width=SHIP_WIDTH, height=SHIP_HEIGHT, source=SHIP_IMAGE)
+        self._movement=config.getShipMovement()
            
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
     def _moveShipLeft(self):
         """animates the ship moving it to the left
-        the ship's x position is moved SHIP_MOVEMENT to the left,
+        the ship's x position is moved _movement to the left,
         this method is called when the user presses the left arrow"""
-        if(self.left-SHIP_MOVEMENT>=0):
-            self.x=self.x-SHIP_MOVEMENT
+        if(self.left-self._movement>=0):
+            self.x=self.x-self._movement
         else:
             self.left=0
          
     def _moveShipRight(self):
         """animates the ship moving it to the right
-        the ship's x position is moved SHIP_MOVEMENT to the right,
+        the ship's x position is moved _movement to the right,
         this method is called when the user presses the right arrow"""
-        if(self.right+SHIP_MOVEMENT<=GAME_WIDTH):
-            self.x=self.x+SHIP_MOVEMENT
+        if(self.right+self._movement<=GAME_WIDTH):
+            self.x=self.x+self._movement
         else:
             self.right=GAME_WIDTH
             
@@ -123,76 +133,6 @@ class Ship(GImage):
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
-class Alien(GImage):
-    """
-    A class to represent a single alien.
-    
-    At the very least, you want a __init__ method to initialize the alien
-    dimensions.
-    These dimensions are all specified in consts.py.
-    
-    You also MIGHT want to add code to detect a collision with a bolt. We do not
-    require this.  You could put this method in Wave if you wanted to.  But the
-    advantage of putting it here is that Ships and Aliens collide with different
-    bolts.  Ships collide with Alien bolts, not Ship bolts.  And Aliens collide
-    with Ship bolts, not Alien bolts. An easy way to keep this straight is for
-    this class to have its own collision method.
-    
-    However, there is no need for any more attributes other than those inherited
-    by GImage. You would only add attributes if you needed them for extra gameplay
-    features (like giving each alien a score value). If you add attributes, list
-    them below.
-    
-    LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-    """
-    
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    
-    # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self,xx,yy,sourc):
-        """
-        Initializer: Creates an Alien with the given coordinates, width and
-        height.
-        
-        parameter: xx and yy are the coordinates of the center of the image
-        precondition: xx and yy are numbers(int or float) >=0 and xx<width
-        of screen and yy<height of screen
-        
-        parameter: sourc is the image
-        precondition: string
-        """
-        super().__init__(x=xx, y=yy, width=ALIEN_WIDTH,
-                         height=ALIEN_HEIGHT, source=sourc)
-        
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,bolt):
-        """
-        Checks to see was fired by the ship and collided with an alien
-        
-        Returns: True if the bolt was fired by the player and collides with
-        this alien
-            
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        lefttop=(bolt.left,bolt.top)
-        righttop=(bolt.right,bolt.top)
-        rightbot=(bolt.right, bolt.bottom)
-        leftbottom=(bolt.left,bolt.bottom)
-        center=(bolt.x,bolt.y)
-        if (self.contains(lefttop) or self.contains(righttop)and bolt.getVel()>0):
-            return True
-        if(self.contains(leftbottom
-                         ) or self.contains(rightbot
-                                            ) and bolt.getVel()>0):
-            return True
-        if(self.contains(center)and bolt.getVel()>0):
-            return True
-        return False
-    
-    # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
-
-
 class Bolt(GRectangle):
     """
     A class representing a laser bolt.
@@ -218,6 +158,7 @@ class Bolt(GRectangle):
         _velocity: The velocity in y direction [int or float]
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    _speed: the number of pixels the bolt moves per update [int or float > 0]
     """
     
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
@@ -228,7 +169,7 @@ class Bolt(GRectangle):
         return self._velocity
     
     # INITIALIZER TO SET THE VELOCITY
-    def __init__(self,xx,yy,direction='up'):
+    def __init__(self,xx,yy,direction='up',config=None):
         """
         Initializer: Creates a bolt at position xx,yy with width=bolt_width,
         height=bolt_height, fillcolor bolt_fillcolor, and line color
@@ -238,20 +179,106 @@ class Bolt(GRectangle):
         Parameter xx: number(int or float) - indicated x posisiton
         Parameter yy: number (int or float) indicates y position
         Parameter direction: string - indicates direciton of travel
+        Parameter config: WaveConfig or None - the settings of the wave (None
+        for the defaults)
         """
         super().__init__(x=xx, y=yy, width=BOLT_WIDTH,
                          height=BOLT_HEIGHT,fillcolor=BOLT_FILLCOLOR,
                          linecolor=BOLT_LINECOLOR, linewidth=1)
+        if config is None:
+            config=WaveConfig()
+        self._speed=config.getBoltSpeed()
         if(direction=='up'):
-            self._velocity=BOLT_SPEED
+            self._velocity=self._speed
         elif(direction=='down'):
-            self._velocity=-BOLT_SPEED
+            self._velocity=-self._speed
             
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
+    def reset(self,xx,yy,direction='up'):
+        """
+        Moves the bolt to xx,yy and sets its velocity from direction, so that
+        a bolt that has left the screen can be fired again. Nothing else about
+        the bolt changes, so no new drawing instructions are made.
+        
+        Parameter xx: number(int or float) - indicated x posisiton
+        Parameter yy: number (int or float) indicates y position
+        Parameter direction: string - indicates direciton of travel
+        """
+        self.x=xx
+        self.y=yy
+        if(direction=='up'):
+            self._velocity=self._speed
+        elif(direction=='down'):
+            self._velocity=-self._speed
+        
     def _moveBolt(self):
         """moves bolt up the screen at _velocity,
         the bolt's y position is adjusted by _velocity"""
         self.y=self.y+self._velocity
         
         
-# IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
\ No newline at end of file
+# IF YOU NEED ADDITIONAL MODEL CLASSES, THEY GO HERE
+
+
+class BoltPool(object):
+    """
+    A class to recycle Bolt objects.
+    
+    Creating a Bolt parses its colors and makes new Kivy drawing instructions,
+    and every shot used to make a new one.  A pool makes its bolts once and
+    hands them out again with reset, so firing does not allocate anything while
+    the number of bolts on screen stays under the pool's capacity.  If the pool
+    is empty, acquire makes a new Bolt, and release keeps it only if there is
+    room.
+    
+    INSTANCE ATTRIBUTES:
+        _free:     the bolts ready to be handed out [list of Bolt]
+        _capacity: the most bolts the pool keeps [int > 0]
+        _config:   the settings of the wave the bolts are made for [WaveConfig]
+    """
+    
+    # INITIALIZER TO MAKE THE BOLTS
+    def __init__(self,capacity=BOLT_POOL_SIZE,config=None):
+        """
+        Initializer: Creates a pool holding capacity bolts
+        
+        Parameter capacity: the most bolts the pool keeps
+        Precondition: capacity is an int > 0
+        
+        Parameter config: the settings of the wave, or None for the defaults
+        Precondition: config is None or a WaveConfig
+        """
+        assert type(capacity)==int and capacity>0, 'capacity is not an int > 0'
+        if config is None:
+            config=WaveConfig()
+        self._capacity=capacity
+        self._config=config
+        self._free=[]
+        for i in range(capacity):
+            self._free.append(Bolt(0,0,'up',config))
+    
+    # METHODS TO HAND OUT AND RETURN BOLTS
+    def acquire(self,xx,yy,direction='up'):
+        """
+        Returns: a bolt at position xx,yy traveling in direction, reusing a
+        bolt from the pool if there is one
+        
+        Parameter xx: number(int or float) - indicated x posisiton
+        Parameter yy: number (int or float) indicates y position
+        Parameter direction: string - indicates direciton of travel
+        """
+        if(len(self._free)>0):
+            bolt=self._free.pop()
+            bolt.reset(xx,yy,direction)
+            return bolt
+        return Bolt(xx,yy,direction,self._config)
+    
+    def release(self,bolt):
+        """
+        Returns a bolt that is no longer on screen to the pool
+        
+        Parameter bolt: the bolt to return
+        Precondition: bolt is a Bolt that is no longer drawn
+        """
+        if(len(self._free)<self._capacity):
+            self._free.append(bolt)
@@ -0,0 +1,186 @@
+"""
+Raster observation module for Alien Invaders
+
+This module turns the state of a WaveSim into small uint8 NumPy grids that can
+be given to an agent in place of a screenshot.  Rasterizer draws the aliens,
+bolts, ship and defense line as filled rectangles using the sizes in
+consts.py, and semantic gives one cell per alien slot.
+
+Both write into an array given by the caller, so nothing needs to be allocated
+on each frame.  Nothing here uses Kivy; to observe a Wave, pass it
+Wave.getSim().
+"""
+from consts import *
+import math
+import numpy as np
+
+
+def semantic(sim,out=None):
+    """
+    Returns: a rows x cols uint8 map of the formation of sim, where each cell is
+    0 if its alien is dead, or 1 plus the index in ALIEN_IMAGES of its image if
+    it is alive
+
+    Parameter sim: the wave to observe
+    Precondition: sim is a WaveSim
+
+    Parameter out: the array to write into, or None to make a new one
+    Precondition: out is None or a rows x cols array of uint8
+    """
+    formation=sim.getAliens()
+    if out is None:
+        out=np.empty(formation.getShape(),dtype=np.uint8)
+    out.fill(0)
+    np.add(formation.getType(),1,out=out,where=formation.getAlive(),
+           casting='unsafe')
+    return out
+
+
+class Rasterizer(object):
+    """
+    A class to draw a wave into a small grid of cells.
+
+    The game window is scaled to the grid, with row 0 of the grid at the top of
+    the window.  Each object is drawn as the cells its rectangle covers, with
+    at least one cell so that thin bolts do not disappear.  The cell values are
+    the RASTER_* constants in consts.py; aliens are drawn last, so they are on
+    top.
+
+    INSTANCE ATTRIBUTES:
+        _width:  the number of columns in the grid [int > 0]
+        _height: the number of rows in the grid [int > 0]
+        _scaleX: the number of columns per pixel [float > 0]
+        _scaleY: the number of rows per pixel [float > 0]
+        _spans:  the first and stop column of each column of aliens, reused by
+                 every call of draw [list of 2*_MAX_COLS ints]
+    """
+
+    # the most aliens in a row (see WaveConfig)
+    _MAX_COLS=15
+
+    # GETTERS
+    def getShape(self):
+        """
+        Returns: the size of the grid as a (height,width) tuple
+        """
+        return (self._height,self._width)
+
+    # INITIALIZER
+    def __init__(self,width=RASTER_WIDTH,height=RASTER_HEIGHT):
+        """
+        Initializer: creates a rasterizer for a grid of the given size
+
+        Parameter width: the number of columns in the grid
+        Precondition: width is an int > 0
+
+        Parameter height: the number of rows in the grid
+        Precondition: height is an int > 0
+        """
+        assert type(width)==int and width>0, '%s is not a valid width' % repr(width)
+        assert type(height)==int and height>0, \
+            '%s is not a valid height' % repr(height)
+        self._width=width
+        self._height=height
+        self._scaleX=width/GAME_WIDTH
+        self._scaleY=height/GAME_HEIGHT
+        self._spans=[0]*(2*self._MAX_COLS)
+
+    # METHODS TO DRAW
+    def draw(self,sim,out=None):
+        """
+        Returns: the grid with the wave drawn in it
+
+        Parameter sim: the wave to draw
+        Precondition: sim is a WaveSim
+
+        Parameter out: the array to draw into, or None to make a new one
+        Precondition: out is None or an array of uint8 with shape getShape()
+        """
+        if out is None:
+            out=np.empty((self._height,self._width),dtype=np.uint8)
+        assert out.shape==(self._height,self._width) and out.dtype==np.uint8, \
+            'the grid does not match this rasterizer'
+        out.fill(0)
+        self._fill(out,0,DEFENSE_LINE-LINEWIDTH/2,GAME_WIDTH,
+                   DEFENSE_LINE+LINEWIDTH/2,RASTER_DLINE)
+        bolts=sim.getBolts()
+        for bolt in bolts.getAliens():
+            self._fill(out,bolt.left,bolt.bottom,bolt.right,bolt.top,
+                       RASTER_ALIEN_BOLT)
+        bolt=bolts.getPlayer()
+        if bolt is not None:
+            self._fill(out,bolt.left,bolt.bottom,bolt.right,bolt.top,
+                       RASTER_PLAYER_BOLT)
+        ship=sim.getShip()
+        if ship is not None:
+            self._fill(out,ship.left,ship.bottom,ship.right,ship.top,RASTER_SHIP)
+        self._drawAliens(out,sim.getAliens())
+        return out
+
+    # HELPER METHODS
+    def _drawAliens(self,out,formation):
+        """
+        draws every living alien of formation into out.  every alien in a row
+        has the same y coordinate and every alien in a column has the same x
+        coordinate, so the cells are found once per row and once per column
+
+        Parameter out: the grid to draw into
+        Precondition: out is an array of uint8 with shape getShape()
+
+        Parameter formation: the aliens to draw
+        Precondition: formation is a Formation
+        """
+        xs=formation.getX()
+        ys=formation.getY()
+        alive=formation.getAlive()
+        rows,cols=formation.getShape()
+        spans=self._spans
+        for c in range(cols):
+            spans[2*c],spans[2*c+1]=self._columns(float(xs[0,c])-ALIEN_WIDTH/2,
+                                                  float(xs[0,c])+ALIEN_WIDTH/2)
+        for r in range(rows):
+            r0,r1=self._rows(float(ys[r,0])-ALIEN_HEIGHT/2,
+                             float(ys[r,0])+ALIEN_HEIGHT/2)
+            if r0>=r1:
+                continue
+            line=alive[r]
+            for c in range(cols):
+                if line[c]:
+                    out[r0:r1,spans[2*c]:spans[2*c+1]]=RASTER_ALIEN
+
+    def _fill(self,out,left,bottom,right,top,value):
+        """
+        sets the cells of out covered by a rectangle to value
+
+        Parameter out: the grid to draw into
+        Precondition: out is an array of uint8 with shape getShape()
+
+        Parameter left,bottom,right,top: the edges of the rectangle, in pixels
+        Precondition: they are numbers, with left <= right and bottom <= top
+
+        Parameter value: the value to draw
+        Precondition: value is an int in 0..255
+        """
+        r0,r1=self._rows(bottom,top)
+        c0,c1=self._columns(left,right)
+        out[r0:r1,c0:c1]=value
+
+    def _columns(self,left,right):
+        """
+        Returns: the range of columns (start,stop) covered by the pixels from
+        left to right, clipped to the grid and at least one column wide unless
+        it is off the grid
+        """
+        c0=math.floor(left*self._scaleX)
+        c1=max(c0+1,math.ceil(right*self._scaleX))
+        return (min(max(c0,0),self._width),min(max(c1,0),self._width))
+
+    def _rows(self,bottom,top):
+        """
+        Returns: the range of rows (start,stop) covered by the pixels from
+        bottom to top, clipped to the grid and at least one row high unless it
+        is off the grid
+        """
+        r0=math.floor((GAME_HEIGHT-top)*self._scaleY)
+        r1=max(r0+1,math.ceil((GAME_HEIGHT-bottom)*self._scaleY))
+        return (min(max(r0,0),self._height),min(max(r1,0),self._height))
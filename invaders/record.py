@@ -0,0 +1,560 @@
+"""
+Input recording module for Alien Invaders
+
+This module records the keys that Invaders reads on every update, with the
+time step and the seed of the game, so that a game can be played back exactly.
+InputRecording holds a recording and reads and writes it as a small binary
+file.  InputPlayer plays a recording back through FakeInput, an object with
+the key methods of GInput, either inside the running game (in real time) or
+by calling update directly as fast as possible.  A recording can also hold a
+checksum of the wave after every few updates (see WaveSim.checksum), so that a
+replay can tell where the game stopped playing out the same (see replay.py).
+
+A recording is stored as runs of frames with the same input, so a key held
+down for a second costs a few bytes, not sixty frames.  The time step is only
+stored when it changes, so a game in fixed-timestep mode stores it once.  An
+hour of play is usually a few kilobytes.  Checksums cannot be compressed, so
+they add 4 bytes for each checked frame.  By default one frame in
+RECORD_CHECKSUM_EVERY is checked, which finds a replay that went wrong to
+within a second; checking every frame makes the checksums most of the file.
+
+The file is the bytes b'INVR', a version byte, the number of recorded keys and
+their names, the seed, the number of frames between checksums (0 for none),
+the wave settings (rows, aliens per row and the seconds between alien steps
+as a little-endian double), the number of checksums and the checksums (each 4
+bytes, little-endian), followed by one record for each run:
+
+    varint  frames*2 + 1 if the time step changed at this run (else + 0)
+    varint  the keys held down, as a bitmask over the recorded keys
+    varint  the value of key_count
+    double  the new time step (only if it changed)
+
+Integers are unsigned LEB128 varints; the seed is zigzag encoded first, since
+it may be negative.  Recordings from before version 3 have no wave settings,
+and are read with the defaults in consts.py.  Nothing here uses Kivy.
+"""
+from consts import *
+from config import *
+import array
+import struct
+import sys
+import time
+
+# the first bytes of a recording file
+RECORD_MAGIC = b'INVR'
+# the version of the file format
+RECORD_VERSION = 3
+
+
+def _putVarint(out,value):
+    """
+    appends value to out as an unsigned LEB128 varint
+
+    Parameter out: the bytes to append to
+    Precondition: out is a bytearray
+
+    Parameter value: the value to append
+    Precondition: value is an int >= 0
+    """
+    while value>=0x80:
+        out.append((value&0x7F)|0x80)
+        value>>=7
+    out.append(value)
+
+
+def _getVarint(data,pos):
+    """
+    Returns: a tuple (value,pos) with the varint in data at pos and the position
+    after it
+
+    Parameter data: the bytes to read from
+    Precondition: data is a bytes object
+
+    Parameter pos: the position of the varint
+    Precondition: pos is an int >= 0
+    """
+    value=0
+    shift=0
+    while True:
+        if pos>=len(data):
+            raise ValueError('the recording ends in the middle of a number')
+        byte=data[pos]
+        pos=pos+1
+        value|=(byte&0x7F)<<shift
+        if byte<0x80:
+            return (value,pos)
+        shift=shift+7
+
+
+class InputRecording(object):
+    """
+    A class to hold the input of a game, one state of the keys per update.
+
+    Each run is a list [frames,mask,count,dt]: the number of updates in a row
+    that had the keys in mask held down, key_count equal to count and the time
+    step dt.  Bit i of mask is the key getKeys()[i].
+
+    Checksum i is the checksum after frame i*getEvery() (frames count from 0).
+
+    The wave settings are the ones that can be given on the command line (see
+    consts.py).  Every wave of the game starts from them, with the speed
+    changed by the number of waves won (see Invaders.update).
+
+    INSTANCE ATTRIBUTES:
+        _seed:   the seed of the game [int]
+        _config: the wave settings of the game [WaveConfig]
+        _keys:   the names of the recorded keys [tuple of str]
+        _every:  the number of frames between checksums, or 0 if there are
+                 none [int >= 0]
+        _runs:   the runs of frames with the same input [list of list]
+        _frames: the total number of frames [int >= 0]
+        _sums:   the checksums [array of unsigned 32-bit ints]
+    """
+
+    # GETTERS
+    def getSeed(self):
+        """
+        Returns: the seed of the recorded game
+        """
+        return self._seed
+
+    def getConfig(self):
+        """
+        Returns: the wave settings of the recorded game
+        """
+        return self._config
+
+    def getKeys(self):
+        """
+        Returns: the names of the recorded keys
+        """
+        return self._keys
+
+    def getFrames(self):
+        """
+        Returns: the number of recorded frames
+        """
+        return self._frames
+
+    def getRuns(self):
+        """
+        Returns: the number of runs of frames with the same input
+        """
+        return len(self._runs)
+
+    def getEvery(self):
+        """
+        Returns: the number of frames between checksums, or 0 if there are
+        none
+        """
+        return self._every
+
+    def getChecksums(self):
+        """
+        Returns: the checksums (do not modify them)
+        """
+        return self._sums
+
+    def getDuration(self):
+        """
+        Returns: the number of seconds of play recorded (the sum of the time
+        steps)
+        """
+        return sum(run[0]*run[3] for run in self._runs)
+
+    # INITIALIZER
+    def __init__(self,seed,keys=RECORD_KEYS,every=RECORD_CHECKSUM_EVERY,
+                 config=None):
+        """
+        Initializer: creates an empty recording
+
+        Parameter seed: the seed of the game (see Invaders.setSeed)
+        Precondition: seed is an int
+
+        Parameter keys: the names of the keys to record
+        Precondition: keys is a tuple of at most 64 distinct strings
+
+        Parameter every: the number of frames between checksums, or 0 for none
+        Precondition: every is an int >= 0
+
+        Parameter config: the wave settings of the game, or None for the
+        settings in consts.py.  Only the rows, the aliens per row and the speed
+        are kept.
+        Precondition: config is None or a WaveConfig
+        """
+        assert type(seed)==int, '%s is not a valid seed' % repr(seed)
+        assert type(keys)==tuple and len(keys)<=64 and len(set(keys))==len(keys), \
+            '%s is not a valid tuple of keys' % repr(keys)
+        assert type(every)==int and every>=0, '%s is not a valid interval' % repr(every)
+        if config is None:
+            config=WaveConfig()
+        assert isinstance(config,WaveConfig), '%s is not a WaveConfig' % repr(config)
+        self._seed=seed
+        self._config=WaveConfig(config.getRows(),config.getCols(),
+                                float(config.getSpeed()))
+        self._keys=keys
+        self._every=every
+        self._runs=[]
+        self._frames=0
+        self._sums=array.array('I')
+
+    # METHODS TO RECORD AND READ FRAMES
+    def record(self,input,dt):
+        """
+        Adds a frame with the keys held down in input
+
+        Parameter input: the input read by the game on this frame
+        Precondition: input is a GInput or FakeInput
+
+        Parameter dt: the time step of this frame
+        Precondition: dt is a number (int or float) >= 0
+        """
+        mask=0
+        for i in range(len(self._keys)):
+            if input.is_key_down(self._keys[i]):
+                mask|=1<<i
+        self.append(mask,input.key_count,dt)
+
+    def append(self,mask,count,dt):
+        """
+        Adds a frame to the recording
+
+        Parameter mask: the keys held down, as a bitmask over getKeys()
+        Precondition: mask is an int >= 0
+
+        Parameter count: the value of key_count
+        Precondition: count is an int >= 0
+
+        Parameter dt: the time step of this frame
+        Precondition: dt is a number (int or float) >= 0
+        """
+        dt=float(dt)
+        if self._runs:
+            last=self._runs[-1]
+            if last[1]==mask and last[2]==count and last[3]==dt:
+                last[0]+=1
+                self._frames+=1
+                return
+        self._runs.append([1,mask,count,dt])
+        self._frames+=1
+
+    def check(self,checksum):
+        """
+        Adds the checksum of the state after the last frame, if that frame is
+        one to check.  Call this once after each frame has been added.
+
+        Parameter checksum: the checksum of the state
+        Precondition: checksum is an int in 0..2**32-1
+        """
+        if self._every and (self._frames-1)%self._every==0:
+            self._sums.append(checksum)
+
+    def frames(self):
+        """
+        Yields: each frame of the recording in order, as a tuple (mask,count,dt)
+        """
+        for frames,mask,count,dt in self._runs:
+            frame=(mask,count,dt)
+            for i in range(frames):
+                yield frame
+
+    # METHODS TO READ AND WRITE FILES
+    def tobytes(self):
+        """
+        Returns: the recording in the file format of this module
+        """
+        out=bytearray(RECORD_MAGIC)
+        out.append(RECORD_VERSION)
+        _putVarint(out,len(self._keys))
+        for key in self._keys:
+            name=key.encode('utf-8')
+            _putVarint(out,len(name))
+            out+=name
+        _putVarint(out,self._seed*2 if self._seed>=0 else -self._seed*2-1)
+        _putVarint(out,self._every)
+        _putVarint(out,self._config.getRows())
+        _putVarint(out,self._config.getCols())
+        out+=struct.pack('<d',self._config.getSpeed())
+        _putVarint(out,len(self._sums))
+        sums=array.array('I',self._sums)
+        if sys.byteorder!='little':
+            sums.byteswap()
+        out+=sums.tobytes()
+        dt=None
+        for frames,mask,count,step in self._runs:
+            _putVarint(out,frames*2+(step!=dt))
+            _putVarint(out,mask)
+            _putVarint(out,count)
+            if step!=dt:
+                out+=struct.pack('<d',step)
+                dt=step
+        return bytes(out)
+
+    def save(self,path):
+        """
+        Writes the recording to a file
+
+        Parameter path: the file to write
+        Precondition: path is a string
+        """
+        with open(path,'wb') as file:
+            file.write(self.tobytes())
+
+    @classmethod
+    def frombytes(cls,data):
+        """
+        Returns: the recording in data
+
+        Raises ValueError if data is not a recording in the format of this
+        module.
+
+        Parameter data: the contents of a recording file
+        Precondition: data is a bytes object
+        """
+        if data[:len(RECORD_MAGIC)]!=RECORD_MAGIC:
+            raise ValueError('the data is not an input recording')
+        pos=len(RECORD_MAGIC)
+        if pos>=len(data) or not 1<=data[pos]<=RECORD_VERSION:
+            raise ValueError('the recording is not version 1..%d' % RECORD_VERSION)
+        version=data[pos]
+        pos=pos+1
+        size,pos=_getVarint(data,pos)
+        keys=[]
+        for i in range(size):
+            length,pos=_getVarint(data,pos)
+            keys.append(data[pos:pos+length].decode('utf-8'))
+            pos=pos+length
+        seed,pos=_getVarint(data,pos)
+        every=0
+        if version>=2:
+            every,pos=_getVarint(data,pos)
+        config=None
+        if version>=3:
+            rows,pos=_getVarint(data,pos)
+            cols,pos=_getVarint(data,pos)
+            if pos+8>len(data) or not 1<=rows<=10 or not 1<=cols<=15:
+                raise ValueError('the recording has invalid wave settings')
+            speed=struct.unpack_from('<d',data,pos)[0]
+            pos=pos+8
+            if not speed>0:
+                raise ValueError('the recording has invalid wave settings')
+            config=WaveConfig(rows,cols,speed)
+        result=cls(seed//2 if seed%2==0 else -(seed+1)//2,tuple(keys),every,
+                   config)
+        if version>=2:
+            size,pos=_getVarint(data,pos)
+            if pos+4*size>len(data):
+                raise ValueError('the recording ends in the middle of the checksums')
+            result._sums.frombytes(data[pos:pos+4*size])
+            if sys.byteorder!='little':
+                result._sums.byteswap()
+            pos=pos+4*size
+        dt=None
+        while pos<len(data):
+            head,pos=_getVarint(data,pos)
+            mask,pos=_getVarint(data,pos)
+            count,pos=_getVarint(data,pos)
+            if head%2==1:
+                if pos+8>len(data):
+                    raise ValueError('the recording ends in the middle of a run')
+                dt=struct.unpack_from('<d',data,pos)[0]
+                pos=pos+8
+            if dt is None or head<2:
+                raise ValueError('the recording has an invalid run')
+            result._runs.append([head//2,mask,count,dt])
+            result._frames+=head//2
+        return result
+
+    @classmethod
+    def load(cls,path):
+        """
+        Returns: the recording in a file
+
+        Raises ValueError if the file is not a recording in the format of this
+        module.
+
+        Parameter path: the file to read
+        Precondition: path is a string
+        """
+        with open(path,'rb') as file:
+            return cls.frombytes(file.read())
+
+
+class FakeInput(object):
+    """
+    A class with the key methods of GInput, for input that does not come from
+    the keyboard.
+
+    INSTANCE ATTRIBUTES:
+        _down:     the keys held down [frozenset of str]
+        _keycount: the value of key_count [int >= 0]
+    """
+
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._keycount
+
+    @property
+    def keys(self):
+        """
+        The keys that are currently held down.
+
+        **Invariant**: Must be a tuple of strings (possibly empty)
+        """
+        return tuple(self._down)
+
+    def __init__(self):
+        """
+        Initializer: creates an input with no keys held down
+        """
+        self._down=frozenset()
+        self._keycount=0
+
+    def is_key_down(self,key):
+        """
+        Returns: True if key is currently held down
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return key in self._down
+
+    def set(self,keys,count=None):
+        """
+        Sets the keys held down
+
+        Parameter keys: the keys held down
+        Precondition: keys is an iterable of strings
+
+        Parameter count: the value of key_count, or None for the number of keys
+        (key_count also counts keys that were not recorded)
+        Precondition: count is None or an int >= 0
+        """
+        self._down=frozenset(keys)
+        self._keycount=len(self._down) if count is None else count
+
+
+class InputPlayer(object):
+    """
+    A class to play a recording back through a FakeInput.
+
+    Inside the running game, Invaders calls next on each update (see
+    Invaders.setPlayer), so the recording plays at the speed of the game
+    clock.  Outside of it, run calls the update method of the game directly,
+    either as fast as possible or in real time.
+
+    INSTANCE ATTRIBUTES:
+        _recording: the recording being played [InputRecording]
+        _input:     the input the game reads [FakeInput]
+        _frames:    the frames not yet played [generator of tuple]
+        _played:    the number of frames played [int >= 0]
+        _step:      the time step of the last frame played [float >= 0]
+        _masks:     the keys held down for each bitmask seen so far
+                    [dict mapping int to frozenset of str]
+    """
+
+    # GETTERS
+    def getRecording(self):
+        """
+        Returns: the recording being played
+        """
+        return self._recording
+
+    def getInput(self):
+        """
+        Returns: the input the game should read
+        """
+        return self._input
+
+    def getSeed(self):
+        """
+        Returns: the seed of the recorded game
+        """
+        return self._recording.getSeed()
+
+    def getPlayed(self):
+        """
+        Returns: the number of frames played so far
+        """
+        return self._played
+
+    def isDone(self):
+        """
+        Returns: True if every frame has been played
+        """
+        return self._played>=self._recording.getFrames()
+
+    # INITIALIZER
+    def __init__(self,recording):
+        """
+        Initializer: creates a player at the start of recording
+
+        Parameter recording: the recording to play
+        Precondition: recording is an InputRecording
+        """
+        assert isinstance(recording,InputRecording), \
+            '%s is not an InputRecording' % repr(recording)
+        self._recording=recording
+        self._input=FakeInput()
+        self._frames=recording.frames()
+        self._played=0
+        self._step=0.0
+        self._masks={}
+
+    # METHODS TO PLAY
+    def next(self,dt=None):
+        """
+        Returns: the time step of the next frame, after setting the input to
+        the keys of that frame.  Once every frame has been played, the input
+        has no keys held down and dt is returned.
+
+        Parameter dt: the time step to return when the recording is done
+        Precondition: dt is None or a number (int or float)
+        """
+        frame=next(self._frames,None)
+        if frame is None:
+            self._input.set(())
+            return dt
+        mask,count,step=frame
+        keys=self._masks.get(mask)
+        if keys is None:
+            names=self._recording.getKeys()
+            keys=frozenset(names[i] for i in range(len(names)) if mask>>i&1)
+            self._masks[mask]=keys
+        self._input.set(keys,count)
+        self._played+=1
+        self._step=step
+        return step
+
+    def run(self,app,realtime=False):
+        """
+        Returns: the number of seconds it took to play the rest of the recording
+        through app
+
+        app.update is called once per frame; the app takes the input and the
+        time step of each frame from this player.  Nothing is drawn.  The app
+        must already have been given this player (see Invaders.setPlayer) and
+        started.
+
+        Parameter app: the game to play
+        Precondition: app is an Invaders that reads getInput()
+
+        Parameter realtime: whether to wait between frames so the game runs at
+        the speed it was recorded at
+        Precondition: realtime is a bool
+        """
+        start=time.perf_counter()
+        clock=0.0
+        while not self.isDone():
+            app.update(0.0)
+            if realtime:
+                clock=clock+self._step
+                wait=start+clock-time.perf_counter()
+                if wait>0:
+                    time.sleep(wait)
+        return time.perf_counter()-start
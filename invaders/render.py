@@ -0,0 +1,779 @@
+"""
+Offline renderer for Alien Invaders
+
+This module draws the frames of an input recording (see record.py) without a
+window or a GPU.  For example
+
+    python render.py game.invr --png frames/
+    python render.py game.invr --gif game.gif --every 2
+
+replays game.invr without Kivy and draws every frame (or every other frame)
+into a NumPy RGBA framebuffer with the images in Images/ and the sizes in
+consts.py.  The frames are split into chunks that are drawn and encoded in
+parallel worker processes, and written as numbered PNG files or as one
+animated GIF.  The messages and labels of the game are not drawn.
+
+Most of the time goes into compressing the frames, which is much faster for
+smaller frames: --shrink 2 keeps every other pixel across and down, and
+--level sets the zlib level of PNG files (0 is fastest and largest).
+
+The PNG and GIF encoders are written here (on top of zlib), so nothing beyond
+NumPy is needed.  The GIF uses one fixed palette with 3 bits of red and green
+and 2 of blue, and only stores the part of each frame that changed since the
+frame before it.  GIF frames last a whole number of hundredths of a second,
+at least GIF_TICK of them, so the frames are timed to play at the speed of
+the game: at 60 frames a second, one frame in six is left out of a GIF drawn
+with --every 1, and the frames of --every 2 last 2 or 4 hundredths.
+
+Only flags and paths are accepted.  consts.py reads its positional command
+line arguments when it is imported, so they are hidden from it here.
+"""
+import sys
+_argv=sys.argv
+sys.argv=sys.argv[:1]
+from consts import *
+from config import *
+from sim import *
+from record import *
+from replay import *
+sys.argv=_argv
+import argparse
+import collections
+import math
+import multiprocessing
+import os
+import struct
+import time
+import zlib
+import numpy as np
+
+# the folder with the images of the game
+IMAGE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images')
+
+# the RGBA values of the color names used in consts.py
+COLORS = {'white':(255,255,255,255),'black':(0,0,0,255),'red':(255,0,0,255),
+          'green':(0,255,0,255),'blue':(0,0,255,255),'yellow':(255,255,0,255),
+          'gray':(128,128,128,255)}
+
+
+# PNG FILES
+def _chunk(kind,data):
+    """
+    Returns: the PNG chunk with the given type and data
+
+    Parameter kind: the chunk type
+    Precondition: kind is a 4 byte bytes object
+
+    Parameter data: the chunk data
+    Precondition: data is a bytes object
+    """
+    return (struct.pack('>I',len(data))+kind+data+
+            struct.pack('>I',zlib.crc32(kind+data)))
+
+
+def readPNG(path):
+    """
+    Returns: the image in a PNG file as a height x width x 4 array of uint8
+    (RGBA, with row 0 at the top)
+
+    Raises ValueError if the file is not a non-interlaced PNG with 8-bit
+    grayscale, RGB or RGBA pixels or with a palette of 1, 2, 4 or 8 bits.
+
+    Parameter path: the PNG file
+    Precondition: path is a string
+    """
+    with open(path,'rb') as file:
+        data=file.read()
+    if data[:8]!=b'\x89PNG\r\n\x1a\n':
+        raise ValueError('%s is not a PNG file' % repr(path))
+    pos=8
+    idat=[]
+    header=None
+    palette=None
+    alpha=b''
+    while pos<len(data):
+        size,kind=struct.unpack_from('>I4s',data,pos)
+        if kind==b'IHDR':
+            header=struct.unpack_from('>IIBBBBB',data,pos+8)
+        elif kind==b'PLTE':
+            palette=data[pos+8:pos+8+size]
+        elif kind==b'tRNS':
+            alpha=data[pos+8:pos+8+size]
+        elif kind==b'IDAT':
+            idat.append(data[pos+8:pos+8+size])
+        elif kind==b'IEND':
+            break
+        pos=pos+12+size
+    if header is None:
+        raise ValueError('%s has no header' % repr(path))
+    width,height,depth,color,compression,filtering,interlace=header
+    if color==3:
+        if depth not in (1,2,4,8) or interlace!=0 or palette is None:
+            raise ValueError('%s is not a supported palette PNG' % repr(path))
+        return _readPalette(zlib.decompress(b''.join(idat)),width,height,depth,
+                            palette,alpha)
+    channels={0:1,2:3,4:2,6:4}.get(color)
+    if depth!=8 or channels is None or interlace!=0:
+        raise ValueError('%s is not an 8-bit, non-interlaced PNG' % repr(path))
+    raw=np.frombuffer(zlib.decompress(b''.join(idat)),dtype=np.uint8)
+    raw=raw.reshape(height,width*channels+1)
+    pixels=_unfilter(raw[:,0],raw[:,1:].reshape(height,width,channels))
+    if channels==4:
+        return pixels
+    image=np.empty((height,width,4),dtype=np.uint8)
+    if channels==3:
+        image[:,:,:3]=pixels
+        image[:,:,3]=255
+    else:
+        image[:,:,:3]=pixels[:,:,:1]
+        image[:,:,3]=255 if channels==1 else pixels[:,:,1]
+    return image
+
+
+def _readPalette(data,width,height,depth,palette,alpha):
+    """
+    Returns: the pixels of a palette PNG as a height x width x 4 array of
+    uint8 (RGBA)
+
+    Pixels smaller than a byte are packed from the high bits down, and are
+    filtered a byte at a time.
+
+    Parameter data: the decompressed image data
+    Precondition: data is a bytes object
+
+    Parameter width, height: the size of the image
+    Precondition: width and height are ints > 0
+
+    Parameter depth: the bits per pixel
+    Precondition: depth is 1, 2, 4 or 8
+
+    Parameter palette: the PLTE chunk, 3 bytes (RGB) per entry
+    Precondition: palette is a bytes object
+
+    Parameter alpha: the tRNS chunk, the alpha of the first entries
+    Precondition: alpha is a bytes object
+    """
+    size=(width*depth+7)//8
+    raw=np.frombuffer(data,dtype=np.uint8).reshape(height,size+1)
+    packed=_unfilter(raw[:,0],raw[:,1:].reshape(height,size,1))[:,:,0]
+    if depth==8:
+        indices=packed
+    else:
+        shifts=np.arange(8-depth,-1,-depth,dtype=np.uint8)
+        indices=(packed[:,:,None]>>shifts)&((1<<depth)-1)
+        indices=indices.reshape(height,-1)[:,:width]
+    colors=np.zeros((256,4),dtype=np.uint8)
+    entries=np.frombuffer(palette,dtype=np.uint8)[:768].reshape(-1,3)
+    colors[:len(entries),:3]=entries
+    colors[:,3]=255
+    colors[:len(alpha),3]=np.frombuffer(alpha,dtype=np.uint8)[:256]
+    return colors[indices]
+
+
+def _unfilter(filters,data):
+    """
+    Returns: the pixels of a PNG image with the row filters undone
+
+    A pixel depends on the pixels to its left, above it and above to its left,
+    so every pixel on a diagonal from the top right to the bottom left can be
+    worked out at once from the diagonals before it.  This takes one step of
+    NumPy operations per diagonal instead of one Python step per byte.
+
+    Parameter filters: the filter type of each row
+    Precondition: filters is a 1d array of uint8 in 0..4
+
+    Parameter data: the filtered pixels
+    Precondition: data is a height x width x channels array of uint8
+    """
+    height,width,channels=data.shape
+    if not filters.any():
+        return data.copy()
+    if not (filters>2).any() and not (filters==1).any():
+        # only None and Up: each row adds the row above it
+        out=data.copy()
+        for r in range(1,height):
+            if filters[r]==2:
+                out[r]+=out[r-1]
+        return out
+    out=np.zeros((height+1,width+1,channels),dtype=np.int32)
+    for k in range(height+width-1):
+        rows=np.arange(max(0,k-width+1),min(height-1,k)+1)
+        cols=k-rows
+        a=out[rows+1,cols]
+        b=out[rows,cols+1]
+        c=out[rows,cols]
+        kind=filters[rows][:,np.newaxis]
+        p=a+b-c
+        pa=np.abs(p-a)
+        pb=np.abs(p-b)
+        pc=np.abs(p-c)
+        paeth=np.where((pa<=pb)&(pa<=pc),a,np.where(pb<=pc,b,c))
+        guess=np.select([kind==1,kind==2,kind==3,kind==4],
+                        [a,b,(a+b)>>1,paeth],0)
+        out[rows+1,cols+1]=(data[rows,cols]+guess)&255
+    return out[1:,1:].astype(np.uint8)
+
+
+def encodePNG(image,level=1):
+    """
+    Returns: an image as the bytes of a PNG file
+
+    Parameter image: the image (row 0 at the top)
+    Precondition: image is a height x width x 3 (RGB) or 4 (RGBA) array of
+    uint8
+
+    Parameter level: the zlib compression level
+    Precondition: level is an int in 0..9
+    """
+    height,width,channels=image.shape
+    raw=np.empty((height,width*channels+1),dtype=np.uint8)
+    raw[:,0]=0
+    raw[:,1:]=image.reshape(height,width*channels)
+    header=struct.pack('>IIBBBBB',width,height,8,6 if channels==4 else 2,0,0,0)
+    return (b'\x89PNG\r\n\x1a\n'+_chunk(b'IHDR',header)+
+            _chunk(b'IDAT',zlib.compress(raw.tobytes(),level))+_chunk(b'IEND',b''))
+
+
+# GIF FILES
+def quantize(image):
+    """
+    Returns: the index of each pixel of image in the palette of gifHeader, as a
+    height x width array of uint8
+
+    Parameter image: the image
+    Precondition: image is a height x width x 3 or 4 array of uint8
+    """
+    return ((image[:,:,0]&0xE0)|((image[:,:,1]>>3)&0x1C)|(image[:,:,2]>>6))
+
+
+def gifHeader(width,height):
+    """
+    Returns: the start of an animated GIF that loops forever, with the fixed
+    palette used by quantize
+
+    Parameter width: the width of the animation
+    Precondition: width is an int in 1..65535
+
+    Parameter height: the height of the animation
+    Precondition: height is an int in 1..65535
+    """
+    index=np.arange(256)
+    palette=np.empty((256,3),dtype=np.uint8)
+    palette[:,0]=(index>>5)*255//7
+    palette[:,1]=((index>>2)&7)*255//7
+    palette[:,2]=(index&3)*255//3
+    return (b'GIF89a'+struct.pack('<HHBBB',width,height,0xF7,0,0)+
+            palette.tobytes()+b'\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+
+def gifFrame(indices,left,top,delay):
+    """
+    Returns: the bytes of one frame of an animated GIF
+
+    Parameter indices: the palette indices of the part of the frame to store
+    Precondition: indices is a 2d array of uint8
+
+    Parameter left: the column of the frame where the part starts
+    Precondition: left is an int >= 0
+
+    Parameter top: the row of the frame where the part starts
+    Precondition: top is an int >= 0
+
+    Parameter delay: the time to show the frame, in hundredths of a second
+    Precondition: delay is an int in 0..65535
+    """
+    height,width=indices.shape
+    data=_lzw(indices.tobytes())
+    blocks=bytearray()
+    for start in range(0,len(data),255):
+        block=data[start:start+255]
+        blocks.append(len(block))
+        blocks+=block
+    blocks.append(0)
+    return (b'\x21\xF9\x04\x04'+struct.pack('<H',delay)+b'\x00\x00'+
+            b'\x2C'+struct.pack('<HHHHB',left,top,width,height,0)+
+            b'\x08'+bytes(blocks))
+
+
+def _lzw(pixels):
+    """
+    Returns: pixels compressed with the variable-length LZW of GIF, for a code
+    size of 8 bits
+
+    Parameter pixels: the palette indices
+    Precondition: pixels is a non-empty bytes object
+    """
+    clear=256
+    out=bytearray()
+    buffer=clear
+    bits=9
+    size=9
+    table={}
+    next=258
+    prefix=pixels[0]
+    for byte in pixels[1:]:
+        key=(prefix<<8)|byte
+        code=table.get(key)
+        if code is not None:
+            prefix=code
+            continue
+        buffer|=prefix<<bits
+        bits+=size
+        while bits>=8:
+            out.append(buffer&0xFF)
+            buffer>>=8
+            bits-=8
+        if next<4096:
+            table[key]=next
+            if next==1<<size:
+                size+=1
+            next+=1
+        else:
+            buffer|=clear<<bits
+            bits+=size
+            while bits>=8:
+                out.append(buffer&0xFF)
+                buffer>>=8
+                bits-=8
+            table={}
+            next=258
+            size=9
+        prefix=byte
+    buffer|=prefix<<bits
+    bits+=size
+    if next==1<<size and size<12:
+        size+=1
+    buffer|=257<<bits
+    bits+=size
+    while bits>0:
+        out.append(buffer&0xFF)
+        buffer>>=8
+        bits-=8
+    return bytes(out)
+
+
+# DRAWING
+def _resize(image,width,height):
+    """
+    Returns: image scaled to width x height by nearest neighbor
+
+    Parameter image: the image
+    Precondition: image is a 3d array
+
+    Parameter width: the new width
+    Precondition: width is an int > 0
+
+    Parameter height: the new height
+    Precondition: height is an int > 0
+    """
+    rows=np.arange(height)*image.shape[0]//height
+    cols=np.arange(width)*image.shape[1]//width
+    return np.ascontiguousarray(image[rows[:,np.newaxis],cols])
+
+
+class FrameRenderer(object):
+    """
+    A class to draw the state of a wave into an RGBA framebuffer.
+
+    The framebuffer is GAME_HEIGHT x GAME_WIDTH x 4, with row 0 at the top of
+    the window.  Everything is drawn as in Wave.draw: the background, then the
+    aliens, the defense line, the ship and the bolts.  A renderer only holds
+    NumPy arrays, so it can be sent to worker processes.
+
+    INSTANCE ATTRIBUTES:
+        _background: the background, scaled to the window
+                     [GAME_HEIGHT x GAME_WIDTH x 4 array of uint8]
+        _ship:       the ship image, scaled to SHIP_WIDTH x SHIP_HEIGHT
+                     [3d array of uint8]
+        _aliens:     the image of each index in ALIEN_IMAGES, scaled to
+                     ALIEN_WIDTH x ALIEN_HEIGHT [list of 3d arrays of uint8]
+    """
+
+    # GETTERS
+    def getShape(self):
+        """
+        Returns: the shape of a framebuffer
+        """
+        return self._background.shape
+
+    # INITIALIZER
+    def __init__(self,folder=IMAGE_FOLDER):
+        """
+        Initializer: loads and scales the images of the game
+
+        Parameter folder: the folder with the images
+        Precondition: folder is a string
+        """
+        path=lambda name: os.path.join(folder,name)
+        self._background=_resize(readPNG(path(BACKGROUND)),GAME_WIDTH,GAME_HEIGHT)
+        self._ship=_resize(readPNG(path(SHIP_IMAGE)),SHIP_WIDTH,SHIP_HEIGHT)
+        self._aliens=[_resize(readPNG(path(name)),ALIEN_WIDTH,ALIEN_HEIGHT)
+                      for name in ALIEN_IMAGES]
+
+    # METHODS TO DRAW
+    def draw(self,sim,out=None):
+        """
+        Returns: the framebuffer with sim drawn in it
+
+        Parameter sim: the wave to draw, or None for an empty screen
+        Precondition: sim is None or a WaveSim
+
+        Parameter out: the framebuffer to draw into, or None to make one
+        Precondition: out is None or an array of uint8 with shape getShape()
+        """
+        if out is None:
+            out=np.empty(self._background.shape,dtype=np.uint8)
+        np.copyto(out,self._background)
+        if sim is None:
+            return out
+        formation=sim.getAliens()
+        xs=formation.getX()
+        ys=formation.getY()
+        kinds=formation.getType()
+        for r,c in zip(*formation.getAlive().nonzero()):
+            self._blit(out,self._aliens[kinds[r,c]],float(xs[r,c]),float(ys[r,c]))
+        self._fill(out,0,DEFENSE_LINE-LINEWIDTH/2,GAME_WIDTH,
+                   DEFENSE_LINE+LINEWIDTH/2,COLORS[DLINE_COLOR])
+        ship=sim.getShip()
+        if ship is not None:
+            self._blit(out,self._ship,ship.x,ship.y)
+        for bolt in sim.getBolts():
+            self._fill(out,bolt.left,bolt.bottom,bolt.right,bolt.top,
+                       COLORS[BOLT_LINECOLOR])
+            self._fill(out,bolt.left+1,bolt.bottom+1,bolt.right-1,bolt.top-1,
+                       COLORS[BOLT_FILLCOLOR])
+        return out
+
+    # HELPER METHODS
+    def _blit(self,out,image,x,y):
+        """
+        blends image into out, centered at the point (x,y) of the window
+
+        Parameter out: the framebuffer
+        Precondition: out is an array of uint8 with shape getShape()
+
+        Parameter image: the image
+        Precondition: image is a 3d RGBA array of uint8
+
+        Parameter x,y: the center of the image, in window coordinates
+        Precondition: x,y are numbers (int or float)
+        """
+        height,width=image.shape[:2]
+        top=int(round(GAME_HEIGHT-y-height/2))
+        left=int(round(x-width/2))
+        r0=max(top,0)
+        r1=min(top+height,out.shape[0])
+        c0=max(left,0)
+        c1=min(left+width,out.shape[1])
+        if r0>=r1 or c0>=c1:
+            return
+        src=image[r0-top:r1-top,c0-left:c1-left]
+        dst=out[r0:r1,c0:c1]
+        alpha=src[:,:,3:].astype(np.uint16)
+        blend=(src.astype(np.uint16)*alpha+dst.astype(np.uint16)*(255-alpha)+127)//255
+        dst[:,:,:3]=blend[:,:,:3]
+
+    def _fill(self,out,left,bottom,right,top,color):
+        """
+        fills a rectangle of the window in out with color
+
+        Parameter out: the framebuffer
+        Precondition: out is an array of uint8 with shape getShape()
+
+        Parameter left,bottom,right,top: the edges of the rectangle, in window
+        coordinates
+        Precondition: they are numbers (int or float)
+
+        Parameter color: the color
+        Precondition: color is an RGBA tuple of ints in 0..255
+        """
+        r0=max(int(round(GAME_HEIGHT-top)),0)
+        r1=min(max(int(round(GAME_HEIGHT-bottom)),r0+1),out.shape[0])
+        c0=max(int(round(left)),0)
+        c1=min(max(int(round(right)),c0+1),out.shape[1])
+        if r0<r1 and c0<c1:
+            out[r0:r1,c0:c1]=color
+
+
+# RENDERING RECORDINGS
+_renderer=None
+
+
+def _setup(renderer):
+    """
+    Keeps the renderer of a worker process, so it is only sent once
+    """
+    global _renderer
+    _renderer=renderer
+
+
+def _drawChunk(task):
+    """
+    Returns: the frames of a chunk, drawn and encoded
+
+    For PNG files, each frame is written to a file in folder and the number of
+    files is returned.  For a GIF, a tuple (count,data) is returned with the
+    number of frames written and the encoded frames as one bytes object; the
+    first frame is stored whole and the rest only where they changed.  Frames
+    that start in the same GIF tick as the frame before them are dropped (see
+    _tick).
+
+    Parameter task: a tuple (kind,first,states,folder,step,shrink,level,
+    config) where kind is 'png' or 'gif', first is the number of the first
+    frame, states is a list of packed waves (see WaveSim.pack, or None for an
+    empty screen), folder is where PNG files go, step is the game time
+    between frames in GIF ticks (see _tick), shrink is the step between the
+    pixels kept, level is the zlib level of PNG files and config is the wave
+    settings of the recording
+    Precondition: task is such a tuple
+    """
+    kind,first,states,folder,step,shrink,level,config=task
+    sim=WaveSim(config,0)
+    frame=np.empty(_renderer.getShape(),dtype=np.uint8)
+    if kind=='png':
+        for i in range(len(states)):
+            _drawState(sim,states[i],frame)
+            name=os.path.join(folder,'frame%06d.png' % (first+i))
+            with open(name,'wb') as file:
+                file.write(encodePNG(frame[::shrink,::shrink,:3],level))
+        return len(states)
+    out=bytearray()
+    last=None
+    count=0
+    for i in range(len(states)):
+        tick=_tick(first+i,step)
+        if first+i>0 and tick==_tick(first+i-1,step):
+            continue
+        ahead=first+i+1
+        while _tick(ahead,step)==tick:
+            ahead+=1
+        delay=GIF_TICK*(_tick(ahead,step)-tick)
+        count+=1
+        _drawState(sim,states[i],frame)
+        indices=quantize(frame[::shrink,::shrink])
+        if last is None:
+            out+=gifFrame(indices,0,0,delay)
+        else:
+            rows,cols=(indices!=last).nonzero()
+            if len(rows)==0:
+                out+=gifFrame(indices[:1,:1],0,0,delay)
+            else:
+                r0,r1=int(rows.min()),int(rows.max())+1
+                c0,c1=int(cols.min()),int(cols.max())+1
+                out+=gifFrame(indices[r0:r1,c0:c1],c0,r0,delay)
+        last=indices
+    return (count,bytes(out))
+
+
+def _tick(frame,step):
+    """
+    Returns: the GIF tick that a frame starts in
+
+    The time of a GIF frame is a whole number of hundredths of a second, and
+    browsers slow down frames shorter than GIF_TICK hundredths, so time is
+    counted in ticks of GIF_TICK.  A frame is only written if it is the first
+    to start in its tick, and it is shown until the next frame written.  The
+    GIF then plays at the speed of the game to within a tick, dropping frames
+    if they are shorter than a tick.
+
+    Parameter frame: the number of the frame, counting from 0
+    Precondition: frame is an int >= 0
+
+    Parameter step: the game time between frames, in ticks
+    Precondition: step is a float > 0
+    """
+    return int(math.floor(frame*step+1e-9))
+
+
+def _drawState(sim,state,frame):
+    """
+    draws a packed wave into frame with the renderer of this process
+
+    Parameter sim: a wave of the same shape to unpack into
+    Precondition: sim is a WaveSim
+
+    Parameter state: the packed wave, or None for an empty screen
+    Precondition: state is None or a bytes object from WaveSim.pack
+
+    Parameter frame: the framebuffer
+    Precondition: frame is an array of uint8 with the renderer's shape
+    """
+    if state is None:
+        _renderer.draw(None,frame)
+    else:
+        sim.unpack(state)
+        _renderer.draw(sim,frame)
+
+
+def states(recording,start=0,stop=None,every=1):
+    """
+    Yields: the packed state (see WaveSim.pack) of the wave after each frame
+    of recording from start to stop, every every frames, or None for a frame
+    with no wave
+
+    Parameter recording: the recording to replay
+    Precondition: recording is an InputRecording
+
+    Parameter start: the first frame
+    Precondition: start is an int >= 0
+
+    Parameter stop: the frame to stop before, or None for the end
+    Precondition: stop is None or an int >= start
+
+    Parameter every: the number of frames between the frames drawn
+    Precondition: every is an int > 0
+    """
+    stop=recording.getFrames() if stop is None else min(stop,recording.getFrames())
+    session=Session(recording.getSeed(),recording.getConfig())
+    player=InputPlayer(recording)
+    input=player.getInput()
+    for frame in range(stop):
+        session.update(input,player.next())
+        if frame>=start and (frame-start)%every==0:
+            sim=session.getSim()
+            yield None if sim is None else sim.pack()
+
+
+def render(recording,kind,output,start=0,stop=None,every=1,workers=None,
+           chunk=RENDER_CHUNK,shrink=1,level=1):
+    """
+    Returns: the number of frames drawn
+
+    Replays recording and draws its frames in worker processes, chunk frames
+    at a time, into numbered PNG files in the folder output (kind 'png') or
+    into the animated GIF file output (kind 'gif').  Only a few chunks are in
+    flight at once, so long recordings do not need much memory.
+
+    Parameter recording: the recording to draw
+    Precondition: recording is an InputRecording
+
+    Parameter kind: the kind of output
+    Precondition: kind is 'png' or 'gif'
+
+    Parameter output: the folder (for PNG) or file (for GIF) to write
+    Precondition: output is a string
+
+    Parameter start, stop, every: the frames to draw (see states)
+    Precondition: see states
+
+    Parameter workers: the number of worker processes, or None for one per
+    core
+    Precondition: workers is None or an int > 0
+
+    Parameter chunk: the number of frames drawn by a worker at a time
+    Precondition: chunk is an int > 0
+
+    Parameter shrink: the step between the pixels kept, across and down
+    Precondition: shrink is an int > 0
+
+    Parameter level: the zlib level of PNG files
+    Precondition: level is an int in 0..9
+    """
+    assert kind in ('png','gif'), '%s is not a valid kind' % repr(kind)
+    workers=workers or os.cpu_count() or 1
+    step=100*GAME_TIMESTEP*every/GIF_TICK
+    config=recording.getConfig()
+    if kind=='png':
+        os.makedirs(output,exist_ok=True)
+        out=None
+    else:
+        out=open(output,'wb')
+        out.write(gifHeader(-(-GAME_WIDTH//shrink),-(-GAME_HEIGHT//shrink)))
+    count=0
+    try:
+        with multiprocessing.Pool(workers,_setup,(FrameRenderer(),)) as pool:
+            pending=collections.deque()
+            batch=[]
+            first=0
+            for state in states(recording,start,stop,every):
+                batch.append(state)
+                if len(batch)==chunk:
+                    pending.append(pool.apply_async(
+                        _drawChunk,((kind,first,batch,output,step,shrink,level,config),)))
+                    first+=len(batch)
+                    batch=[]
+                    if len(pending)>=2*workers:
+                        count+=_collect(pending.popleft().get(),out)
+            if batch:
+                pending.append(pool.apply_async(
+                    _drawChunk,((kind,first,batch,output,step,shrink,level,config),)))
+            while pending:
+                count+=_collect(pending.popleft().get(),out)
+        if out is not None:
+            out.write(b';')
+    finally:
+        if out is not None:
+            out.close()
+    return count
+
+
+def _collect(result,out):
+    """
+    Returns: the number of frames in the result of _drawChunk, after writing
+    them to out if they are GIF frames
+
+    Parameter result: the result of _drawChunk
+    Precondition: result is an int (PNG) or a tuple (count,data) (GIF)
+
+    Parameter out: the GIF file, or None for PNG
+    Precondition: out is None or a file open for writing bytes
+    """
+    if out is None:
+        return result
+    out.write(result[1])
+    return result[0]
+
+
+def parser():
+    """
+    Returns: the command line parser of the renderer
+    """
+    p=argparse.ArgumentParser(description='Draw the frames of an Alien '
+                              'Invaders recording without a window.')
+    p.add_argument('recording',help='the input recording to draw')
+    group=p.add_mutually_exclusive_group(required=True)
+    group.add_argument('--png',metavar='FOLDER',
+                       help='write numbered PNG files to FOLDER')
+    group.add_argument('--gif',metavar='FILE',help='write an animated GIF')
+    p.add_argument('--start',type=int,default=0,help='first frame to draw')
+    p.add_argument('--stop',type=int,default=None,
+                   help='frame to stop before (default: the end)')
+    p.add_argument('--every',type=int,default=1,
+                   help='draw every EVERY frames (default: 1)')
+    p.add_argument('--chunk',type=int,default=RENDER_CHUNK,
+                   help='frames drawn by a worker at a time')
+    p.add_argument('--workers',type=int,default=None,
+                   help='worker processes (default: one per core)')
+    p.add_argument('--shrink',type=int,default=1,
+                   help='keep every SHRINK pixels across and down (default: 1)')
+    p.add_argument('--level',type=int,default=1,choices=range(10),
+                   help='zlib level of PNG files (default: 1)')
+    return p
+
+
+def main(argv=None):
+    """
+    Runs the renderer
+
+    Parameter argv: the command line arguments, or None to use sys.argv
+    Precondition: argv is None or a list of strings
+    """
+    args=parser().parse_args(argv)
+    if args.start<0 or args.every<1 or args.chunk<1 or args.shrink<1 or \
+       (args.stop is not None and args.stop<args.start):
+        parser().error('the frame range is not valid')
+    recording=InputRecording.load(args.recording)
+    begin=time.perf_counter()
+    if args.png is not None:
+        count=render(recording,'png',args.png,args.start,args.stop,args.every,
+                     args.workers,args.chunk,args.shrink,args.level)
+    else:
+        count=render(recording,'gif',args.gif,args.start,args.stop,args.every,
+                     args.workers,args.chunk,args.shrink)
+    elapsed=time.perf_counter()-begin
+    print('%d frames in %.2f seconds (%.1f frames per second)' %
+          (count,elapsed,count/elapsed if elapsed>0 else 0.0))
+
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,287 @@
+"""
+Headless replay module for Alien Invaders
+
+This module plays input recordings (see record.py) without Kivy.  Session
+runs the same states as Invaders.update, on a WaveSim in place of a Wave, so a
+recording of a real game plays out the same here.  verify replays a recording
+and compares the checksum of the wave after each checked frame with the one
+stored in the recording.  For example
+
+    python replay.py games/*.invr
+
+replays every recording and prints where each one stopped playing out the
+same, which shows whether a change to the rules (or to how fast they run)
+changed the game.  Recordings are only checked every few frames (see
+RECORD_CHECKSUM_EVERY), so this is the pair of checked frames that the first
+difference falls between.  It exits with status 1 if any recording differs.
+
+Session has to be kept in step with Invaders.update: any change to how the
+states there change must be made here too.  The keys that only change the
+sound are ignored.
+"""
+import sys
+_argv=sys.argv
+sys.argv=sys.argv[:1]
+from consts import *
+from config import *
+from sim import *
+from record import *
+from history import *
+sys.argv=_argv
+import argparse
+import random
+import time
+
+
+class Session(object):
+    """
+    A class to play a game of Alien Invaders without Kivy.
+
+    INSTANCE ATTRIBUTES:
+        _state:   the current state of the game, as in Invaders
+                  [one of STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE,
+                  STATE_PAUSED, STATE_CONTINUE, STATE_COMPLETE, STATE_HISTORY]
+        _sim:     the wave being played [WaveSim, or None if there is none]
+        _config:  the settings every wave starts from [WaveConfig]
+        _numWins: the number of waves completed in a row [int >= 0]
+        _seeds:   the random numbers the seed of each new wave is drawn from
+                  [random.Random]
+        _frames:  the number of updates so far [int >= 0]
+        _history: the latest states of the wave, for the debug history mode
+                  [History]
+        _lastkeys: the value of key_count on the last update [int >= 0]
+    """
+
+    # GETTERS
+    def getState(self):
+        """
+        Returns: the current state of the game
+        """
+        return self._state
+
+    def getSim(self):
+        """
+        Returns: the wave being played, or None if there is none
+        """
+        return self._sim
+
+    def getConfig(self):
+        """
+        Returns: the settings every wave starts from
+        """
+        return self._config
+
+    def getNumWins(self):
+        """
+        Returns: the number of waves completed in a row
+        """
+        return self._numWins
+
+    def getFrames(self):
+        """
+        Returns: the number of updates so far
+        """
+        return self._frames
+
+    # INITIALIZER
+    def __init__(self,seed=None,config=None):
+        """
+        Initializer: creates a game waiting for the player to start, like
+        Invaders.start
+
+        Parameter seed: the seed of the game (see Invaders.setSeed)
+        Precondition: seed is None or an int
+
+        Parameter config: the settings every wave starts from (see
+        InputRecording.getConfig), or None for the settings in consts.py
+        Precondition: config is None or a WaveConfig
+        """
+        assert seed is None or type(seed)==int, '%s is not a valid seed' % repr(seed)
+        assert config is None or isinstance(config,WaveConfig), \
+            '%s is not a WaveConfig' % repr(config)
+        self._state=STATE_INACTIVE
+        self._sim=None
+        self._config=WaveConfig() if config is None else config
+        self._numWins=0
+        self._seeds=random.Random(seed)
+        self._frames=0
+        self._history=History()
+        self._lastkeys=0
+
+    # UPDATE METHOD
+    def update(self,input,dt):
+        """
+        Animates a single frame of the game, as Invaders.update does
+
+        Returns: the events of the wave on this frame (see WaveSim.update), or
+        0 if the wave was not updated
+
+        Parameter input: the keys held down on this frame
+        Precondition: input is a GInput or FakeInput
+
+        Parameter dt: the time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._frames+=1
+        count=input.key_count
+        pressed=self._lastkeys==0 and input.is_key_down('h')
+        self._lastkeys=count
+        if pressed and self._state==STATE_ACTIVE and len(self._history)>0:
+            self._state=STATE_HISTORY
+            self._history.seek(self._sim,len(self._history)-1)
+        elif pressed and self._state==STATE_HISTORY:
+            self._history.resume()
+            self._state=STATE_ACTIVE
+        if self._state==STATE_HISTORY:
+            self._scrubHistory(input)
+            return 0
+        if self._state==STATE_INACTIVE and input.is_key_down('s'):
+            self._state=STATE_NEWWAVE
+        elif self._state==STATE_PAUSED and count==1 and input.is_key_down('s'):
+            self._state=STATE_CONTINUE
+        if self._state==STATE_NEWWAVE:
+            config=self._config.replace(
+                speed=self._config.getSpeed()*(3/4)**self._numWins)
+            self._sim=WaveSim(config,self._seeds.getrandbits(64))
+            self._history.clear()
+            self._state=STATE_ACTIVE
+        events=0
+        if self._state==STATE_ACTIVE:
+            if input.is_key_down('left'):
+                events=self._sim.update(dt,'left')
+            elif input.is_key_down('right'):
+                events=self._sim.update(dt,'right')
+            elif input.is_key_down('up'):
+                events=self._sim.update(dt,'up')
+            else:
+                events=self._sim.update(dt)
+            self._history.record(self._sim)
+        if self._state==STATE_CONTINUE:
+            self._state=STATE_ACTIVE
+            self._sim.resetShip(GAME_WIDTH/2)
+        self._checkComplete()
+        if self._state==STATE_COMPLETE and count==1 and input.is_key_down('enter'):
+            self._state=STATE_INACTIVE
+        return events
+
+    def checksum(self):
+        """
+        Returns: the checksum of the wave (see WaveSim.checksum), or 0 if there
+        is no wave
+        """
+        return 0 if self._sim is None else self._sim.checksum()
+
+    # HELPER METHODS
+    def _scrubHistory(self,input):
+        """
+        steps back through _history if the left arrow is held, or forward if
+        the right arrow is held, as Invaders._scrubHistory does
+        """
+        index=self._history.getCursor()
+        if input.is_key_down('left') and index>0:
+            self._history.seek(self._sim,index-1)
+        elif input.is_key_down('right') and index<len(self._history)-1:
+            self._history.seek(self._sim,index+1)
+
+    def _checkComplete(self):
+        """
+        pauses the game if the ship was destroyed, and ends the wave if it is
+        complete, as Invaders._determinieWinOrLose does
+        """
+        if self._sim is None:
+            return
+        complete=self._sim.getWaveComplete()
+        if self._sim.getShip() is None:
+            if complete==LIVES_LOST:
+                self._state=STATE_COMPLETE
+                self._numWins=0
+                self._sim=None
+            else:
+                self._state=STATE_PAUSED
+        elif complete==ALIENS_KILLED or complete==DLINE_CROSSED:
+            self._state=STATE_COMPLETE
+            self._numWins+=1
+            self._sim=None
+
+
+def verify(recording):
+    """
+    Returns: the first checked frame (counting from 0) where the replay of
+    recording has a different checksum from the recording, or None if every
+    checksum matches
+
+    The replay first went wrong after the checked frame before the one
+    returned (see lastGood), and at or before the one returned.
+
+    Parameter recording: the recording to replay
+    Precondition: recording is an InputRecording
+    """
+    sums=recording.getChecksums()
+    every=recording.getEvery()
+    session=Session(recording.getSeed(),recording.getConfig())
+    player=InputPlayer(recording)
+    input=player.getInput()
+    for frame in range(len(sums)*every-every+1 if sums else 0):
+        session.update(input,player.next())
+        if frame%every==0 and session.checksum()!=sums[frame//every]:
+            return frame
+    return None
+
+
+def lastGood(recording,frame):
+    """
+    Returns: the last checked frame before frame, or None if frame is the
+    first one checked
+
+    Parameter recording: the recording that was replayed
+    Precondition: recording is an InputRecording with checksums
+
+    Parameter frame: a checked frame returned by verify
+    Precondition: frame is an int >= 0
+    """
+    return frame-recording.getEvery() if frame>0 else None
+
+
+def parser():
+    """
+    Returns: the command line parser of the replay tool
+    """
+    p=argparse.ArgumentParser(description='Replay Alien Invaders recordings '
+                              'without a window and check their checksums.')
+    p.add_argument('recordings',nargs='+',help='input recordings to replay')
+    return p
+
+
+def main(argv=None):
+    """
+    Runs the replay tool
+
+    Returns: 0 if every recording plays out the same, or 1 if not
+
+    Parameter argv: the command line arguments, or None to use sys.argv
+    Precondition: argv is None or a list of strings
+    """
+    args=parser().parse_args(argv)
+    status=0
+    for path in args.recordings:
+        recording=InputRecording.load(path)
+        start=time.perf_counter()
+        frame=verify(recording)
+        elapsed=time.perf_counter()-start
+        if not recording.getChecksums():
+            print('%s: no checksums' % path)
+        elif frame is None:
+            print('%s: ok (%d frames, %.3f seconds)' %
+                  (path,recording.getFrames(),elapsed))
+        elif lastGood(recording,frame) is None or recording.getEvery()==1:
+            print('%s: differs at frame %d' % (path,frame))
+            status=1
+        else:
+            print('%s: differs after frame %d, by frame %d' %
+                  (path,lastGood(recording,frame),frame))
+            status=1
+    return status
+
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Parallel episode runner module for Alien Invaders
+
+This module contains EpisodeRunner, which spreads waves across worker
+processes.  Each worker runs a WaveBatch (see batch.py) with its own number of
+waves, rows, columns, alien speed and seed.
+
+The observations, rewards and done flags of a worker are written into a
+multiprocessing.shared_memory block that the parent process reads in place,
+and the actions are read from the same block, so nothing but a short command
+is sent between processes on each step.
+"""
+from consts import *
+from batch import *
+from multiprocessing import shared_memory
+import multiprocessing
+import numpy as np
+
+
+def _layout(waves,size):
+    """
+    Returns: the offsets of the actions, rewards, dones and observations in a
+    worker's shared memory block, followed by the size of the block
+
+    Parameter waves: the number of waves of the worker
+    Precondition: waves is an int > 0
+
+    Parameter size: the number of entries in an observation
+    Precondition: size is an int > 0
+    """
+    actions=0
+    rewards=actions+8*((waves+7)//8)
+    dones=rewards+8*waves
+    obs=dones+8*((waves+7)//8)
+    return (actions,rewards,dones,obs,obs+4*waves*size)
+
+
+def _views(buf,waves,size):
+    """
+    Returns: a tuple (actions,rewards,dones,observations) of arrays over a
+    worker's shared memory block
+
+    Parameter buf: the memory of the block
+    Precondition: buf is a buffer of at least the size given by _layout
+
+    Parameter waves: the number of waves of the worker
+    Precondition: waves is an int > 0
+
+    Parameter size: the number of entries in an observation
+    Precondition: size is an int > 0
+    """
+    actions,rewards,dones,obs,end=_layout(waves,size)
+    return (np.ndarray(waves,dtype=np.int8,buffer=buf,offset=actions),
+            np.ndarray(waves,dtype=np.float64,buffer=buf,offset=rewards),
+            np.ndarray(waves,dtype=bool,buffer=buf,offset=dones),
+            np.ndarray((waves,size),dtype=np.float32,buffer=buf,offset=obs))
+
+
+def _work(conn,name,spec):
+    """
+    Runs a worker: steps a WaveBatch whenever the parent sends 'step', until
+    it sends 'close'
+
+    Each step reads the actions from shared memory, writes the rewards and
+    done flags, resets the waves that are done, and then writes the
+    observations (so the observation of a finished wave is the first one of
+    its new wave).  'reset' resets every wave and writes the observations.
+
+    Parameter conn: the worker's end of the pipe to the parent
+    Precondition: conn is a multiprocessing Connection
+
+    Parameter name: the name of the worker's shared memory block
+    Precondition: name is a string
+
+    Parameter spec: the settings of the worker (see EpisodeRunner)
+    Precondition: spec is a dictionary with every key of EpisodeRunner.DEFAULTS
+    """
+    batch=WaveBatch(spec['waves'],spec['speed'],spec['rows'],spec['cols'],
+                    spec['seed'])
+    memory=shared_memory.SharedMemory(name=name)
+    try:
+        actions,rewards,dones,obs=_views(memory.buf,spec['waves'],
+                                         batch.observationSize())
+        while True:
+            command=conn.recv()
+            if command=='step':
+                r,d,e=batch.step(actions)
+                rewards[:]=r
+                dones[:]=d
+                if d.any():
+                    batch.reset(d)
+            elif command=='reset':
+                batch.reset()
+                rewards[:]=0
+                dones[:]=False
+            else:
+                break
+            batch.observe(obs)
+            conn.send(command)
+        del actions,rewards,dones,obs
+    finally:
+        memory.close()
+
+
+class EpisodeRunner(object):
+    """
+    A class to run batches of waves in worker processes.
+
+    Each worker is described by a dictionary of settings, with the keys in
+    DEFAULTS: 'waves' (the number of waves the worker runs), 'rows', 'cols',
+    'speed' and 'seed'.  Missing keys take the values in DEFAULTS, except the
+    seed, which is the worker's index if it is missing.
+
+    To run a step, write an ACTION_* constant for every wave into
+    getActions(i) for each worker i, then call step.  The arrays from
+    getActions, getRewards, getDones and getObservations are views of shared
+    memory, so they change in place on every step and reset.  A finished wave
+    is restarted at the end of the step that finished it.
+
+    A runner must be closed (or used in a with statement) so that its workers
+    stop and its shared memory is freed.
+
+    INSTANCE ATTRIBUTES:
+        _specs:    the settings of each worker [list of dict]
+        _memory:   the shared memory block of each worker
+                   [list of multiprocessing.shared_memory.SharedMemory]
+        _arrays:   the (actions,rewards,dones,observations) arrays of each
+                   worker [list of tuple]
+        _conns:    the parent's end of the pipe to each worker
+                   [list of multiprocessing Connection]
+        _workers:  the worker processes [list of multiprocessing Process]
+    """
+    # the settings used for anything a worker does not give
+    DEFAULTS={'waves':1,'rows':ALIEN_ROWS,'cols':ALIENS_IN_ROW,
+              'speed':ALIEN_SPEED,'seed':None}
+
+    # GETTERS
+    def getWorkers(self):
+        """
+        Returns: the number of workers
+        """
+        return len(self._specs)
+
+    def getSpec(self,i):
+        """
+        Returns: a copy of the settings of worker i
+
+        Parameter i: the worker
+        Precondition: i is an int in 0..getWorkers()-1
+        """
+        return dict(self._specs[i])
+
+    def getActions(self,i):
+        """
+        Returns: the array of actions of the waves of worker i, to be written
+        before each step
+
+        Parameter i: the worker
+        Precondition: i is an int in 0..getWorkers()-1
+        """
+        return self._arrays[i][0]
+
+    def getRewards(self,i):
+        """
+        Returns: the array of rewards of the waves of worker i from the last
+        step (do not modify it)
+
+        Parameter i: the worker
+        Precondition: i is an int in 0..getWorkers()-1
+        """
+        return self._arrays[i][1]
+
+    def getDones(self,i):
+        """
+        Returns: the array of done flags of the waves of worker i from the
+        last step (do not modify it)
+
+        Parameter i: the worker
+        Precondition: i is an int in 0..getWorkers()-1
+        """
+        return self._arrays[i][2]
+
+    def getObservations(self,i):
+        """
+        Returns: the waves x observation size array of observations of worker
+        i (do not modify it).  The layout is the one from InvadersEnv
+
+        Parameter i: the worker
+        Precondition: i is an int in 0..getWorkers()-1
+        """
+        return self._arrays[i][3]
+
+    # INITIALIZER
+    def __init__(self,workers,context=None):
+        """
+        Initializer: starts the workers and resets every wave
+
+        Parameter workers: the number of workers (all with the default
+        settings) or the settings of each worker
+        Precondition: workers is an int > 0, or a non-empty list of
+        dictionaries (see the class specification)
+
+        Parameter context: the multiprocessing start method ('fork', 'spawn'
+        or 'forkserver'), or None for the default
+        Precondition: context is None or a string
+        """
+        if type(workers)==int:
+            assert workers>0, '%s is not a valid worker count' % repr(workers)
+            workers=[{}]*workers
+        assert len(workers)>0, 'there must be at least one worker'
+        ctx=multiprocessing.get_context(context)
+        self._specs=[]
+        self._memory=[]
+        self._arrays=[]
+        self._conns=[]
+        self._workers=[]
+        try:
+            for i in range(len(workers)):
+                spec=dict(self.DEFAULTS)
+                spec['seed']=i
+                spec.update(workers[i])
+                size=WaveBatch(1,spec['speed'],spec['rows'],
+                               spec['cols']).observationSize()
+                end=_layout(spec['waves'],size)[-1]
+                memory=shared_memory.SharedMemory(create=True,size=end)
+                self._memory.append(memory)
+                self._arrays.append(_views(memory.buf,spec['waves'],size))
+                self._arrays[-1][0][:]=ACTION_NOOP
+                parent,child=ctx.Pipe()
+                worker=ctx.Process(target=_work,args=(child,memory.name,spec),
+                                   daemon=True)
+                worker.start()
+                child.close()
+                self._specs.append(spec)
+                self._conns.append(parent)
+                self._workers.append(worker)
+            self.reset()
+        except:
+            self.close()
+            raise
+
+    def __enter__(self):
+        """
+        Returns: this runner, for use in a with statement
+        """
+        return self
+
+    def __exit__(self,*args):
+        """
+        Closes this runner at the end of a with statement
+        """
+        self.close()
+
+    # METHODS TO RUN THE WORKERS
+    def reset(self):
+        """
+        Restarts every wave of every worker and waits for the observations.
+        """
+        self._command('reset')
+
+    def step(self):
+        """
+        Has every worker advance its waves one frame with the actions in
+        getActions, and waits for all of them to finish.
+        """
+        self._command('step')
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory.  Nothing happens if
+        the runner is already closed.
+        """
+        for conn in self._conns:
+            try:
+                conn.send('close')
+            except (BrokenPipeError,OSError):
+                pass
+        for worker in self._workers:
+            worker.join()
+        for conn in self._conns:
+            conn.close()
+        self._arrays=[]
+        for memory in self._memory:
+            try:
+                memory.close()
+            except BufferError:
+                pass # an array from a getter is still in use
+            memory.unlink()
+        self._conns=[]
+        self._workers=[]
+        self._memory=[]
+
+    # HELPER METHODS
+    def _command(self,command):
+        """
+        sends command to every worker, then waits for every worker to finish
+
+        Parameter command: the command to send
+        Precondition: command is 'step' or 'reset'
+        """
+        assert self._workers, 'the runner is closed'
+        for conn in self._conns:
+            conn.send(command)
+        for conn in self._conns:
+            conn.recv()
@@ -0,0 +1,1100 @@
+"""
+Headless simulation module for Alien Invaders
+
+This module contains the rules for a single wave of Alien Invaders with no
+graphics, sound or Kivy dependencies.  It only imports consts.py, config.py,
+formation.py and collide.py, none of which import Kivy, so it can be used to run
+batch simulations and regression tests on machines without a window.
+
+The class Wave in wave.py is a view over the class WaveSim.  It creates the
+GImage and GRectangle objects, asks WaveSim where they are, and plays the sounds
+for the events that WaveSim reports.  All of the gameplay (marching, firing,
+collisions and completion) happens here.
+"""
+from consts import *
+from config import *
+from formation import *
+from collide import GSpatialHash, swept_aabb, swept_bounds
+import random
+import struct
+import zlib
+
+
+class SimBox(object):
+    """
+    A class to represent an unrotated rectangle without any graphics.
+
+    It has the same x, y, width, height, left, right, top and bottom attributes
+    as a GObject that has not been rotated, so the rules in WaveSim read the
+    same as they would with GImage objects.
+
+    It also remembers where it was at the start of the current update, so that
+    a view can draw it part of the way between its last two positions.
+
+    INSTANCE ATTRIBUTES:
+        x:      the horizontal coordinate of the center [int or float]
+        y:      the vertical coordinate of the center [int or float]
+        width:  the width of the rectangle [int or float > 0]
+        height: the height of the rectangle [int or float > 0]
+        _px:    the value of x when remember was last called [int or float]
+        _py:    the value of y when remember was last called [int or float]
+    """
+    __slots__=('x','y','width','height','_px','_py')
+
+    @property
+    def left(self):
+        """the left edge of the rectangle"""
+        return self.x-self.width/2
+
+    @left.setter
+    def left(self,value):
+        self.x=value+self.width/2
+
+    @property
+    def right(self):
+        """the right edge of the rectangle"""
+        return self.x+self.width/2
+
+    @right.setter
+    def right(self,value):
+        self.x=value-self.width/2
+
+    @property
+    def top(self):
+        """the top edge of the rectangle"""
+        return self.y+self.height/2
+
+    @property
+    def bottom(self):
+        """the bottom edge of the rectangle"""
+        return self.y-self.height/2
+
+    def __init__(self,xx,yy,width,height):
+        """
+        Initializer: Creates a rectangle centered at xx,yy
+
+        Parameter xx: number(int or float) - the x position of the center
+        Parameter yy: number(int or float) - the y position of the center
+        Parameter width: number(int or float > 0) - the width
+        Parameter height: number(int or float > 0) - the height
+        """
+        self.x=xx
+        self.y=yy
+        self.width=width
+        self.height=height
+        self._px=xx
+        self._py=yy
+
+    def remember(self):
+        """
+        Saves the current position as the previous position
+        """
+        self._px=self.x
+        self._py=self.y
+
+    def lerpX(self,alpha):
+        """
+        Returns: the x coordinate alpha of the way from the previous position to
+        the current one
+
+        Parameter alpha: the fraction of the way to go
+        Precondition: alpha is a number in 0..1
+        """
+        return self._px+(self.x-self._px)*alpha
+
+    def lerpY(self,alpha):
+        """
+        Returns: the y coordinate alpha of the way from the previous position to
+        the current one
+
+        Parameter alpha: the fraction of the way to go
+        Precondition: alpha is a number in 0..1
+        """
+        return self._py+(self.y-self._py)*alpha
+
+    def box(self):
+        """
+        Returns: the rectangle as a tuple (left,bottom,right,top)
+        """
+        return (self.left,self.bottom,self.right,self.top)
+
+    def collides(self,bolt):
+        """
+        Returns: True if the bolt overlaps this rectangle at any point of its
+        last move, False otherwise
+
+        The bolt is swept from where it was when remember was last called to
+        where it is now, so a bolt that moves further than its own height in
+        one frame cannot jump over the rectangle.  Without a move, this is the
+        same test as checking whether a corner or the center of the bolt is
+        inside this rectangle (which is what Ship.collides does), since a bolt
+        is narrower and shorter than the ship and an alien.
+
+        Parameter bolt: The laser bolt to check
+        Precondition: bolt is of class SimBolt
+        """
+        return bolt.sweep(self.box()) is not None
+
+
+class SimShip(SimBox):
+    """
+    A class to represent the player ship without any graphics.
+
+    The ship starts centered in the middle of the screen with bottom a distance
+    SHIP_BOTTOM from the bottom of the window, just like Ship.
+
+    INSTANCE ATTRIBUTES:
+        _movement: the number of pixels the ship moves per update
+                   [int or float > 0]
+    """
+    __slots__=('_movement',)
+
+    def __init__(self,xx=GAME_WIDTH/2,movement=SHIP_MOVEMENT):
+        """
+        Initializer: Creates a ship with center xx
+
+        Parameter xx: number(int or float) - the x position of the ship
+        Parameter movement: number(int or float > 0) - pixels moved per update
+        """
+        super().__init__(xx,SHIP_BOTTOM+SHIP_HEIGHT/2,SHIP_WIDTH,SHIP_HEIGHT)
+        self._movement=movement
+
+    def _moveShipLeft(self):
+        """moves the ship _movement to the left, stopping at the edge"""
+        if(self.left-self._movement>=0):
+            self.x=self.x-self._movement
+        else:
+            self.left=0
+
+    def _moveShipRight(self):
+        """moves the ship _movement to the right, stopping at the edge"""
+        if(self.right+self._movement<=GAME_WIDTH):
+            self.x=self.x+self._movement
+        else:
+            self.right=GAME_WIDTH
+
+
+class SimBolt(SimBox):
+    """
+    A class to represent a laser bolt without any graphics.
+
+    INSTANCE ATTRIBUTES:
+        _velocity: The velocity in y direction [int or float]
+        _slot:     The index of this bolt in the alien bolt list of the
+                   BoltRegistry holding it [int >= 0, or -1 if it is not an
+                   alien bolt in a registry]
+    """
+    __slots__=('_velocity','_slot')
+
+    def getVel(self):
+        """
+        Returns: the velocity of the bolt
+        """
+        return self._velocity
+
+    def getSlot(self):
+        """
+        Returns: the index of this bolt in its registry's alien bolt list, or -1
+        """
+        return self._slot
+
+    def __init__(self,xx,yy,direction='up',speed=BOLT_SPEED):
+        """
+        Initializer: Creates a bolt at position xx,yy with width BOLT_WIDTH and
+        height BOLT_HEIGHT. Bolt velocity depends on direction
+
+        Parameter xx: number(int or float) - indicated x posisiton
+        Parameter yy: number (int or float) indicates y position
+        Parameter direction: string - 'up' or 'down'
+        Parameter speed: number (int or float > 0) - pixels moved per update
+        """
+        super().__init__(xx,yy,BOLT_WIDTH,BOLT_HEIGHT)
+        self._slot=-1
+        if(direction=='up'):
+            self._velocity=speed
+        else:
+            self._velocity=-speed
+
+    def _moveBolt(self):
+        """moves the bolt by _velocity, remembering where it was"""
+        self._py=self.y
+        self.y=self.y+self._velocity
+
+    def _reset(self,xx,yy,direction='up',speed=BOLT_SPEED):
+        """
+        Moves the bolt to xx,yy and sets its velocity from direction, so that
+        a removed bolt can be fired again
+
+        Parameter xx: number(int or float) - indicated x posisiton
+        Parameter yy: number (int or float) indicates y position
+        Parameter direction: string - 'up' or 'down'
+        Parameter speed: number (int or float > 0) - pixels moved per update
+        """
+        self.x=xx
+        self.y=yy
+        self.remember()
+        if(direction=='up'):
+            self._velocity=speed
+        else:
+            self._velocity=-speed
+
+    def start(self):
+        """
+        Returns: the bolt at the start of its last move, as a tuple (left,
+        bottom,right,top)
+        """
+        return (self._px-self.width/2,self._py-self.height/2,
+                self._px+self.width/2,self._py+self.height/2)
+
+    def swept(self):
+        """
+        Returns: the smallest box holding the bolt during its last move, as a
+        tuple (left,bottom,right,top)
+        """
+        return swept_bounds(self.start(),self.x-self._px,self.y-self._py)
+
+    def sweep(self,target):
+        """
+        Returns: the fraction of its last move at which the bolt first
+        overlapped target, or None if it did not overlap it
+
+        Parameter target: the box to check
+        Precondition: target is a tuple (left,bottom,right,top) of numbers
+        """
+        return swept_aabb(self.start(),self.x-self._px,self.y-self._py,target)
+
+
+class BoltRegistry(object):
+    """
+    A class to hold the bolts on screen, partitioned by owner.
+
+    There is at most one player bolt, so it is kept in its own attribute and
+    can be found without a search.  The alien bolts are kept in a list, and
+    each one knows its index in the list (its slot).  A bolt is removed by
+    moving the last bolt in the list into its slot, so removal never shifts the
+    list and is O(1).  This reorders the alien bolts, which does not matter
+    because they are all drawn and moved the same way.
+
+    Iterating over a registry gives the player bolt (if any) and then the alien
+    bolts.
+
+    Removed bolts are kept and handed out again by spawn, so firing does not
+    allocate new bolts once the registry has seen its peak number of bolts.
+
+    INSTANCE ATTRIBUTES:
+        _player: the player bolt [SimBolt, or None if there is none]
+        _aliens: the alien bolts [list of SimBolt, where _aliens[i].getSlot()==i]
+        _spare:  removed bolts ready to be reused [list of SimBolt]
+        _speed:  the number of pixels a bolt moves per update [int or float > 0]
+    """
+
+    # GETTERS
+    def getSpeed(self):
+        """
+        Returns: the number of pixels a bolt moves per update
+        """
+        return self._speed
+
+    def getPlayer(self):
+        """
+        Returns: the player bolt, or None if there is none
+        """
+        return self._player
+
+    def getAliens(self):
+        """
+        Returns: the list of alien bolts (do not modify it)
+        """
+        return self._aliens
+
+    # INITIALIZER
+    def __init__(self,speed=BOLT_SPEED):
+        """
+        Initializer: creates an empty registry
+
+        Parameter speed: the number of pixels a bolt moves per update
+        Precondition: speed is a number (int or float) > 0
+        """
+        self._player=None
+        self._aliens=[]
+        self._spare=[]
+        self._speed=speed
+
+    def __len__(self):
+        """
+        Returns: the number of bolts in the registry
+        """
+        return len(self._aliens)+(self._player is not None)
+
+    def __contains__(self,bolt):
+        """
+        Returns: True if bolt is in the registry
+        """
+        if bolt is self._player:
+            return bolt is not None
+        slot=bolt.getSlot()
+        return 0<=slot<len(self._aliens) and self._aliens[slot] is bolt
+
+    def __iter__(self):
+        """
+        Returns: an iterator over the player bolt (if any) and the alien bolts
+        """
+        if self._player is not None:
+            yield self._player
+        yield from self._aliens
+
+    # METHODS TO ADD AND REMOVE BOLTS
+    def spawn(self,xx,yy,direction='up'):
+        """
+        Returns: a bolt at xx,yy traveling in direction, which has been added
+        to the registry.  A removed bolt is reused if there is one.
+
+        Parameter xx: number(int or float) - indicated x posisiton
+        Parameter yy: number (int or float) indicates y position
+        Parameter direction: string - 'up' (the player) or 'down' (an alien)
+        """
+        if self._spare:
+            bolt=self._spare.pop()
+            bolt._reset(xx,yy,direction,self._speed)
+        else:
+            bolt=SimBolt(xx,yy,direction,self._speed)
+        self.add(bolt)
+        return bolt
+
+    def add(self,bolt):
+        """
+        Adds bolt to the registry.  A bolt going up is the player bolt.
+
+        Parameter bolt: the bolt to add
+        Precondition: bolt is a SimBolt not in a registry.  If it is going up,
+        there is no player bolt in this registry.
+        """
+        if bolt.getVel()>0:
+            assert self._player is None, 'there is already a player bolt'
+            self._player=bolt
+        else:
+            bolt._slot=len(self._aliens)
+            self._aliens.append(bolt)
+
+    def remove(self,bolt):
+        """
+        Removes bolt from the registry.
+
+        Parameter bolt: the bolt to remove
+        Precondition: bolt is in this registry
+        """
+        if bolt is self._player:
+            self._player=None
+        else:
+            slot=bolt._slot
+            last=self._aliens.pop()
+            if last is not bolt:
+                self._aliens[slot]=last
+                last._slot=slot
+            bolt._slot=-1
+        self._spare.append(bolt)
+
+    def clear(self):
+        """
+        Removes every bolt from the registry.
+        """
+        for bolt in self._aliens:
+            bolt._slot=-1
+            self._spare.append(bolt)
+        self._aliens.clear()
+        if self._player is not None:
+            self._spare.append(self._player)
+            self._player=None
+
+    # METHODS TO SAVE AND RESTORE THE STATE
+    def snapshot(self):
+        """
+        Returns: the bolts in the registry as a tuple, for restore.  Each bolt
+        is a tuple (x,y,px,py,velocity), where px,py is where the bolt was at
+        the start of its last move.
+        """
+        player=self._player
+        if player is not None:
+            player=(player.x,player.y,player._px,player._py,player._velocity)
+        return (player,tuple((b.x,b.y,b._px,b._py,b._velocity)
+                             for b in self._aliens))
+
+    def restore(self,state):
+        """
+        Replaces the bolts in the registry with the bolts in a state returned
+        by snapshot.  The alien bolts keep their slots.
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot
+        """
+        self.clear()
+        player,aliens=state
+        if player is not None:
+            self._load(player)
+        for bolt in aliens:
+            self._load(bolt)
+
+    def _load(self,state):
+        """
+        Adds a bolt with the given (x,y,px,py,velocity) state to the registry
+
+        Parameter state: the bolt state
+        Precondition: state is a tuple returned in a snapshot
+        """
+        x,y,px,py,velocity=state
+        bolt=self.spawn(x,y,'up' if velocity>0 else 'down')
+        bolt._px=px
+        bolt._py=py
+        bolt._velocity=velocity
+
+
+class WaveSim(object):
+    """
+    This class runs the rules of a single wave of Alien Invaders.
+
+    It has the same rules as the original Wave.update: the aliens march back
+    and forth and down the screen, fire bolts from random columns, and are
+    destroyed by the player's bolt.  The wave is complete when the aliens
+    cross the defense line, all of the aliens are killed, or all lives are lost.
+
+    Nothing here draws or plays sounds.  Instead, update returns a combination
+    of the EVENT_* flags in consts.py so that a view can react to what happened.
+    The ship, aliens and bolts remember where they were before the last update,
+    so a view can draw them between their last two positions.
+
+    The living aliens, the bolts and the ship are registered in a spatial hash.
+    Collisions are only tested against the objects in the grid cells that a
+    bolt (or the ship) overlaps, so the cost of collision detection follows the
+    number of bolts instead of the number of bolts times the number of aliens.
+    Aliens are registered by their index row*cols+col in the formation; bolts
+    and the ship are registered by themselves.
+
+    Bolts are registered with the box they swept over during the frame, and
+    the collision tests are swept too (see SimBolt.sweep).  A bolt that moves
+    further than an alien's height in one frame (a fast bolt, or a slow
+    frame) still hits what it passed over.  The aliens and the ship are tested
+    where they are at the end of the frame.
+
+    INSTANCE ATTRIBUTES:
+        _ship:   the player ship [SimShip, or None if the ship was destroyed]
+        _aliens: the aliens in the wave [Formation]
+        _bolts:  the laser bolts currently on screen [BoltRegistry]
+        _lives:  the number of lives left  [int >= 0]
+        _time:   The amount of time since the last Alien "step" [number >= 0].
+                 When the aliens step, the time past _alienSpeed is kept, so
+                 the aliens march at the same rate no matter how long a frame
+                 is
+        _alienDirection: the direction the aliens are moving ['left' or 'right']
+        _alienFire: The number of steps before the next bolt is fired by the
+                 aliens [float]
+        _alienStep: the number of steps the aliens have taken since last bolt
+                 [int >= 0]
+        _waveComplete: one of NOT_COMPLETE, DLINE_CROSSED, ALIENS_KILLED or
+                 LIVES_LOST [int]
+        _alienSpeed: the number of seconds between alien steps [float > 0]
+        _config: the settings of the wave [WaveConfig]
+        _hash:   the broad-phase grid holding the living aliens, the bolts and
+                 the ship [GSpatialHash]
+        _seed:   the seed _rng started from [int]
+        _rng:    the random number generator for alien fire [random.Random]
+        _hitX:   the x position of the ship when it was last hit [int or
+                 float, or None if it has not been hit].  This only reports
+                 what happened, like the events of update, so it is not part
+                 of a snapshot, a packed wave or the checksum
+    """
+    # the layout of the start of a packed wave: the ship x and previous x, the
+    # time, the time of the next alien bolt, whether there is a ship, the
+    # lives, the alien steps, whether the wave is complete, whether the aliens
+    # march right, whether there is a player bolt and the number of alien bolts
+    _PACKED='<4d7i'
+
+    # GETTERS AND SETTERS
+    def getShip(self):
+        """
+        Returns: the ship, or None if it was destroyed
+        """
+        return self._ship
+
+    def resetShip(self,xx=GAME_WIDTH/2):
+        """
+        Restores the ship after it was destroyed.
+
+        Parameter xx: the x position of the restored ship
+        Precondition: xx is a number (int or float)
+        """
+        if self._ship is not None:
+            self._hash.remove(self._ship)
+        self._ship=SimShip(xx,self._config.getShipMovement())
+        self._register(self._ship)
+
+    def getAliens(self):
+        """
+        Returns: the formation of aliens
+        """
+        return self._aliens
+
+    def getBolts(self):
+        """
+        Returns: the registry of bolts on screen
+        """
+        return self._bolts
+
+    def getLives(self):
+        """
+        Returns: the number of lives the player has left
+        """
+        return self._lives
+
+    def getLastHitX(self):
+        """
+        Returns: the x position of the ship when it was last hit, or None if
+        it has not been hit
+
+        The ship is destroyed on the frame it is hit, so after an update that
+        reports EVENT_SHIP_HIT this is the only record of where it was.
+        """
+        return self._hitX
+
+    def getWaveComplete(self):
+        """
+        Returns: one of NOT_COMPLETE, DLINE_CROSSED, ALIENS_KILLED or LIVES_LOST
+        """
+        return self._waveComplete
+
+    def getAlienDirection(self):
+        """
+        Returns: the direction the aliens are marching, 'left' or 'right'
+        """
+        return self._alienDirection
+
+    def getConfig(self):
+        """
+        Returns: the settings of the wave
+        """
+        return self._config
+
+    def getSeed(self):
+        """
+        Returns: the seed the random numbers of the wave started from
+        """
+        return self._seed
+
+    def getRandomState(self):
+        """
+        Returns: the state of the random numbers of the wave, for
+        setRandomState
+        """
+        return self._rng.getstate()
+
+    def setRandomState(self,state):
+        """
+        Puts the random numbers of the wave back in a state returned by
+        getRandomState, so the aliens fire as they did from that state
+
+        Parameter: state is the state to restore
+        Precondition: state was returned by getRandomState
+        """
+        self._rng.setstate(state)
+
+    # INITIALIZER
+    def __init__(self,config=None,seed=None):
+        """
+        Initializer: creates a new wave of aliens
+
+        Parameter: config is the settings of the wave (the size of the
+        formation, the speed of the aliens and bolts, the rate of alien fire
+        and the number of lives), or None for the defaults in consts.py
+        Precondition: config is None or a WaveConfig
+
+        Parameter: seed is the seed for alien fire, or None to draw one from
+        the random module.  Each wave has its own stream of random numbers, so
+        waves with the same seed and inputs play out the same, even when other
+        waves are run at the same time
+        Precondition: seed is None or an int
+        """
+        if config is None:
+            config=WaveConfig()
+        self._config=config
+        self._aliens=Formation(config)
+        self._ship=SimShip(GAME_WIDTH/2,config.getShipMovement())
+        self._bolts=BoltRegistry(config.getBoltSpeed())
+        self._lives=config.getLives()
+        self._time=0
+        self._alienDirection='right'
+        if seed is None:
+            seed=random.getrandbits(64)
+        self._seed=seed
+        self._rng=random.Random(seed)
+        self._alienFire=self._rng.uniform(1,config.getBoltRate())
+        self._alienStep=0
+        self._waveComplete=NOT_COMPLETE
+        self._alienSpeed=config.getSpeed()
+        self._hitX=None
+        self._hash=GSpatialHash(COLLISION_CELL_WIDTH,COLLISION_CELL_HEIGHT)
+        self._register(self._ship)
+        self._registerAliens()
+
+    # METHODS TO SAVE, RESTORE AND COPY THE STATE
+    def snapshot(self):
+        """
+        Returns: the state of the wave as a tuple, for restore
+
+        The state has the formation, ship, bolts, lives, timers, direction and
+        random number generator, so a wave restored to it plays out exactly as
+        this one would from here.  It also keeps the aliens' part of the
+        spatial hash, so restore does not have to register them again.  It
+        holds copies, so later updates do not change it.
+        """
+        ship=self._ship
+        if ship is not None:
+            ship=(ship.x,ship._px)
+        grid=self._hash.copy()
+        if ship is not None:
+            grid.remove(self._ship)
+        for bolt in self._bolts:
+            grid.remove(bolt)
+        return (self._aliens.snapshot(),grid,ship,self._bolts.snapshot(),
+                self._lives,self._time,self._alienDirection,self._alienFire,
+                self._alienStep,self._waveComplete,self._rng.getstate())
+
+    def restore(self,state):
+        """
+        Puts the wave back in a state returned by snapshot.  The same state can
+        be restored any number of times.
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot on a wave with the same
+        number of rows and columns
+        """
+        (formation,grid,ship,bolts,self._lives,self._time,self._alienDirection,
+         self._alienFire,self._alienStep,self._waveComplete,rng)=state
+        self._aliens.restore(formation)
+        self._bolts.restore(bolts)
+        self._rng.setstate(rng)
+        if ship is None:
+            self._ship=None
+        else:
+            if self._ship is None:
+                self._ship=SimShip(GAME_WIDTH/2,self._config.getShipMovement())
+            self._ship.x,self._ship._px=ship
+        self._hash=grid.copy()
+        if self._ship is not None:
+            self._register(self._ship)
+        for bolt in self._bolts:
+            self._hash.insert(bolt,*bolt.swept())
+
+    def pack(self):
+        """
+        Returns: the state of the wave packed into bytes, for unpack
+
+        This is much smaller than a snapshot (a few hundred bytes for the
+        default wave), so many of them can be kept, but unpack is slower than
+        restore since it builds the spatial hash again.  The random number
+        generator is not included, as its state is much larger than the rest
+        of the wave and only changes when an alien fires; save it with
+        getRandomState.
+        """
+        ship=self._ship
+        player=self._bolts.getPlayer()
+        aliens=self._bolts.getAliens()
+        head=struct.pack(WaveSim._PACKED,
+                         ship.x if ship is not None else 0.0,
+                         ship._px if ship is not None else 0.0,
+                         self._time,self._alienFire,ship is not None,self._lives,
+                         self._alienStep,self._waveComplete,
+                         self._alienDirection=='right',player is not None,
+                         len(aliens))
+        coords=[]
+        for bolt in self._bolts:
+            coords.extend((bolt.x,bolt.y,bolt._px,bolt._py,bolt._velocity))
+        return (head+struct.pack('<%dd' % len(coords),*coords)+
+                self._aliens.pack())
+
+    def unpack(self,data):
+        """
+        Puts the wave back in a state returned by pack.  The random number
+        generator is not changed (see setRandomState).
+
+        Parameter data: the packed state
+        Precondition: data was returned by pack on a wave with the same
+        number of rows and columns
+        """
+        (x,px,self._time,self._alienFire,hasShip,self._lives,self._alienStep,
+         self._waveComplete,right,hasPlayer,count)=struct.unpack_from(
+             WaveSim._PACKED,data)
+        self._alienDirection='right' if right else 'left'
+        pos=struct.calcsize(WaveSim._PACKED)
+        total=hasPlayer+count
+        coords=struct.unpack_from('<%dd' % (5*total),data,pos)
+        bolts=[coords[5*i:5*i+5] for i in range(total)]
+        player=bolts.pop(0) if hasPlayer else None
+        self._bolts.restore((player,bolts))
+        self._aliens.unpack(data[pos+40*total:])
+        if not hasShip:
+            self._ship=None
+        else:
+            if self._ship is None:
+                self._ship=SimShip(GAME_WIDTH/2,self._config.getShipMovement())
+            self._ship.x=x
+            self._ship._px=px
+        self._hash=GSpatialHash(COLLISION_CELL_WIDTH,COLLISION_CELL_HEIGHT)
+        self._registerAliens()
+        if self._ship is not None:
+            self._register(self._ship)
+        for bolt in self._bolts:
+            self._hash.insert(bolt,*bolt.swept())
+
+    def checksum(self):
+        """
+        Returns: a CRC-32 of the state of the wave
+
+        The checksum covers the positions of the living aliens, the bolts and
+        the ship, the lives, the timers, the direction and whether the wave is
+        complete, so two waves that play out differently get different
+        checksums from the first frame where they differ (up to the odd
+        collision).  It takes a few microseconds, so it can be taken on every
+        frame.
+        """
+        coords=[]
+        for bolt in self._bolts:
+            coords.append(bolt.x)
+            coords.append(bolt.y)
+        ship=self._ship.x if self._ship is not None else -1.0
+        crc=zlib.crc32(struct.pack('<%dd' % len(coords),*coords))
+        crc=zlib.crc32(struct.pack('<4d4i',ship,self._time,self._alienFire,
+                                   self._alienSpeed,self._lives,self._alienStep,
+                                   self._waveComplete,
+                                   self._alienDirection=='right'),crc)
+        return self._aliens.checksum(crc)
+
+    def clone(self):
+        """
+        Returns: a new wave in the same state as this one
+
+        The new wave shares nothing that changes with this one, so the two can
+        be updated separately.  This is faster than restoring a snapshot into
+        a new wave, since the spatial hash is copied instead of rebuilt.
+        """
+        other=WaveSim.__new__(WaveSim)
+        other._aliens=self._aliens.copy()
+        other._bolts=BoltRegistry(self._bolts.getSpeed())
+        other._bolts.restore(self._bolts.snapshot())
+        other._lives=self._lives
+        other._time=self._time
+        other._alienDirection=self._alienDirection
+        other._alienFire=self._alienFire
+        other._alienStep=self._alienStep
+        other._waveComplete=self._waveComplete
+        other._alienSpeed=self._alienSpeed
+        other._config=self._config
+        other._seed=self._seed
+        other._hitX=self._hitX
+        other._rng=random.Random.__new__(random.Random)
+        other._rng.setstate(self._rng.getstate())
+        other._hash=self._hash.copy()
+        other._ship=None
+        if self._ship is not None:
+            other._ship=SimShip(self._ship.x,self._ship._movement)
+            other._ship._px=self._ship._px
+            other._hash.remove(self._ship)
+            other._register(other._ship)
+        for old,new in zip(self._bolts,other._bolts):
+            other._hash.remove(old)
+            other._hash.insert(new,*new.swept())
+        return other
+
+    # UPDATE METHOD
+    def update(self,dt,direction='',fire=False):
+        """
+        Advances the wave by one frame.
+
+        Returns: the events that happened this frame, as a combination of
+        EVENT_SHIP_FIRED, EVENT_ALIEN_FIRED, EVENT_ALIEN_HIT and EVENT_SHIP_HIT
+
+        Parameter: dt, the time in seconds since last update
+        Precondition: dt is number (int or float)
+
+        Parameter: direction is the direction of the arrow pressed
+        Precondition: direction is one of '', 'left', 'right' or 'up'
+
+        Parameter: fire is whether to fire as well as move, so that the ship
+        can fire and move on the same frame ('up' always fires)
+        Precondition: fire is a bool
+        """
+        events=0
+        self._time=self._time+dt
+        self._aliens.remember()
+        if(self._ship is not None):
+            self._ship.remember()
+        if(direction=='up' or fire):
+            if(self._isNotPlayerBolt() and self._ship is not None):
+                self._addBolt(self._ship.x,self._ship.y,'up')
+                events=events|EVENT_SHIP_FIRED
+        if(self._ship is not None):
+            if (direction=='left'):
+                self._ship._moveShipLeft()
+                self._register(self._ship)
+            if (direction=='right'):
+                self._ship._moveShipRight()
+                self._register(self._ship)
+        if(self._time>self._alienSpeed):
+            events=events|self._moveAliens()
+            self._time=self._time-self._alienSpeed
+        self._moveBolts()
+        events=events|self._checkBoltColAlien()
+        events=events|self._checkBoltColShip()
+        self._removeOffscreenBolts()
+        self._complete()
+        return events
+
+    def step_many(self,n,inputs,dt=GAME_TIMESTEP):
+        """
+        Advances the wave by up to n frames of length dt.
+
+        This runs the same frame as update in a loop, so fast-forwarding,
+        replays and bots do not have to go through the game loop once per
+        frame.  It stops early when the wave is complete or the ship is
+        destroyed, since the game pauses at that point.
+
+        Returns: a dictionary with the totals for the frames that were run.
+        The keys are 'frames' (the number of frames run), 'shots' (bolts fired
+        by the ship), 'alienShots' (bolts fired by the aliens), 'kills' (aliens
+        destroyed), 'hits' (times the ship was destroyed), 'events' (the
+        EVENT_* flags of every frame combined) and 'complete' (the value of
+        getWaveComplete at the end)
+
+        Parameter: n is the largest number of frames to run
+        Precondition: n is an int >= 0
+
+        Parameter: inputs is the direction pressed on each frame
+        Precondition: inputs is a sequence (or iterable) of at least n values,
+        each one of '', 'left', 'right' or 'up'
+
+        Parameter: dt, the time in seconds of each frame
+        Precondition: dt is number (int or float)
+        """
+        frames=0
+        shots=0
+        alienShots=0
+        kills=0
+        hits=0
+        combined=0
+        update=self.update
+        for direction in inputs:
+            if(frames>=n or self._waveComplete!=NOT_COMPLETE or
+               self._ship is None):
+                break
+            events=update(dt,direction)
+            frames=frames+1
+            if events:
+                combined=combined|events
+                if(events & EVENT_SHIP_FIRED):
+                    shots=shots+1
+                if(events & EVENT_ALIEN_FIRED):
+                    alienShots=alienShots+1
+                if(events & EVENT_ALIEN_HIT):
+                    kills=kills+1
+                if(events & EVENT_SHIP_HIT):
+                    hits=hits+1
+        return {'frames':frames,'shots':shots,'alienShots':alienShots,
+                'kills':kills,'hits':hits,'events':combined,
+                'complete':self._waveComplete}
+
+    # HELPER METHODS
+    def _register(self,box):
+        """
+        registers box in _hash at its current position (or moves it there if it
+        is already registered)
+
+        Parameter box: the bolt or ship to register
+        Precondition: box is a SimBox
+        """
+        self._hash.insert(box,box.left,box.bottom,box.right,box.top)
+
+    def _registerAliens(self):
+        """
+        registers every living alien in _hash at its current position. this is
+        called whenever the formation moves
+        """
+        cols=self._aliens.getShape()[1]
+        xs=self._aliens.getX()
+        ys=self._aliens.getY()
+        for r,c in zip(*self._aliens.getAlive().nonzero()):
+            x=float(xs[r,c])
+            y=float(ys[r,c])
+            self._hash.insert(int(r)*cols+int(c),x-ALIEN_WIDTH/2,y-ALIEN_HEIGHT/2,
+                              x+ALIEN_WIDTH/2,y+ALIEN_HEIGHT/2)
+
+    def _addBolt(self,xx,yy,direction):
+        """
+        adds a bolt at xx,yy to _bolts and registers it in _hash
+
+        Parameter xx: number(int or float) - indicated x posisiton
+        Parameter yy: number (int or float) indicates y position
+        Parameter direction: string - 'up' (the player) or 'down' (an alien)
+        """
+        self._register(self._bolts.spawn(xx,yy,direction))
+
+    def _moveAliens(self):
+        """
+        moves every alien ALIEN_H_WALK to the right or to the left. if the
+        rightmost alien reaches the right edge, or if the leftmost alien
+        reaches the left edge, the aliens move ALIEN_V_SEP down
+
+        Returns: EVENT_ALIEN_FIRED if the aliens fired a bolt, 0 otherwise
+        """
+        if(self._alienDirection=='right'):
+            right=self._aliens.right()
+            if right is None:
+                return 0
+            if(GAME_WIDTH-right<=ALIEN_H_SEP):
+                self._aliens.drop(ALIEN_V_SEP)
+                self._alienDirection='left'
+            else:
+                self._aliens.march(ALIEN_H_WALK)
+        elif(self._alienDirection=='left'):
+            left=self._aliens.left()
+            if left is None:
+                return 0
+            if(left<=ALIEN_H_SEP):
+                self._aliens.drop(ALIEN_V_SEP)
+                self._alienDirection='right'
+            else:
+                self._aliens.march(-ALIEN_H_WALK)
+        self._registerAliens()
+        self._alienStep=self._alienStep+1
+        if(self._alienStep>=self._alienFire):
+            self._alienStep=0
+            self._fireAlienBolt()
+            return EVENT_ALIEN_FIRED
+        return 0
+
+    def _moveBolts(self):
+        """
+        moves every bolt and registers it in _hash with the box it swept over
+        """
+        for bolt in self._bolts:
+            bolt._moveBolt()
+            self._hash.insert(bolt,*bolt.swept())
+
+    def _removeOffscreenBolts(self):
+        """
+        removes the bolts that have gone off the top or bottom of the screen.
+        this is done after the collision checks, so a bolt can still hit
+        something on the frame that it leaves the screen. the alien bolts are
+        visited last to first, so a bolt swapped into a removed bolt's slot has
+        already been checked
+        """
+        bolt=self._bolts.getPlayer()
+        if bolt is not None:
+            self._removeIfOffscreen(bolt)
+        aliens=self._bolts.getAliens()
+        for i in range(len(aliens)-1,-1,-1):
+            self._removeIfOffscreen(aliens[i])
+
+    def _removeIfOffscreen(self,bolt):
+        """
+        removes bolt if it has gone off the top or bottom of the screen
+
+        Parameter bolt: the bolt to check
+        Precondition: bolt is in _bolts
+        """
+        if(bolt.bottom>=GAME_HEIGHT or bolt.top<=0):
+            self._bolts.remove(bolt)
+            self._hash.remove(bolt)
+
+    def _isNotPlayerBolt(self):
+        """
+        Returns: False if there is a player bolt on screen, True otherwise
+        """
+        return self._bolts.getPlayer() is None
+
+    def _PlayerBolt(self):
+        """
+        Returns: the player bolt or None if there are no player bolts
+        """
+        return self._bolts.getPlayer()
+
+    def _fireAlienBolt(self):
+        """
+        fires a bolt from the bottom alien of a random column. the column is
+        chosen from the columns that still have aliens
+        """
+        c=self._aliens.randomColumn(self._rng)
+        if c==-1:
+            return
+        r=self._aliens.bottomRow(c)
+        x=float(self._aliens.getX()[r,c])
+        y=float(self._aliens.getY()[r,c])-ALIEN_HEIGHT/2
+        self._addBolt(x,y-BOLT_HEIGHT/2,'down')
+        self._alienFire=self._rng.uniform(1,self._config.getBoltRate())
+
+    def _checkBoltColAlien(self):
+        """
+        checks if the ship's bolt collides with an alien. if the bolt collides,
+        the alien is killed and the bolt is removed from _bolts. only the aliens
+        along the path of the bolt in _hash are tested. if the bolt passes over
+        more than one alien, the first one it reaches is killed (top row first
+        if it reaches several at once)
+
+        Returns: EVENT_ALIEN_HIT if an alien was destroyed, 0 otherwise
+        """
+        bolt=self._PlayerBolt()
+        if bolt is None:
+            return 0
+        cols=self._aliens.getShape()[1]
+        hit=-1
+        first=None
+        for key in self._hash.query(*bolt.swept()):
+            if type(key)==int:
+                t=bolt.sweep(self._aliens.box(key//cols,key%cols))
+                if t is not None and (hit==-1 or t<first or (t==first and key<hit)):
+                    hit=key
+                    first=t
+        if hit==-1:
+            return 0
+        self._aliens.kill(hit//cols,hit%cols)
+        self._hash.remove(hit)
+        self._hash.remove(bolt)
+        self._bolts.remove(bolt)
+        return EVENT_ALIEN_HIT
+
+    def _checkBoltColShip(self):
+        """
+        check if one of the aliens bolts collides with the ship
+        if it collides, the ship is set to none and the bolt is removed
+        from _bolts. only the bolts near the ship in _hash are tested. if more
+        than one bolt hits the ship, the one in the lowest slot is removed
+
+        Returns: EVENT_SHIP_HIT if the ship was destroyed, 0 otherwise.  The
+        position of the ship is kept in _hitX
+        """
+        ship=self._ship
+        if ship is None:
+            return 0
+        hits=[]
+        for key in self._hash.query(*ship.box()):
+            if type(key)==SimBolt and key.getVel()<0 and ship.collides(key):
+                hits.append(key)
+        if not hits:
+            return 0
+        bolt=min(hits,key=SimBolt.getSlot)
+        self._hash.remove(ship)
+        self._hash.remove(bolt)
+        self._hitX=ship.x
+        self._ship=None
+        self._bolts.remove(bolt)
+        self._lives=self._lives-1
+        return EVENT_SHIP_HIT
+
+    def _complete(self):
+        """
+        changes waveComplete based on whether the aliens are below the dline,
+        all aliens are killed, or lives =0
+        """
+        if self._lives==0:
+            self._waveComplete=LIVES_LOST
+        elif self._aliens.crossed(DEFENSE_LINE):
+            self._waveComplete=DLINE_CROSSED
+        elif self._aliens.count()==0:
+            self._waveComplete=ALIENS_KILLED
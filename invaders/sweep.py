@@ -0,0 +1,239 @@
+"""
+Difficulty sweep tool for Alien Invaders
+
+This module plays headless waves over a grid of settings and reports how each
+setting went.  For example
+
+    python sweep.py --rows 3,5 --cols 8:12:2 --speed 0.25,0.5,1.0 --episodes 20
+
+plays 20 waves of each of the 2*3*3 configurations with a scripted player, in
+parallel worker processes, and prints one CSV line per configuration with the
+win rate, the mean wave duration and the simulated frames per second.  The
+grid can also cover --bolt-rate and --bolt-speed.  Each list is a comma
+separated list of values, where a value can be a range start:stop:step (stop
+included).
+
+Only flags are accepted.  consts.py reads its positional command line
+arguments when it is imported, so they are hidden from it here.
+"""
+import sys
+_argv=sys.argv
+sys.argv=sys.argv[:1]
+from consts import *
+from config import *
+from sim import *
+sys.argv=_argv
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import time
+
+
+def trackingBot(sim):
+    """
+    Returns: the input of a simple scripted player for the current frame, as
+    a tuple (direction,fire) for WaveSim.update
+
+    The player moves out from under the lowest alien bolt above it, and
+    otherwise moves under the nearest column with a living alien and fires.
+
+    Parameter sim: the wave being played
+    Precondition: sim is a WaveSim
+    """
+    ship=sim.getShip()
+    if ship is None:
+        return ('',False)
+    danger=None
+    for bolt in sim.getBolts().getAliens():
+        if(abs(bolt.x-ship.x)<(SHIP_WIDTH+BOLT_WIDTH)/2+SHIP_MOVEMENT and
+           bolt.bottom<ship.top-4*bolt.getVel() and
+           (danger is None or bolt.y<danger.y)):
+            danger=bolt
+    if danger is not None:
+        if(danger.x>ship.x and ship.left>SHIP_MOVEMENT) or \
+          (ship.right>=GAME_WIDTH-SHIP_MOVEMENT):
+            return ('left',False)
+        return ('right',False)
+    formation=sim.getAliens()
+    xs=formation.getX()[0]
+    target=None
+    for c in formation.getAlive().any(axis=0).nonzero()[0]:
+        if target is None or abs(xs[c]-ship.x)<abs(target-ship.x):
+            target=float(xs[c])
+    if target is None:
+        return ('',False)
+    if target<ship.x-SHIP_MOVEMENT/2:
+        return ('left',abs(target-ship.x)<ALIEN_WIDTH/2)
+    if target>ship.x+SHIP_MOVEMENT/2:
+        return ('right',abs(target-ship.x)<ALIEN_WIDTH/2)
+    return ('',True)
+
+
+def playConfig(config):
+    """
+    Returns: the results of playing every wave of a configuration, as a
+    dictionary with the settings in config and the keys 'episodes', 'wins',
+    'win_rate', 'dline_crossed', 'lives_lost', 'unfinished', 'mean_frames',
+    'mean_seconds' and 'frames_per_sec'
+
+    Each wave is played by trackingBot until it is complete or max_frames
+    frames have passed, replacing the ship in the middle of the screen when
+    it is destroyed.  Wave i is seeded with seed+i.
+
+    Parameter config: the settings to play
+    Precondition: config is a dictionary with the keys 'rows', 'cols',
+    'speed', 'bolt_rate', 'bolt_speed', 'episodes', 'seed' and 'max_frames'
+    """
+    counts={NOT_COMPLETE:0,DLINE_CROSSED:0,ALIENS_KILLED:0,LIVES_LOST:0}
+    settings=WaveConfig(config['rows'],config['cols'],config['speed'],
+                        config['bolt_rate'],config['bolt_speed'])
+    frames=0
+    start=time.perf_counter()
+    for i in range(config['episodes']):
+        sim=WaveSim(settings,config['seed']+i)
+        n=0
+        while n<config['max_frames'] and sim.getWaveComplete()==NOT_COMPLETE:
+            if sim.getShip() is None:
+                sim.resetShip()
+            direction,fire=trackingBot(sim)
+            sim.update(GAME_TIMESTEP,direction,fire)
+            n=n+1
+        counts[sim.getWaveComplete()]+=1
+        frames=frames+n
+    elapsed=time.perf_counter()-start
+    episodes=config['episodes']
+    result=dict(config)
+    result.update({'wins':counts[ALIENS_KILLED],
+                   'win_rate':counts[ALIENS_KILLED]/episodes,
+                   'dline_crossed':counts[DLINE_CROSSED],
+                   'lives_lost':counts[LIVES_LOST],
+                   'unfinished':counts[NOT_COMPLETE],
+                   'mean_frames':frames/episodes,
+                   'mean_seconds':frames*GAME_TIMESTEP/episodes,
+                   'frames_per_sec':frames/elapsed if elapsed>0 else 0.0})
+    return result
+
+
+def parseValues(text,kind):
+    """
+    Returns: the list of values in text
+
+    Parameter text: a comma separated list of values or ranges start:stop:step
+    (stop included)
+    Precondition: text is a string
+
+    Parameter kind: the type of the values
+    Precondition: kind is int or float
+    """
+    values=[]
+    for part in text.split(','):
+        bounds=part.split(':')
+        if len(bounds)==1:
+            values.append(kind(part))
+            continue
+        if len(bounds)!=3:
+            raise argparse.ArgumentTypeError('%s is not start:stop:step' % repr(part))
+        start,stop,step=(kind(b) for b in bounds)
+        if step<=0:
+            raise argparse.ArgumentTypeError('%s has a step <= 0' % repr(part))
+        i=0
+        while start+i*step<=stop+step*1e-9:
+            values.append(kind(round(start+i*step,9)))
+            i=i+1
+    return values
+
+
+def configs(args):
+    """
+    Returns: the list of configurations in the grid given by args
+
+    Parameter args: the parsed command line
+    Precondition: args came from the parser made by parser()
+    """
+    result=[]
+    for rows,cols,speed,rate,bolt in itertools.product(
+            args.rows,args.cols,args.speed,args.bolt_rate,args.bolt_speed):
+        result.append({'rows':rows,'cols':cols,'speed':speed,'bolt_rate':rate,
+                       'bolt_speed':bolt,'episodes':args.episodes,
+                       'seed':args.seed,'max_frames':args.max_frames})
+    return result
+
+
+def parser():
+    """
+    Returns: the command line parser of the sweep tool
+    """
+    p=argparse.ArgumentParser(description='Play headless waves of Alien '
+                              'Invaders over a grid of settings.')
+    ints=lambda text: parseValues(text,int)
+    floats=lambda text: parseValues(text,float)
+    p.add_argument('--rows',type=ints,default=[ALIEN_ROWS],
+                   help='rows of aliens (1..10)')
+    p.add_argument('--cols',type=ints,default=[ALIENS_IN_ROW],
+                   help='aliens per row (1..15)')
+    p.add_argument('--speed',type=floats,default=[ALIEN_SPEED],
+                   help='seconds between alien steps')
+    p.add_argument('--bolt-rate',type=floats,default=[BOLT_RATE],
+                   help='most alien steps between alien bolts')
+    p.add_argument('--bolt-speed',type=floats,default=[BOLT_SPEED],
+                   help='pixels a bolt moves per frame')
+    p.add_argument('--episodes',type=int,default=10,
+                   help='waves played per configuration')
+    p.add_argument('--seed',type=int,default=0,
+                   help='seed of the first wave of each configuration')
+    p.add_argument('--max-frames',type=int,default=36000,
+                   help='frames after which a wave is stopped as unfinished')
+    p.add_argument('--workers',type=int,default=None,
+                   help='worker processes (default: one per core)')
+    p.add_argument('--format',choices=('csv','json'),default='csv')
+    p.add_argument('--output',default=None,
+                   help='file to write (default: standard output)')
+    return p
+
+
+def main(argv=None):
+    """
+    Runs the sweep tool
+
+    Parameter argv: the command line arguments, or None to use sys.argv
+    Precondition: argv is None or a list of strings
+    """
+    args=parser().parse_args(argv)
+    for rows in args.rows:
+        if not 1<=rows<=10:
+            parser().error('rows must be in 1..10')
+    for cols in args.cols:
+        if not 1<=cols<=15:
+            parser().error('cols must be in 1..15')
+    for speed in args.speed:
+        if not speed>0:
+            parser().error('speed must be greater than 0')
+    for rate in args.bolt_rate:
+        if not rate>=1:
+            parser().error('bolt-rate must be at least 1')
+    for speed in args.bolt_speed:
+        if not speed>0:
+            parser().error('bolt-speed must be greater than 0')
+    if args.episodes<=0:
+        parser().error('episodes must be greater than 0')
+    grid=configs(args)
+    with multiprocessing.Pool(args.workers) as pool:
+        results=pool.map(playConfig,grid,chunksize=1)
+    out=open(args.output,'w',newline='') if args.output else sys.stdout
+    try:
+        if args.format=='json':
+            json.dump(results,out,indent=1)
+            out.write('\n')
+        else:
+            writer=csv.DictWriter(out,fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__=='__main__':
+    main()
@@ -6,7 +6,9 @@ Alien Invaders game.  Instances of Wave represent a single wave.  Whenever you
 move to a new level, you are expected to make a new instance of the class.
 
 The subcontroller Wave manages the ship, the aliens and any laser bolts on screen.  
-These are model objects.  Their classes are defined in models.py.
+These are model objects.  Their classes are defined in models.py.  The rules
+of the wave are run by WaveSim in sim.py, which does not need Kivy; Wave draws
+what WaveSim reports and plays the sounds.
 
 Most of your work on this assignment will be in either this module or models.py.
 Whether a helper method belongs in this module or models.py is often a complicated
@@ -17,8 +19,9 @@ issue.  If you do not know, ask on Piazza and we will answer.
 """
 from game2d import *
 from consts import *
+from config import *
 from models import *
-import random
+from sim import *
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not permitted 
@@ -41,18 +44,34 @@ class Wave(object):
     This class will be similar to than one in how it interacts with the
     main class Invaders.
     
-    #UPDATE ME LATER
+    The rules of the wave are in the headless WaveSim in _sim.  Wave is a view
+    over it: update passes the input to _sim and plays the sounds for the events
+    it returns, and draw moves the ship, alien and bolt images to where _sim
+    says they are.  The alien images are only moved when they are drawn.
+    The aliens are sprites in one GSpriteBatch per alien image, so the whole
+    formation is drawn with a few meshes instead of one image per alien.  A
+    batch can only tint all of its sprites at once, so an alien cannot be
+    given a color of its own (to flash when hit, say) without a batch of its
+    own.
+    show does the same as draw, but attaches the images to the view (see
+    GView.attach) instead of drawing them, and only attaches or detaches the
+    images that appeared or went away since the last frame.
+    
     INSTANCE ATTRIBUTES:
-        _ship:   the player ship to control [Ship]
-        _aliens: the 2d list of aliens in the wave [rectangular 2d list of Alien
-        or None] 
-        _bolts:  the laser bolts currently on screen [list of Bolt, possibly
-        empty]
+        _sim:    the simulation running the rules of this wave [WaveSim]
+        _ship:   the player ship to draw [Ship, or None if it was destroyed]
+        _aliens: the sprite of every slot in the formation in _sim, as a
+                 pair (batch,index) of its batch and its index in the batch
+                 [rectangular 2d list of tuple]
+        _alienBatches: the sprite batches of the aliens, one per alien image
+                 [list of GSpriteBatch]
+        _alienShown: which aliens have a visible sprite
+                 [2d numpy array of bool, the shape of the formation]
+        _bolts:  the images of the laser bolts currently on screen
+                 [dict mapping SimBolt to Bolt, possibly empty]
+        _boltPool: the bolt images that are not on screen, ready for reuse
+                 [BoltPool]
         _dline:  the defensive line being protected [GPath]
-        _lives:  the number of lives left  [int >= 0]
-        _time:   The amount of time since the last Alien "step" [number
-        >= 0]
-        
     
     As you can see, all of these attributes are hidden.  You may find that you
     want to access an attribute in class Invaders. It is okay if you do, but
@@ -67,14 +86,6 @@ class Wave(object):
     changes with the invariants.
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY:
-    _alienDirection: keeps track of the direction the aliens are moving[string]
-    _alienFire: The number of steps before the next bolt is fired by the aliens
-    [int]
-    _alienStep: the number of steps the aliens have taken since last bolt[int]
-    _waveComplete: determines whether the wave is complete ie the aliens crossed
-        the dline[1], all of the aliens are killed[2], or lives=0[3] [int]
-    _alienSpeed : the number of seconds between alien steps
-                [float 0.0<alienSpeed<=1.0]
     _soundOn: keeps track of whether the sound is on(True) or off(false)
                 [boolean]
     _soundShip: sound that plays when ship fires bolt
@@ -85,6 +96,8 @@ class Wave(object):
                 [Sound]
     _soundSHit: sound that plays when ship is hit
                 [Sound]
+    _shown: the images attached to the view by show, in the order they were
+                attached [list of GObject, possibly empty]
         
     """
     
@@ -93,7 +106,7 @@ class Wave(object):
         """
         returns true is _ship is none and false otherwise
         """
-        if(self._ship is None):
+        if(self._sim.getShip() is None):
             return True
         else:
             return False
@@ -105,18 +118,13 @@ class Wave(object):
         """
         assert isinstance(ship,Ship), 'ship is not Ship'
         self._ship=ship
+        self._sim.resetShip(ship.x)
         
-    def getLives(self):
-        """
-        returns _lives, the number of lives the player has left
-        """
-        return self._lives
-    
     def getWaveComplete(self):
         """
         returns _waveComplete
         """
-        return self._waveComplete
+        return self._sim.getWaveComplete()
     
     def getSoundOn(self):
         """ returns _soundOn"""
@@ -124,14 +132,36 @@ class Wave(object):
     
     def getLives(self):
         """ returns numebr of lives"""
-        return self._lives
+        return self._sim.getLives()
+    
+    def getSim(self):
+        """ returns the simulation running the rules of this wave"""
+        return self._sim
+    
+    def getSeed(self):
+        """ returns the seed the random numbers of this wave started from"""
+        return self._sim.getSeed()
+    
+    def getRandomState(self):
+        """ returns the state of the random numbers of this wave"""
+        return self._sim.getRandomState()
+    
+    def setRandomState(self,state):
+        """
+        sets the random numbers of this wave back to state
+        Parameter: state is the state to restore
+        Precondition: state was returned by getRandomState
+        """
+        self._sim.setRandomState(state)
         
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self,speed,sound=True):
+    def __init__(self,speed,sound=True,config=None,seed=None):
         """
-        Initializer: creates a new wave of aliens (ALIEN_ROWS x ALIENS_IN_ROWS)
-        First a 2d list of aliens is created that resembles what is to be drawn on
-        the screen. (use helper function)
+        Initializer: creates a new wave of aliens (ALIEN_ROWS x ALIENS_IN_ROWS,
+        unless config says otherwise)
+        The wave is simulated by a WaveSim, and a 2d list of alien images is
+        created that resembles what is to be drawn on the screen. (use helper
+        function)
         Assigns various instance attributes to the correct values.
         
         Parameter: speed is the number of seconds between alien steps
@@ -139,36 +169,42 @@ class Wave(object):
         
         Parameter: sound determines if the sound for this wave starts on or off
         Precondition: sound is a bool
-        """
         
+        Parameter: config is the settings of the wave, or None for the
+        settings in consts.py. speed is used in place of its speed
+        Precondition: config is None or a WaveConfig
+        
+        Parameter: seed is the seed of the random numbers of this wave, or None
+        for a different wave every time
+        Precondition: seed is None or an int
+        """
+        if config is None:
+            config=WaveConfig()
+        config=config.replace(speed=speed)
+        self._sim=WaveSim(config,seed)
+        self._alienBatches=[]
         self._aliens=self._alienList()
-        self._ship=Ship()
-        self._bolts=[]
+        self._alienShown=self._sim.getAliens().getAlive().copy()
+        self._ship=Ship(config)
+        self._bolts={}
+        self._boltPool=BoltPool(BOLT_POOL_SIZE,config)
         self._dline=GPath(
             points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],
             linewidth=LINEWIDTH,linecolor=DLINE_COLOR)
-        self._lives=SHIP_LIVES
-        self._time=0
-        self._alienDirection='right'
-        self._alienFire=random.uniform(1,BOLT_RATE)
-        self._alienStep=0
-        self._waveComplete=0
-        self._alienSpeed=speed
         self._soundOn=sound
         self._soundShip=Sound(SHIP_BOLT_SOUND)
         self._soundAlien=Sound(ALIEN_BOLT_SOUND)
         self._soundSHit=Sound(SHIP_HIT_SOUND)
         self._soundAHit=Sound(ALIEN_HIT_SOUND)
+        self._shown=[]
         
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
     def update(self,dt,direction=''):
         """
-        -keeps track of the time since the last alien movement
-        -animates the ship, ship is moved left or right depending on the users
-        input. Pressing the left arrow moves the ship to the left and pressing
-        the right arrow moves the ship to the right
-        -animates the aliens by calling the _moveAlien helper
-        -animates the laser bolts
+        -advances the simulation one frame with the user's input. Pressing the
+        left arrow moves the ship to the left, pressing the right arrow moves
+        the ship to the right and pressing up fires a bolt
+        -plays the sounds for anything that happened in the frame
         
         Parameter: dt, the time in seconds since last update
         Precondition: dt is number (int or float)
@@ -176,234 +212,203 @@ class Wave(object):
         Parameter: direction is the direction of the arrow pressed
         Precondition: direction is a string
         """
-        self._time=self._time+dt
-        if(direction=='up'):
-            if(self._isNotPlayerBolt() and type(self._ship)==Ship):    
-                b=Bolt(self._ship.x,self._ship.y,'up')
-                self._bolts.append(b)
-                if(self._soundOn==True):
-                        self._soundShip.play()
-        if (direction=='left'):
-            self._ship._moveShipLeft()
-        if (direction=='right'):
-            self._ship._moveShipRight()
-        if(self._time>self._alienSpeed):
-            self._moveAliens()
-            self._time=0
-        self._moveAndCheckBolts()
-        self._checkBoltColAlien()
-        self._checkBoltColShip()
-        self._complete()
+        events=self._sim.update(dt,direction)
+        if(self._soundOn==True):
+            if(events & EVENT_SHIP_FIRED):
+                self._soundShip.play()
+            if(events & EVENT_ALIEN_FIRED):
+                self._soundAlien.play()
+            if(events & EVENT_ALIEN_HIT):
+                self._soundAHit.play()
+            if(events & EVENT_SHIP_HIT):
+                self._soundSHit.play()
         
         
-    # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def draw(self,view):
+    def step_many(self,n,inputs,dt=GAME_TIMESTEP):
         """
-        Draws the wave to the view.
-        Uses the draw method from the GObject class
+        -advances the simulation up to n frames without drawing, stopping
+        when the wave is complete or the ship is destroyed
+        -no sounds are played; the events are added up and returned instead
+        (see WaveSim.step_many)
         
-        Parameter: view is the the game view, used in drawing    
-        Precondition: [instance of GView]
-        """
-        for row in self._aliens:
-            for alien in row:
-                if(type(alien)==Alien):
-                    alien.draw(view)
-        self._dline.draw(view)
-        if(type(self._ship)==Ship):
-            self._ship.draw(view)
-        for bolt in self._bolts:
-            bolt.draw(view)
-            
-            
-    # HELPER METHODS FOR COLLISION DETECTION
-    def _alienList(self):
-        """
-        creates a 2d alien list (ALIEN_ROWS x ALIENS_IN_ROWS)
-        first row in list is row to be drawn at bottom
+        Parameter: n is the largest number of frames to run
+        Precondition: n is an int >= 0
         
-        Return: the 2d list of aliens created
-        """
-        alist=[]
-        pickey=ALIEN_ROWS
-        for r in range(ALIEN_ROWS):
-            alist.append([])
-            pickey=pickey-1
-            for x in range(ALIENS_IN_ROW):
-                #pic='alien'+str((pickey//2)%3+1)+'.png'
-                pic=ALIEN_IMAGES[pickey//2%3]
-                xpos=ALIEN_H_SEP*(x+1)+int(round(
-                    ALIEN_WIDTH/2))+ALIEN_WIDTH*x
-                ypos=GAME_HEIGHT-ALIEN_CEILING-ALIEN_V_SEP*r-(
-                    ALIEN_HEIGHT)/2-ALIEN_HEIGHT*r
-                a=Alien(xpos,ypos,pic)
-                alist[r].append(a)
-        return alist       
+        Parameter: inputs is the direction pressed on each frame
+        Precondition: inputs is a sequence of at least n strings, each one of
+        '', 'left', 'right' or 'up'
         
+        Parameter: dt, the time in seconds of each frame
+        Precondition: dt is number (int or float)
+        """
+        return self._sim.step_many(n,inputs,dt)
         
-    def _moveAliens(self):
-        """
-        moves every alien ALIEN_H_WALK to the right or to the left. if the
-        rightmost alien reaches the right edge, or if the leftmost alien
-        reaches the left edge, the aliens move ALIEN_V_SEP down
-        """
-        if(self._alienDirection=='right'):
-            if(GAME_WIDTH-self._getRightMostAlien().right<=ALIEN_H_SEP):
-                for row in self._aliens:
-                    for alien in row:
-                        if(type(alien)==Alien):
-                            alien.y=alien.y-ALIEN_V_SEP
-                self._alienDirection='left'
-            else:
-                for row in self._aliens:
-                    for alien in row:
-                        if(type(alien)==Alien):
-                            alien.x=alien.x+ALIEN_H_WALK
-        elif(self._alienDirection=='left'):
-            if(self._getLeftMostAlien().left<=ALIEN_H_SEP):
-                for row in self._aliens:
-                    for alien in row:
-                        if(type(alien)==Alien):
-                            alien.y=alien.y-ALIEN_V_SEP
-                self._alienDirection='right'
-            else:
-                for row in self._aliens:
-                    for alien in row:
-                        if(type(alien)==Alien):
-                            alien.x=alien.x-ALIEN_H_WALK
-        self._alienStep=self._alienStep+1
-        if(self._alienStep>=self._alienFire):
-            self._alienStep=0
-            self._fireAlienBolt()
-            
-            
-    def _moveAndCheckBolts(self):
+    # METHODS TO SAVE AND RESTORE THE STATE OF THE WAVE
+    def snapshot(self):
         """
-        moves bolts and checks if they have gone off the top or bottom of
-        the screen and needs to be deleted from _bolts
+        returns the state of the wave (see WaveSim.snapshot). only the
+        simulation is saved; no images or sounds are copied
         """
-        for bolt in self._bolts:
-            bolt._moveBolt()
-            if(bolt.bottom>=GAME_HEIGHT or bolt.top<=0):
-                self._bolts.remove(bolt)
-                
-                
-    def _isNotPlayerBolt(self):
+        return self._sim.snapshot()
+    
+    def restore(self,state):
         """
-        checks every bolt in the list to determine if one of them is a
-        player bolt
-        RETURN: if there is a player bolt already in the list, the method
-        returns false otherwise it returns True
+        puts the wave back in a state returned by snapshot. the images are
+        moved to match the next time the wave is drawn
+        
+        Parameter: state is the state to restore
+        Precondition: state was returned by snapshot on a wave with the same
+        number of rows and columns
         """
-        for bolt in self._bolts:
-            if bolt.getVel()>0:
-                return False
-        return True
-    
-    def _PlayerBolt(self):
+        self._sim.restore(state)
+        
+    def clone(self):
         """
-        checks every bolt in the list to determine if one of them is a
-        player bolt
-        RETURN: the player bolt or nothing if there are no player bolts
+        returns a copy of the simulation of this wave, for looking ahead
+        without changing the wave. the copy is a WaveSim, so it has no images
+        or sounds and cannot be drawn
         """
-        for bolt in self._bolts:
-            if bolt.getVel()>0:
-                return bolt
+        return self._sim.clone()
     
-    def _fireAlienBolt(self):
+    def checksum(self):
+        """
+        returns a CRC-32 of the state of the simulation of this wave (see
+        WaveSim.checksum)
         """
-        if alienStep > alien fire, then a bolt is fired from a random column of
-        aliens. the method ensures that there are aliens in the selected column
+        return self._sim.checksum()
+        
+    # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
+    def draw(self,view,alpha=1.0):
+        """
+        Draws the wave to the view.
+        Moves the images to the positions in the simulation, then uses the
+        draw method from the GObject class. Each image is placed alpha of the
+        way from its position before the last update to its position after
+        it, so that motion is smooth when the game updates at a fixed rate
+        
+        Parameter: view is the the game view, used in drawing    
+        Precondition: [instance of GView]
+        
+        Parameter: alpha is the fraction of a timestep since the last update
+        Precondition: alpha is a float in 0..1 (see GameApp.alpha)
         """
-        a=None
-        while a==None:
-            r=random.randrange(ALIENS_IN_ROW)
+        for image in self._place(alpha):
+            image.draw(view)
             
-            for x in range(len(self._aliens)-1,-1,-1):
-                if(isinstance(self._aliens[x][r],Alien) and a==None):
-                    a=self._aliens[x][r]
-                    b=Bolt(a.x,a.bottom-BOLT_HEIGHT/2,'down')
-                    self._bolts.append(b)
-                    if(self._soundOn==True):
-                        self._soundAlien.play()
-        self._alienFire=random.uniform(1,BOLT_RATE)
+    def show(self,view,alpha=1.0):
+        """
+        Shows the wave in the view, like draw, with the images attached to the
+        view instead of drawn.  Only the images that were not on screen in the
+        last frame are attached, and the images that are gone (dead aliens,
+        the ship while it is destroyed, bolts put back in the pool) are
+        detached.  Call hide when the wave is no longer shown.
         
-    def _checkBoltColAlien(self):
-        """
-        checks if the ship's bolt collides with an alien. if the bolt collides,
-        the alien is removed from _aliens and replaced with NONE and the bolt is
-        removed from _bolts
-        """
-        for row in self._aliens:
-            for a in row:
-                if type(
-                    a)==Alien and not self._isNotPlayerBolt() and a.collides(
-                    self._PlayerBolt()):
-                    index=row.index(a)
-                    row.remove(a)
-                    row.insert(index, None)
-                    for bolt in self._bolts:
-                        if bolt.getVel()>0:
-                            b=bolt
-                    self._bolts.remove(b)
-                    if(self._soundOn==True):
-                        self._soundAHit.play()
-    
-    def _checkBoltColShip(self):
-        """
-        check if one of the aliens bolts collides with the ship
-        if it collides, the ship is set to none and the bolt is removed
-        from _bolts
-        """
-        for bolt in self._bolts:
-            if bolt.getVel()<0 and self._ship is not None and self._ship.collides(
-                bolt):
-                self._ship=None
-                self._bolts.remove(bolt)
-                self._lives=self._lives-1
-                if(self._soundOn==True):
-                        self._soundSHit.play()
-                
-    def _complete(self):
-        """
-        changes waveComplete based on whether the aliens are below the dline,
-        all aliens are killed, or lives =0
-        """
-        belowD=False
-        killed=True
-        for row in self._aliens:
-            for alien in row:
-                if isinstance(alien, Alien) and alien.bottom<DEFENSE_LINE:
-                    belowD=True
-                if isinstance(alien,Alien):
-                    killed=False
+        Parameter: view is the the game view
+        Precondition: [instance of GView]
+        
+        Parameter: alpha is the fraction of a timestep since the last update
+        Precondition: alpha is a float in 0..1 (see GameApp.alpha)
+        """
+        images=self._place(alpha)
+        current=set(images)
+        for image in self._shown:
+            if image not in current:
+                view.detach(image)
+        for image in images:
+            view.attach(image)
+        self._shown=images
         
-        if self._lives==0:
-            self._waveComplete=LIVES_LOST
-        elif belowD==True:
-            self._waveComplete=DLINE_CROSSED
-        elif killed==True:
-            self._waveComplete=ALIENS_KILLED
+    def hide(self,view):
+        """
+        Detaches every image attached by show from the view
+        
+        Parameter: view is the the game view
+        Precondition: [instance of GView]
+        """
+        for image in self._shown:
+            view.detach(image)
+        self._shown=[]
+            
             
-    def _getLeftMostAlien(self):
+    # HELPER METHODS FOR DRAWING
+    def _place(self,alpha):
         """
-        returns the left most alien that is not NONE
+        moves the images to the positions in the simulation, alpha of the way
+        from their positions before the last update
+        
+        Return: the images on screen, in the order to draw them
+        
+        Parameter: alpha is the fraction of a timestep since the last update
+        Precondition: alpha is a float in 0..1
+        """
+        formation=self._sim.getAliens()
+        alive=formation.getAlive()
+        for r,c in zip(*(alive!=self._alienShown).nonzero()):
+            batch,index=self._aliens[r][c]
+            batch.set_visible(index,bool(alive[r,c]))
+        self._alienShown=alive.copy()
+        xs=formation.lerpX(alpha)
+        ys=formation.lerpY(alpha)
+        for r,c in zip(*alive.nonzero()):
+            batch,index=self._aliens[r][c]
+            batch.move(index,float(xs[r,c]),float(ys[r,c]))
+        images=list(self._alienBatches)
+        images.append(self._dline)
+        ship=self._sim.getShip()
+        if(ship is not None and type(self._ship)==Ship):
+            self._ship.x=float(ship.lerpX(alpha))
+            images.append(self._ship)
+        self._syncBolts(alpha)
+        images.extend(self._bolts.values())
+        return images
+        
+    def _alienList(self):
         """
-        for col in range (ALIENS_IN_ROW):
-            for row in range(ALIEN_ROWS):
-                if(isinstance(self._aliens[row][col],Alien)):
-                    a=self._aliens[row][col]
-                    return a
-                
-    def _getRightMostAlien(self):
+        creates a 2d list of alien sprites, one for every slot in the formation
+        in _sim, adding a batch to _alienBatches for each alien image. first
+        row in list is row to be drawn at the top
+        
+        Return: the 2d list of (batch,index) pairs created
         """
-        returns the right most alien that is not None
+        alist=[]
+        batches={}
+        config=self._sim.getConfig()
+        for r in range(config.getRows()):
+            alist.append([])
+            image=config.getAlienImage(r)
+            if image not in batches:
+                batches[image]=GSpriteBatch(source=image)
+                self._alienBatches.append(batches[image])
+            batch=batches[image]
+            for c in range(config.getCols()):
+                index=batch.add(config.getColumnX()[c],config.getRowY()[r],
+                                ALIEN_WIDTH,ALIEN_HEIGHT)
+                alist[r].append((batch,index))
+        return alist       
+    
+    def _syncBolts(self,alpha):
         """
-        for col in range(ALIENS_IN_ROW-1,-1,-1):
-            for row in range(ALIEN_ROWS):
-                if(isinstance(self._aliens[row][col],Alien)):
-                    a=self._aliens[row][col]
-                    return a
+        makes _bolts match the bolts in _sim: takes an image from _boltPool for
+        any new bolt, returns the image of any bolt that is gone, and moves the
+        rest
+        
+        Parameter: alpha is the fraction of a timestep since the last update
+        Precondition: alpha is a float in 0..1
+        """
+        simbolts=self._sim.getBolts()
+        for b in list(self._bolts):
+            if b not in simbolts:
+                self._boltPool.release(self._bolts.pop(b))
+        for b in simbolts:
+            y=float(b.lerpY(alpha))
+            if b in self._bolts:
+                bolt=self._bolts[b]
+                bolt.x=b.x
+                bolt.y=y
+            elif b.getVel()>0:
+                self._bolts[b]=self._boltPool.acquire(b.x,y,'up')
+            else:
+                self._bolts[b]=self._boltPool.acquire(b.x,y,'down')
                 
     def switchSound(self):
         """
@@ -413,4 +418,4 @@ class Wave(object):
         if(self._soundOn==True):
             self._soundOn=False
         else:
-            self._soundOn=True
\ No newline at end of file
+            self._soundOn=True
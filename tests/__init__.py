@@ -0,0 +1,11 @@
+"""
+Tests for Alien Invaders
+
+These tests cover the parts of the game that run without Kivy: the rules of
+a wave, the batched waves, recordings and replays, the debug history and the
+offline renderer.  The view classes of game2d are tried against stand-ins for
+Kivy (see kivystub.py), which check the instructions they keep but draw
+nothing.  Run them from the top of the repository with
+
+    python -m pytest tests
+"""
@@ -0,0 +1,20 @@
+"""
+Test setup for Alien Invaders
+
+The modules of the game import each other by name from the invaders folder,
+so that folder is put on the path.  consts.py reads its positional command
+line arguments when it is imported, so the arguments of pytest are hidden
+from it.
+"""
+import os
+import sys
+
+GAME_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'invaders')
+if GAME_FOLDER not in sys.path:
+    sys.path.insert(0,GAME_FOLDER)
+
+_argv=sys.argv
+sys.argv=sys.argv[:1]
+import consts
+sys.argv=_argv
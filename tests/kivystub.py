@@ -0,0 +1,255 @@
+"""
+Stand-ins for the parts of Kivy and cornell that game2d uses
+
+Kivy needs a window, so the classes of game2d cannot be tried on a machine
+without one.  These modules have the same names and just enough of the same
+classes to import game2d and check what it puts on the canvas: each graphics
+instruction keeps the arguments it was made with, an instruction group keeps
+its children in a list, and the clock only remembers what was scheduled.
+Nothing is drawn.  They are only installed while a test uses them (see load).
+"""
+import importlib
+import sys
+import types
+
+
+class Instruction(object):
+    """
+    A graphics instruction that keeps the arguments it was made with
+    """
+
+    def __init__(self,*args,**keywords):
+        self.args=args
+        for key,value in keywords.items():
+            setattr(self,key,value)
+
+
+class InstructionGroup(Instruction):
+    """
+    A group of graphics instructions, kept in a list
+    """
+
+    def __init__(self,**keywords):
+        Instruction.__init__(self,**keywords)
+        self.children=[]
+
+    def add(self,c):
+        self.children.append(c)
+
+    def insert(self,index,c):
+        self.children.insert(index,c)
+
+    def remove(self,c):
+        for i in range(len(self.children)):
+            if self.children[i] is c:
+                del self.children[i]
+                return
+
+    def clear(self):
+        self.children=[]
+
+    def indexof(self,c):
+        for i in range(len(self.children)):
+            if self.children[i] is c:
+                return i
+        return -1
+
+    def length(self):
+        return len(self.children)
+
+
+class Color(Instruction):
+    """
+    A color instruction with the attribute rgba
+    """
+
+    def __init__(self,*args,**keywords):
+        Instruction.__init__(self,*args,**keywords)
+        self.rgba=list(args)+[1.0]*(4-len(args))
+
+
+class Translate(Instruction):
+    """
+    A translation with the attributes x, y and z
+    """
+
+    def __init__(self,x=0,y=0,z=0):
+        Instruction.__init__(self)
+        self.x=x
+        self.y=y
+        self.z=z
+
+
+class Scale(Translate):
+    """
+    A scaling with the attributes x, y and z
+    """
+    pass
+
+
+class Rotate(Instruction):
+    """
+    A rotation with the attributes angle and axis
+    """
+
+    def __init__(self,angle=0,axis=(0,0,1)):
+        Instruction.__init__(self)
+        self.angle=angle
+        self.axis=axis
+
+
+class Mesh(Instruction):
+    """
+    A mesh; setting vertices or indices counts an upload
+    """
+
+    def __init__(self,**keywords):
+        self.uploads=0
+        Instruction.__init__(self,**keywords)
+        self.uploads=0
+
+    def __setattr__(self,name,value):
+        if name in ('vertices','indices'):
+            value=list(value)
+            object.__setattr__(self,'uploads',self.uploads+1)
+        object.__setattr__(self,name,value)
+
+
+class Trigger(object):
+    """
+    A clock trigger that remembers how many times it was called
+    """
+
+    def __init__(self,callback,timeout):
+        self.callback=callback
+        self.timeout=timeout
+        self.calls=0
+
+    def __call__(self):
+        self.calls+=1
+
+    def fire(self):
+        """
+        Runs the callback as the clock would before the next frame
+        """
+        if self.calls:
+            self.calls=0
+            self.callback(0)
+
+
+class Clock(object):
+    """
+    A clock that schedules nothing
+    """
+
+    @staticmethod
+    def create_trigger(callback,timeout=0):
+        return Trigger(callback,timeout)
+
+    @staticmethod
+    def schedule_interval(callback,timeout):
+        pass
+
+    @staticmethod
+    def schedule_once(callback,timeout=0):
+        pass
+
+    @staticmethod
+    def unschedule(callback):
+        pass
+
+
+class Widget(object):
+    """
+    A widget with a canvas, a position and a size
+    """
+
+    def __init__(self,**keywords):
+        self.canvas=InstructionGroup()
+        self.pos=(0,0)
+        self.size=(800,700)
+
+    def bind(self,**keywords):
+        pass
+
+
+class App(object):
+    """
+    An app that never runs
+    """
+
+    def __init__(self,**keywords):
+        pass
+
+
+class Matrix(object):
+    """
+    A matrix that is never used
+    """
+    pass
+
+
+class Point2(object):
+    """
+    A point with the attributes x and y
+    """
+
+    def __init__(self,x=0,y=0):
+        self.x=x
+        self.y=y
+
+
+def modules():
+    """
+    Returns: a dictionary of the stand-in modules, by name
+    """
+    result={}
+    def module(name,**contents):
+        made=types.ModuleType(name)
+        made.__dict__.update(contents)
+        result[name]=made
+        return made
+    graphics=dict(Instruction=Instruction,InstructionGroup=InstructionGroup,
+                  Color=Color,Translate=Translate,Scale=Scale,Rotate=Rotate,
+                  Mesh=Mesh,Rectangle=Instruction,Ellipse=Instruction,
+                  Line=Instruction,Triangle=Instruction,PushMatrix=Instruction,
+                  PopMatrix=Instruction)
+    module('kivy',__path__=[])
+    module('kivy.graphics',__path__=[],**graphics)
+    module('kivy.graphics.instructions',InstructionGroup=InstructionGroup)
+    module('kivy.uix',__path__=[])
+    module('kivy.uix.floatlayout',FloatLayout=Widget)
+    module('kivy.metrics',dp=lambda value: value)
+    module('kivy.clock',Clock=Clock)
+    module('kivy.config',Config=types.SimpleNamespace(set=lambda *args: None))
+    module('kivy.app',App=App)
+    module('cornell',Point2=Point2,Matrix=Matrix,RGB=type('RGB',(),{}),
+           HSV=type('HSV',(),{}),is_tkcolor=lambda name: False)
+    for name,made in result.items():
+        if '.' in name:
+            parent,child=name.rsplit('.',1)
+            setattr(result[parent],child,made)
+    return result
+
+
+def load(monkeypatch,*names):
+    """
+    Returns: the modules of game2d with the given names, imported against the
+    stand-ins
+
+    The stand-ins and the modules are removed from sys.modules when the test
+    is over.
+
+    Parameter monkeypatch: the monkeypatch fixture of the test
+    Precondition: monkeypatch is a pytest MonkeyPatch
+
+    Parameter names: the modules of game2d to import, like 'gview'
+    Precondition: names are strings
+    """
+    import game2d
+    for name,module in modules().items():
+        monkeypatch.setitem(sys.modules,name,module)
+    for name in ('gobject','app','gview','gbatch')+names:
+        monkeypatch.delitem(sys.modules,'game2d.'+name,raising=False)
+        monkeypatch.delattr(game2d,name,raising=False)
+    return [importlib.import_module('game2d.'+name) for name in names]
@@ -0,0 +1,165 @@
+"""
+Tests for the batched waves (batch.py) against single waves (env.py)
+"""
+import random
+import numpy as np
+from consts import *
+from batch import *
+from env import *
+
+
+def actions(count,seed):
+    """
+    Returns: a list of count actions, changing every few frames
+    """
+    rng=random.Random(seed)
+    result=[]
+    while len(result)<count:
+        result.extend([rng.randrange(ACTION_COUNT)]*rng.randint(1,30))
+    return result[:count]
+
+
+def test_batch_matches_env():
+    """Every wave of a batch plays out as a single wave with the same input
+
+    The two draw their random numbers differently, so the aliens do not fire
+    here; the rest of the rules must agree frame by frame.
+    """
+    size=4
+    speeds=[0.01,0.02,0.05,0.1]
+    batch=WaveBatch(size,speed=speeds,rows=3,cols=5,seed=0)
+    batch._alienFire[:]=np.inf
+    envs=[]
+    for speed in speeds:
+        env=InvadersEnv(speed,3,5)
+        env.reset(0)
+        env.getSim()._alienFire=float('inf')
+        envs.append(env)
+    plans=[actions(4000,seed) for seed in range(size)]
+    over=[False]*size
+    for frame in range(4000):
+        rewards,dones,events=batch.step([plan[frame] for plan in plans])
+        observed=batch.observe()
+        for k in range(size):
+            if over[k]:
+                continue
+            obs,reward,done,info=envs[k].step(plans[k][frame])
+            over[k]=done
+            assert done==dones[k], (k,frame)
+            assert reward==rewards[k], (k,frame)
+            assert info['events']==events[k], (k,frame)
+            assert np.allclose(obs,observed[k]), (k,frame)
+        if dones.all():
+            break
+    assert dones.any()
+
+
+def inject(batch,k,sim,x,y):
+    """
+    Adds an alien bolt at (x,y) to wave k of batch and to sim
+    """
+    slot=int((~batch._boltActive[k]).argmax())
+    assert not batch._boltActive[k,slot]
+    batch._boltActive[k,slot]=True
+    batch._boltX[k,slot]=x
+    batch._boltY[k,slot]=y
+    batch._boltPrev[k,slot]=y
+    sim._register(sim.getBolts().spawn(x,y,'down'))
+
+
+def test_batch_ship_hits_match_env():
+    """Alien bolts hit the ships of a batch as they hit a single wave's ship
+
+    The same bolts are dropped on both near the ship, some close enough to
+    hit it and some not, until every wave has lost all of its lives.
+    """
+    size=3
+    batch=WaveBatch(size,speed=1.0,rows=3,cols=5,seed=0)
+    batch._alienFire[:]=np.inf
+    envs=[]
+    for k in range(size):
+        env=InvadersEnv(1.0,3,5)
+        env.reset(0)
+        env.getSim()._alienFire=float('inf')
+        envs.append(env)
+    plans=[[action%3 for action in actions(3000,seed)] for seed in range(size)]
+    rng=random.Random(5)
+    over=[False]*size
+    hits=[0]*size
+    for frame in range(3000):
+        if frame%20==0:
+            for k in range(size):
+                if not over[k]:
+                    x=float(batch.getShipX()[k])+rng.uniform(-40,40)
+                    inject(batch,k,envs[k].getSim(),x,WaveBatch.SHIP_Y+150)
+        rewards,dones,events=batch.step([plan[frame] for plan in plans])
+        observed=batch.observe()
+        for k in range(size):
+            if over[k]:
+                continue
+            obs,reward,done,info=envs[k].step(plans[k][frame])
+            over[k]=done
+            hits[k]+=bool(info['events'] & EVENT_SHIP_HIT)
+            assert info['events']==events[k], (k,frame)
+            assert info['lives']==batch.getLives()[k], (k,frame)
+            assert done==dones[k], (k,frame)
+            assert reward==rewards[k], (k,frame)
+            assert np.allclose(obs,observed[k]), (k,frame)
+        if dones.all():
+            break
+    assert dones.all()
+    assert (batch.getWaveComplete()==LIVES_LOST).all()
+    assert hits==[SHIP_LIVES]*size
+
+
+def test_batch_alien_fire_matches_env():
+    """The aliens of a batch fire the bolts a single wave fires
+
+    With one column of aliens there is only one column to fire from, and the
+    steps between bolts are set to the same number in both, so the two fire
+    the same bolts on the same frames.
+    """
+    size=2
+    batch=WaveBatch(size,speed=0.05,rows=3,cols=1,seed=0)
+    envs=[]
+    for k in range(size):
+        env=InvadersEnv(0.05,3,1)
+        env.reset(k)
+        envs.append(env)
+    plans=[[action%3 for action in actions(5000,seed)] for seed in range(size)]
+    over=[False]*size
+    fired=[0]*size
+    for frame in range(5000):
+        batch._alienFire[:]=2
+        for k in range(size):
+            envs[k].getSim()._alienFire=2
+        rewards,dones,events=batch.step([plan[frame] for plan in plans])
+        observed=batch.observe()
+        for k in range(size):
+            if over[k]:
+                continue
+            obs,reward,done,info=envs[k].step(plans[k][frame])
+            over[k]=done
+            fired[k]+=bool(info['events'] & EVENT_ALIEN_FIRED)
+            assert info['events']==events[k], (k,frame)
+            assert info['lives']==batch.getLives()[k], (k,frame)
+            assert done==dones[k], (k,frame)
+            assert np.allclose(obs,observed[k]), (k,frame)
+        if dones.all():
+            break
+    assert min(fired)>0
+    assert dones.all()
+    assert (batch.getWaveComplete()==LIVES_LOST).all()
+
+
+def test_batch_reset():
+    """Resetting some waves leaves the others alone"""
+    batch=WaveBatch(3,rows=2,cols=2,seed=1)
+    for frame in range(120):
+        batch.step([ACTION_RIGHT_FIRE]*3)
+    before=batch.observe().copy()
+    batch.reset([1])
+    after=batch.observe()
+    assert (after[0]==before[0]).all() and (after[2]==before[2]).all()
+    fresh=WaveBatch(1,rows=2,cols=2,seed=2).observe()[0]
+    assert np.allclose(after[1],fresh)
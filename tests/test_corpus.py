@@ -0,0 +1,51 @@
+"""
+Tests for the recording corpus indexer (corpus.py)
+"""
+from consts import *
+from config import *
+from record import *
+from replay import *
+import corpus
+
+
+def hit(path):
+    """
+    Returns: the x position of the ship when it was hit, for a recording
+    saved to path that ends on the frame the ship is first hit
+
+    The ship starts the wave in the middle and moves left and right in turn,
+    half a second each way, so it is never at the edge and it moves on every
+    frame, the frame of the hit included.
+    """
+    config=WaveConfig(3,15,speed=0.05)
+    recording=InputRecording(3,config=config)
+    session=Session(3,config)
+    input=FakeInput()
+    input.set(('s',),1)
+    session.update(input,GAME_TIMESTEP)
+    recording.record(input,GAME_TIMESTEP)
+    x=GAME_WIDTH/2
+    for frame in range(5000):
+        key='right' if frame//30%2==0 else 'left'
+        input.set((key,),1)
+        x+=config.getShipMovement()*(1 if key=='right' else -1)
+        events=session.update(input,GAME_TIMESTEP)
+        recording.record(input,GAME_TIMESTEP)
+        if events & EVENT_SHIP_HIT:
+            recording.save(path)
+            return x
+    assert False, 'the ship was never hit'
+
+
+def test_ship_hit_binned_where_hit(tmp_path):
+    """A ship hit is counted where the ship was after it moved on that frame"""
+    path=str(tmp_path/'game.invr')
+    x=hit(path)
+    rows,hits,crossings=corpus.analyze(path,GAME_WIDTH)
+    assert hits.sum()==1
+    assert hits[int(x)]==1
+    assert len(rows)==1
+    assert rows[0]['lives_lost']==1
+    assert rows[0]['complete']==NOT_COMPLETE
+    assert crossings.sum()==0
+
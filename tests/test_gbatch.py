@@ -0,0 +1,104 @@
+"""
+Tests for the sprite batch (game2d/gbatch.py)
+
+Kivy is replaced by the stand-ins in kivystub.py, so these tests check the
+vertex buffer and the uploads to the mesh, not what is drawn.
+"""
+import pytest
+from . import kivystub
+
+
+@pytest.fixture
+def gbatch(monkeypatch):
+    """
+    Returns: the game2d module gbatch, imported against the stand-ins for Kivy
+    """
+    return kivystub.load(monkeypatch,'gbatch')[0]
+
+
+def corners(batch,index):
+    """
+    Returns: the (x,y) of the four corners of a sprite in the vertex buffer
+    """
+    v=batch._vertices
+    pos=16*index
+    return [(v[pos+4*k],v[pos+4*k+1]) for k in range(4)]
+
+
+def test_add_and_move(gbatch):
+    """A sprite's corners follow its center and size"""
+    batch=gbatch.GSpriteBatch()
+    first=batch.add(10,20,4,6)
+    second=batch.add(100,50,2,2)
+    assert (first,second)==(0,1)
+    assert batch.count==2
+    assert corners(batch,0)==[(8,17),(12,17),(12,23),(8,23)]
+    batch.move(0,30,40)
+    assert corners(batch,0)==[(28,37),(32,37),(32,43),(28,43)]
+    batch.resize(1,10,4)
+    assert corners(batch,1)==[(95,48),(105,48),(105,52),(95,52)]
+    assert list(batch._indices)==[0,1,2,2,3,0,4,5,6,6,7,4]
+    assert [list(batch._vertices[2+4*k:4+4*k]) for k in range(4)]== \
+        [[0,0],[1,0],[1,1],[0,1]]
+
+
+def test_visibility(gbatch):
+    """A hidden sprite has no area and keeps its place"""
+    batch=gbatch.GSpriteBatch()
+    index=batch.add(10,20,4,6)
+    batch.set_visible(index,False)
+    assert not batch.is_visible(index)
+    assert corners(batch,index)==[(10,20)]*4
+    batch.move(index,50,60)
+    assert corners(batch,index)==[(50,60)]*4
+    batch.set_visible(index,True)
+    assert corners(batch,index)==[(48,57),(52,57),(52,63),(48,63)]
+
+
+def test_remove_reuses_index(gbatch):
+    """A removed sprite's index is given to the next sprite"""
+    batch=gbatch.GSpriteBatch()
+    for i in range(3):
+        batch.add(i,i,1,1)
+    batch.remove(1)
+    assert batch.count==2
+    assert corners(batch,1)==[(1,1)]*4
+    assert batch.add(7,7,2,2)==1
+    assert batch.count==3
+    assert batch.is_visible(1)
+    assert len(batch._indices)==18
+    batch.clear()
+    assert batch.count==0 and len(batch._vertices)==0
+    assert batch.add(0,0,1,1)==0
+
+
+def test_one_upload_per_frame(gbatch):
+    """The changes of a frame reach the mesh in one upload"""
+    batch=gbatch.GSpriteBatch()
+    mesh=batch._mesh
+    for i in range(50):
+        batch.add(i,i,1,1)
+    for i in range(50):
+        batch.move(i,i+1,i)
+    assert mesh.uploads==0
+    batch._trigger.fire()
+    assert mesh.uploads==2
+    assert mesh.vertices==list(batch._vertices)
+    assert mesh.indices==list(batch._indices)
+    batch.move(3,0,0)
+    batch.set_visible(4,False)
+    batch._trigger.fire()
+    assert mesh.uploads==3
+    batch._trigger.fire()
+    assert mesh.uploads==3
+
+
+def test_tint(gbatch):
+    """The fill color tints the whole batch, drawn before the mesh"""
+    batch=gbatch.GSpriteBatch(fillcolor=(1,0,0))
+    children=batch._cache.children
+    assert children.index(batch._fillcolor)<children.index(batch._mesh)
+    assert batch.fillcolor==[1,0,0,1.0]
+    plain=gbatch.GSpriteBatch()
+    assert plain._cache.children[plain._cache.children.index(plain._mesh)-1].rgba== \
+        [1,1,1,1.0]
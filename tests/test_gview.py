@@ -0,0 +1,113 @@
+"""
+Tests for the retained drawing mode of GView (game2d/gview.py)
+
+Kivy is replaced by the stand-ins in kivystub.py, so these tests check the
+instructions the view keeps, not what is drawn.
+"""
+import pytest
+from . import kivystub
+
+
+@pytest.fixture
+def game2d(monkeypatch):
+    """
+    Returns: a tuple (Shape,gview) of a GObject subclass with a drawing cache
+    and the game2d module gview, imported against the stand-ins for Kivy
+    """
+    gobject,gview=kivystub.load(monkeypatch,'gobject','gview')
+
+    class Shape(gobject.GObject):
+        """
+        A graphics object with nothing but the transforms in its cache; a
+        new fillcolor rebuilds the cache
+        """
+
+        def __init__(self,**keywords):
+            self._defined=False
+            gobject.GObject.__init__(self,**keywords)
+            self._reset()
+            self._defined=True
+
+    return Shape,gview
+
+
+def test_canvas_order(game2d):
+    """Attached objects are drawn before the objects drawn each frame"""
+    Shape,gview=game2d
+    view=gview.GView()
+    children=view.canvas.children
+    assert children.index(view._retained)<children.index(view._frame)
+    assert children[-1] is view._frame
+    view._reset()
+    children=view.canvas.children
+    assert children.index(view._retained)<children.index(view._frame)
+
+
+def test_attach_and_draw(game2d):
+    """Attached objects stay when the frame is cleared; drawn ones do not"""
+    Shape,gview=game2d
+    view=gview.GView()
+    first=Shape()
+    second=Shape()
+    drawn=Shape()
+    view.attach(first)
+    view.attach(second)
+    view.attach(first)
+    drawn.draw(view)
+    assert view._retained.children==[first._cache,second._cache]
+    assert view._frame.children==[drawn._cache]
+    assert view.is_attached(first) and not view.is_attached(drawn)
+    view.clear()
+    assert view._frame.children==[]
+    assert view._retained.children==[first._cache,second._cache]
+
+
+def test_detach(game2d):
+    """Detaching removes just that object, and does nothing if not attached"""
+    Shape,gview=game2d
+    view=gview.GView()
+    shapes=[Shape() for i in range(3)]
+    for shape in shapes:
+        view.attach(shape)
+    view.detach(shapes[1])
+    assert view._retained.children==[shapes[0]._cache,shapes[2]._cache]
+    assert not view.is_attached(shapes[1])
+    view.detach(shapes[1])
+    assert view._retained.children==[shapes[0]._cache,shapes[2]._cache]
+    view.attach(shapes[1])
+    assert view._retained.children[-1] is shapes[1]._cache
+
+
+def test_detach_all(game2d):
+    """detach_all empties the retained group and leaves the frame alone"""
+    Shape,gview=game2d
+    view=gview.GView()
+    shapes=[Shape() for i in range(3)]
+    for shape in shapes:
+        view.attach(shape)
+    drawn=Shape()
+    drawn.draw(view)
+    view.detach_all()
+    assert view._retained.children==[]
+    assert not any(view.is_attached(shape) for shape in shapes)
+    assert view._frame.children==[drawn._cache]
+    assert view._retained in view.canvas.children
+
+
+def test_sync_swaps_rebuilt_caches(game2d):
+    """A rebuilt cache takes the place of the old one at the end of a frame"""
+    Shape,gview=game2d
+    view=gview.GView()
+    shapes=[Shape() for i in range(3)]
+    for shape in shapes:
+        view.attach(shape)
+    old=shapes[1]._cache
+    shapes[1].x=40.0
+    view._sync()
+    assert view._retained.children[1] is old
+    shapes[1].fillcolor=(1,0,0)
+    assert shapes[1]._cache is not old
+    view._sync()
+    assert view._retained.children==[shape._cache for shape in shapes]
+    view.detach(shapes[1])
+    assert view._retained.children==[shapes[0]._cache,shapes[2]._cache]
@@ -0,0 +1,62 @@
+"""
+Tests for the debug history of a wave (history.py)
+"""
+from consts import *
+from config import *
+from sim import *
+from history import *
+from .test_sim import keys
+
+
+def recorded(history,sim,directions):
+    """
+    Returns: the checksum of sim after each of the directions, recording every
+    frame in history
+    """
+    sums=[]
+    for direction in directions:
+        sim.update(GAME_TIMESTEP,direction)
+        history.record(sim)
+        sums.append(sim.checksum())
+    return sums
+
+
+def test_seek():
+    """Seeking puts the wave back in the state saved on that frame"""
+    history=History(every=5)
+    sim=WaveSim(WaveConfig(),3)
+    sums=recorded(history,sim,keys(400,5))
+    assert len(history)==80
+    for index in (0,1,40,79):
+        frame=history.seek(sim,index)
+        assert frame==history.getEntryFrame(index)==5*index+1
+        assert sim.checksum()==sums[frame-1]
+    assert history.getCursor()==79
+
+
+def test_resume_plays_on():
+    """A wave resumed from the history plays out as it did the first time"""
+    directions=keys(600,6)
+    history=History()
+    sim=WaveSim(WaveConfig(),4)
+    sums=recorded(history,sim,directions)
+    frame=history.seek(sim,250)
+    history.resume()
+    assert len(history)==251
+    assert history.getFrame()==frame
+    again=recorded(history,sim,directions[frame:])
+    assert again==sums[frame:]
+    assert len(history)==600
+
+
+def test_budget():
+    """The oldest states are dropped to stay within the budget"""
+    history=History(budget=20000)
+    sim=WaveSim(WaveConfig(),8)
+    sums=recorded(history,sim,keys(1000,7))
+    assert history.getSize()<=20000
+    assert 0<len(history)<1000
+    assert history.getEntryFrame(len(history)-1)==1000
+    first=history.getEntryFrame(0)
+    history.seek(sim,0)
+    assert sim.checksum()==sums[first-1]
@@ -0,0 +1,110 @@
+"""
+Tests for input recordings (record.py) and replays (replay.py)
+"""
+import pytest
+from consts import *
+from config import *
+from record import *
+from replay import *
+from autopilot import fly
+
+
+def played(recording):
+    """
+    Returns: the checksum of the game after each frame of recording, replayed
+    """
+    session=Session(recording.getSeed(),recording.getConfig())
+    player=InputPlayer(recording)
+    input=player.getInput()
+    sums=[]
+    for frame in range(recording.getFrames()):
+        session.update(input,player.next())
+        sums.append(session.checksum())
+    return sums
+
+
+def test_round_trip(tmp_path):
+    """A saved recording loads back the same"""
+    recording=InputRecording(-12345,every=3,config=WaveConfig(3,4,0.5))
+    input=FakeInput()
+    for frame in range(100):
+        keys=('left','up') if frame%7<3 else ('s',) if frame%11==0 else ()
+        input.set(keys,len(keys)+(frame%13==0))
+        recording.record(input,GAME_TIMESTEP if frame<60 else 0.02)
+        recording.check(frame*2654435761%2**32)
+    path=str(tmp_path/'game.invr')
+    recording.save(path)
+    loaded=InputRecording.load(path)
+    assert loaded.getSeed()==-12345
+    assert loaded.getKeys()==recording.getKeys()
+    assert loaded.getEvery()==3
+    assert loaded.getConfig()==WaveConfig(3,4,0.5)
+    assert loaded.getChecksums()==recording.getChecksums()
+    assert len(loaded.getChecksums())==34
+    assert loaded.getRuns()==recording.getRuns()
+    assert list(loaded.frames())==list(recording.frames())
+    assert loaded.tobytes()==recording.tobytes()
+
+
+def test_player_keys():
+    """A player sets the recorded keys and key count on each frame"""
+    recording=InputRecording(1)
+    input=FakeInput()
+    for keys,count in (((),0),(('left',),1),(('left','up'),3),((),0)):
+        input.set(keys,count)
+        recording.record(input,GAME_TIMESTEP)
+    player=InputPlayer(recording)
+    seen=[]
+    while not player.isDone():
+        player.next()
+        seen.append((set(player.getInput().keys),player.getInput().key_count))
+    assert seen==[(set(),0),({'left'},1),({'left','up'},3),(set(),0)]
+    assert player.next(0.5)==0.5
+
+
+def test_bad_file():
+    """A file that is not a recording is rejected"""
+    with pytest.raises(ValueError):
+        InputRecording.frombytes(b'NOPE')
+    data=bytearray(InputRecording(1,config=WaveConfig(2,2)).tobytes())
+    with pytest.raises(ValueError):
+        InputRecording.frombytes(bytes(data[:-6]))
+
+
+def test_replay_matches_recording(tmp_path):
+    """A recorded game replays with the same checksum on every frame"""
+    recording=InputRecording(2024,every=1)
+    fly(1,2024,recording)
+    path=str(tmp_path/'game.invr')
+    recording.save(path)
+    loaded=InputRecording.load(path)
+    assert played(loaded)==list(loaded.getChecksums())
+    assert verify(loaded) is None
+
+
+def test_replay_uses_recorded_settings(tmp_path):
+    """A game recorded with other wave settings replays with them"""
+    config=WaveConfig(3,4,0.5)
+    recording=InputRecording(7,config=config)
+    fly(1,7,recording)
+    path=str(tmp_path/'game.invr')
+    recording.save(path)
+    loaded=InputRecording.load(path)
+    assert loaded.getConfig()==config
+    assert verify(loaded) is None
+    other=InputRecording.frombytes(loaded.tobytes())
+    other._config=WaveConfig()
+    assert verify(other) is not None
+
+
+def test_verify_finds_difference():
+    """verify returns the first checked frame that does not match"""
+    recording=InputRecording(99,every=60)
+    fly(1,99,recording)
+    assert verify(recording) is None
+    assert len(recording.getChecksums())==60
+    recording._sums[10]^=1
+    recording._sums[20]^=1
+    assert verify(recording)==600
+    assert lastGood(recording,600)==540
+    assert lastGood(recording,0) is None
@@ -0,0 +1,170 @@
+"""
+Tests for the PNG and GIF encoders of the offline renderer (render.py)
+"""
+import struct
+import zlib
+import numpy as np
+from consts import *
+from config import *
+from record import *
+import render
+from autopilot import fly
+
+
+def lzwDecode(data,size=8):
+    """
+    Returns: the palette indices in GIF LZW data with the given code size
+    """
+    clear=1<<size
+    end=clear+1
+    out=bytearray()
+    table=None
+    bits=size+1
+    buffer=0
+    count=0
+    prev=None
+    for byte in data:
+        buffer|=byte<<count
+        count+=8
+        while count>=bits:
+            code=buffer&((1<<bits)-1)
+            buffer>>=bits
+            count-=bits
+            if code==clear:
+                table=[bytes([i]) for i in range(clear)]+[b'',b'']
+                bits=size+1
+                prev=None
+                continue
+            if code==end:
+                return bytes(out)
+            if prev is None:
+                entry=table[code]
+            else:
+                entry=table[code] if code<len(table) else prev+prev[:1]
+                table.append(prev+entry[:1])
+            out+=entry
+            prev=entry
+            if len(table)==1<<bits and bits<12:
+                bits+=1
+    return bytes(out)
+
+
+def readGIF(data):
+    """
+    Returns: a tuple (width,height,frames) for an animated GIF, where frames
+    is a list of (left,top,indices,delay) for each frame
+    """
+    assert data[:6]==b'GIF89a'
+    width,height,flags=struct.unpack_from('<HHB',data,6)
+    pos=13+(3<<((flags&7)+1) if flags&0x80 else 0)
+    frames=[]
+    delay=None
+    while data[pos]!=0x3B:
+        kind=data[pos]
+        if kind==0x21:
+            label=data[pos+1]
+            if label==0xF9:
+                delay=struct.unpack_from('<H',data,pos+4)[0]
+            pos+=2
+            while data[pos]:
+                pos+=data[pos]+1
+            pos+=1
+        else:
+            assert kind==0x2C
+            left,top,w,h,flags=struct.unpack_from('<HHHHB',data,pos+1)
+            size=data[pos+10]
+            pos+=11
+            blocks=bytearray()
+            while data[pos]:
+                blocks+=data[pos+1:pos+1+data[pos]]
+                pos+=data[pos]+1
+            pos+=1
+            pixels=np.frombuffer(lzwDecode(bytes(blocks),size),dtype=np.uint8)
+            frames.append((left,top,pixels.reshape(h,w),delay))
+    return (width,height,frames)
+
+
+# PNG FILES
+def test_png_round_trip(tmp_path):
+    """An image written by encodePNG reads back the same"""
+    rng=np.random.default_rng(0)
+    for channels in (3,4):
+        image=rng.integers(0,256,(17,23,channels),dtype=np.uint8)
+        path=str(tmp_path/('image%d.png' % channels))
+        with open(path,'wb') as file:
+            file.write(render.encodePNG(image,6))
+        pixels=render.readPNG(path)
+        assert (pixels[:,:,:channels]==image).all()
+        assert channels==4 or (pixels[:,:,3]==255).all()
+
+
+def test_png_filters():
+    """Every PNG row filter is undone"""
+    rng=np.random.default_rng(1)
+    data=rng.integers(0,256,(12,9,3),dtype=np.uint8)
+    filters=np.array([0,1,2,3,4]*2+[4,3],dtype=np.uint8)
+    out=render._unfilter(filters,data).astype(int)
+    for r in range(12):
+        for c in range(9):
+            a=out[r,c-1] if c>0 else np.zeros(3,dtype=int)
+            b=out[r-1,c] if r>0 else np.zeros(3,dtype=int)
+            d=out[r-1,c-1] if r>0 and c>0 else np.zeros(3,dtype=int)
+            p=a+b-d
+            paeth=np.where((abs(p-a)<=abs(p-b))&(abs(p-a)<=abs(p-d)),a,
+                           np.where(abs(p-b)<=abs(p-d),b,d))
+            guess=[0,a,b,(a+b)//2,paeth][filters[r]]
+            assert ((out[r,c]-guess)%256==data[r,c]).all(), (r,c)
+
+
+def test_palette_png(tmp_path):
+    """A palette PNG with sub-byte pixels and transparency reads as RGBA"""
+    rng=np.random.default_rng(2)
+    indices=rng.integers(0,4,(5,11),dtype=np.uint8)
+    packed=np.zeros((5,3),dtype=np.uint8)
+    for x in range(11):
+        packed[:,x//4]|=indices[:,x]<<(6-2*(x%4))
+    raw=b''.join(b'\x00'+row.tobytes() for row in packed)
+    palette=bytes([255,0,0, 0,255,0, 0,0,255, 9,9,9])
+    data=(b'\x89PNG\r\n\x1a\n'+
+          render._chunk(b'IHDR',struct.pack('>IIBBBBB',11,5,2,3,0,0,0))+
+          render._chunk(b'PLTE',palette)+render._chunk(b'tRNS',b'\x80')+
+          render._chunk(b'IDAT',zlib.compress(raw))+render._chunk(b'IEND',b''))
+    path=str(tmp_path/'palette.png')
+    with open(path,'wb') as file:
+        file.write(data)
+    pixels=render.readPNG(path)
+    colors=np.array([[255,0,0,128],[0,255,0,255],[0,0,255,255],[9,9,9,255]],
+                    dtype=np.uint8)
+    assert (pixels==colors[indices]).all()
+
+
+# GIF FILES
+def test_gif_frame_round_trip():
+    """The LZW data of a GIF frame decodes to its pixels"""
+    rng=np.random.default_rng(3)
+    for shape in ((1,1),(40,70),(200,300)):
+        indices=rng.integers(0,256,shape,dtype=np.uint8)
+        indices[:shape[0]//2]=7
+        data=render.gifHeader(shape[1],shape[0])+render.gifFrame(indices,0,0,4)+b';'
+        width,height,frames=readGIF(data)
+        assert (width,height)==(shape[1],shape[0])
+        assert len(frames)==1
+        left,top,pixels,delay=frames[0]
+        assert (left,top,delay)==(0,0,4)
+        assert (pixels==indices).all()
+
+
+def test_gif_timing(tmp_path):
+    """A rendered GIF lasts as long as the frames it was drawn from"""
+    recording=InputRecording(5,config=WaveConfig(2,3))
+    fly(0.1,5,recording)
+    for every in (1,2,3):
+        path=str(tmp_path/('game%d.gif' % every))
+        count=render.render(recording,'gif',path,stop=240,every=every,
+                            workers=2,chunk=7,shrink=8)
+        with open(path,'rb') as file:
+            width,height,frames=readGIF(file.read())
+        assert len(frames)==count
+        assert all(delay>=GIF_TICK for left,top,pixels,delay in frames)
+        assert abs(sum(frame[3] for frame in frames)-100*240*GAME_TIMESTEP)<GIF_TICK
+        assert frames[0][2].shape==(height,width)
@@ -0,0 +1,62 @@
+"""
+Tests for the parallel episode runner (runner.py) against single waves (env.py)
+"""
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from consts import *
+from env import *
+from runner import *
+
+
+def test_runner_matches_env():
+    """The shared buffers of the workers hold what single waves return
+
+    The aliens are too slow to ever step, so they never fire and the random
+    numbers of the workers do not matter.  The ships sweep back and forth
+    firing, at a different pace in each wave, and the waves are small enough
+    that they kill every alien, so finished waves are restarted as well.
+    """
+    specs=[{'waves':2,'rows':1,'cols':3,'speed':1000.0},
+           {'waves':3,'rows':1,'cols':2,'speed':1000.0,'seed':9}]
+    with EpisodeRunner(specs) as runner:
+        envs=[]
+        for i in range(runner.getWorkers()):
+            spec=runner.getSpec(i)
+            waves=[InvadersEnv(spec['speed'],spec['rows'],spec['cols'])
+                   for k in range(spec['waves'])]
+            for k in range(spec['waves']):
+                assert np.allclose(waves[k].reset(),runner.getObservations(i)[k])
+            envs.append(waves)
+        ends=0
+        for frame in range(500):
+            actions=[[ACTION_LEFT_FIRE if frame//(100+20*i+10*k)%2==0 else
+                      ACTION_RIGHT_FIRE for k in range(len(waves))]
+                     for i,waves in enumerate(envs)]
+            for i in range(runner.getWorkers()):
+                runner.getActions(i)[:]=actions[i]
+            runner.step()
+            for i,waves in enumerate(envs):
+                for k,env in enumerate(waves):
+                    obs,reward,done,info=env.step(actions[i][k])
+                    if done:
+                        obs=env.reset()
+                        ends+=1
+                    assert reward==runner.getRewards(i)[k], (i,k,frame)
+                    assert done==runner.getDones(i)[k], (i,k,frame)
+                    assert np.allclose(obs,runner.getObservations(i)[k]), (i,k,frame)
+        assert ends>0
+
+
+def test_runner_frees_memory():
+    """Closing a runner stops its workers and unlinks its shared memory"""
+    runner=EpisodeRunner(2)
+    names=[memory.name for memory in runner._memory]
+    workers=list(runner._workers)
+    runner.step()
+    runner.close()
+    assert not any(worker.is_alive() for worker in workers)
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+    runner.close()
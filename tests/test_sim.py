@@ -0,0 +1,244 @@
+"""
+Tests for the headless wave (sim.py)
+"""
+import random
+import subprocess
+import sys
+from consts import *
+from config import *
+from sim import *
+from collide import swept_aabb
+from .conftest import GAME_FOLDER
+
+
+def keys(count,seed=1):
+    """
+    Returns: a list of count directions, changing every few frames
+    """
+    rng=random.Random(seed)
+    result=[]
+    while len(result)<count:
+        result.extend([rng.choice(('','left','right','up'))]*rng.randint(1,20))
+    return result[:count]
+
+
+def play(sim,directions):
+    """
+    Returns: the checksum of sim after each of the directions
+    """
+    sums=[]
+    for direction in directions:
+        sim.update(GAME_TIMESTEP,direction)
+        sums.append(sim.checksum())
+    return sums
+
+
+def aim(sim,col):
+    """
+    Moves the ship of sim under the column col of its aliens
+    """
+    sim.resetShip(float(sim.getAliens().getX()[0,col]))
+
+
+# RULES
+def test_same_seed_same_game():
+    """A wave with the same seed and input plays out the same"""
+    directions=keys(3000)
+    first=play(WaveSim(WaveConfig(),42),directions)
+    second=play(WaveSim(WaveConfig(),42),directions)
+    assert first==second
+    assert first!=play(WaveSim(WaveConfig(),43),directions)
+
+
+def test_aliens_march_and_turn():
+    """The aliens step once per alien speed, and drop and turn at the edge"""
+    sim=WaveSim(WaveConfig(2,3,speed=0.5),1)
+    xs=sim.getAliens().getX().copy()
+    sim.update(0.25)
+    assert (sim.getAliens().getX()==xs).all()
+    sim.update(0.3)
+    assert (sim.getAliens().getX()==xs+ALIEN_H_WALK).all()
+    ys=sim.getAliens().getY().copy()
+    for frame in range(1000):
+        if sim.getAlienDirection()=='left':
+            break
+        sim.update(0.6)
+    assert sim.getAlienDirection()=='left'
+    assert (sim.getAliens().getY()==ys-ALIEN_V_SEP).all()
+    assert GAME_WIDTH-sim.getAliens().right()<=ALIEN_H_SEP
+
+
+def test_one_player_bolt():
+    """The ship only fires when it has no bolt on screen"""
+    sim=WaveSim(WaveConfig(),1)
+    assert sim.update(GAME_TIMESTEP,'up') & EVENT_SHIP_FIRED
+    assert not sim.update(GAME_TIMESTEP,'up') & EVENT_SHIP_FIRED
+    assert len(sim.getBolts())-len(sim.getBolts().getAliens())==1
+
+
+def test_killing_every_alien_wins():
+    """The wave is won when every alien is killed"""
+    sim=WaveSim(WaveConfig(1,1,speed=100.0),1)
+    aim(sim,0)
+    events=0
+    for frame in range(200):
+        events|=sim.update(GAME_TIMESTEP,'up')
+        if sim.getWaveComplete()!=NOT_COMPLETE:
+            break
+    assert events & EVENT_ALIEN_HIT
+    assert sim.getAliens().count()==0
+    assert sim.getWaveComplete()==ALIENS_KILLED
+
+
+def test_ship_hit_loses_a_life():
+    """An alien bolt that reaches the ship destroys it and takes a life"""
+    sim=WaveSim(WaveConfig(),1)
+    bolt=sim.getBolts().spawn(sim.getShip().x,sim.getShip().top+BOLT_HEIGHT,'down')
+    sim._register(bolt)
+    assert sim.getLastHitX() is None
+    events=0
+    for frame in range(10):
+        x=sim.getShip().x
+        events|=sim.update(GAME_TIMESTEP,'right')
+        if sim.getShip() is None:
+            break
+    assert events & EVENT_SHIP_HIT
+    assert sim.getShip() is None
+    assert sim.getLastHitX()==x+SHIP_MOVEMENT
+    assert sim.getLives()==SHIP_LIVES-1
+    assert bolt not in sim.getBolts()
+
+
+def test_aliens_crossing_the_line_lose():
+    """The wave is lost when the aliens reach the defense line"""
+    sim=WaveSim(WaveConfig(10,15,speed=0.01,boltRate=10**9),1)
+    for frame in range(100000):
+        if sim.getWaveComplete()!=NOT_COMPLETE:
+            break
+        sim.update(0.02)
+    assert sim.getWaveComplete()==DLINE_CROSSED
+    assert sim.getAliens().crossed(DEFENSE_LINE)
+    assert sim.getLives()==SHIP_LIVES
+
+
+def test_no_graphics_imported():
+    """Importing the wave imports neither game2d nor Kivy"""
+    code='import sys; import sim; print(sorted(set(sys.modules)&{"game2d","kivy"}))'
+    out=subprocess.run([sys.executable,'-c',code],cwd=GAME_FOLDER,
+                       capture_output=True,text=True,check=True)
+    assert out.stdout.strip()=='[]'
+
+
+# SWEPT COLLISIONS
+def test_swept_aabb():
+    """A box moving through a target overlaps it on the way"""
+    target=(0,10,10,20)
+    assert swept_aabb((2,0,4,5),0,30,target)==0.25/1.5
+    assert swept_aabb((2,0,4,5),0,4,target) is None
+    assert swept_aabb((20,0,24,5),0,30,target) is None
+    assert swept_aabb((2,12,4,14),0,30,target)==0.0
+    assert swept_aabb((2,0,4,5),0,5,target) is None
+
+
+def test_fast_bolt_hits_what_it_passes():
+    """A bolt moving more than an alien's height in a frame still hits it"""
+    speed=3*ALIEN_HEIGHT
+    sim=WaveSim(WaveConfig(3,4,speed=100.0,boltSpeed=speed),1)
+    aim(sim,2)
+    bottom=sim.getAliens().bottomRow(2)
+    events=0
+    for frame in range(50):
+        events=sim.update(GAME_TIMESTEP,'up' if frame==0 else '')
+        if events & EVENT_ALIEN_HIT:
+            break
+    assert events & EVENT_ALIEN_HIT
+    alive=sim.getAliens().getAlive()
+    assert not alive[bottom,2]
+    assert alive.sum()==3*4-1
+    assert sim.getBolts().getPlayer() is None
+
+
+def test_fast_bolt_hits_the_first_alien():
+    """A bolt that passes over two aliens in a frame kills the nearer one"""
+    speed=GAME_HEIGHT
+    sim=WaveSim(WaveConfig(3,4,speed=100.0,boltSpeed=speed),1)
+    aim(sim,1)
+    sim.update(GAME_TIMESTEP,'up')
+    alive=sim.getAliens().getAlive()
+    ys=sim.getAliens().getY()
+    assert alive.sum()==3*4-1
+    assert not alive[ys[:,1].argmin(),1]
+
+
+# BOLT REGISTRY
+def test_registry_swap_remove():
+    """Removing an alien bolt moves the last bolt into its slot"""
+    bolts=BoltRegistry()
+    made=[bolts.spawn(i,100,'down') for i in range(4)]
+    assert [b.getSlot() for b in made]==[0,1,2,3]
+    bolts.remove(made[1])
+    assert bolts.getAliens()==[made[0],made[3],made[2]]
+    assert made[3].getSlot()==1
+    assert made[1].getSlot()==-1
+    assert made[1] not in bolts
+    bolts.remove(made[2])
+    assert bolts.getAliens()==[made[0],made[3]]
+    assert all(b.getSlot()==i for i,b in enumerate(bolts.getAliens()))
+
+
+def test_registry_player_and_reuse():
+    """The player bolt is kept apart, and removed bolts are reused"""
+    bolts=BoltRegistry()
+    player=bolts.spawn(5,5,'up')
+    alien=bolts.spawn(6,6,'down')
+    assert bolts.getPlayer() is player
+    assert list(bolts)==[player,alien]
+    assert len(bolts)==2
+    bolts.remove(player)
+    assert bolts.getPlayer() is None
+    again=bolts.spawn(7,7,'down')
+    assert again is player
+    assert again.getVel()<0 and again.x==7
+    bolts.clear()
+    assert len(bolts)==0
+
+
+# SAVING AND RESTORING
+def test_snapshot_restore():
+    """A wave restored to a snapshot plays out as it did from there"""
+    directions=keys(1200,2)
+    sim=WaveSim(WaveConfig(),7)
+    play(sim,directions[:600])
+    state=sim.snapshot()
+    first=play(sim,directions[600:])
+    sim.restore(state)
+    assert play(sim,directions[600:])==first
+    sim.restore(state)
+    assert play(sim,directions[600:])==first
+
+
+def test_pack_unpack():
+    """A wave unpacked from pack is the same as the wave packed"""
+    directions=keys(1500,3)
+    sim=WaveSim(WaveConfig(),9)
+    for count in (0,1,200,700):
+        play(sim,directions[:count])
+        data=sim.pack()
+        other=WaveSim(WaveConfig(),0)
+        other.unpack(data)
+        other.setRandomState(sim.getRandomState())
+        assert other.pack()==data
+        assert other.checksum()==sim.checksum()
+        assert play(other,directions[700:])==play(sim.clone(),directions[700:])
+
+
+def test_clone():
+    """A clone plays out the same without changing the original"""
+    directions=keys(900,4)
+    sim=WaveSim(WaveConfig(),11)
+    play(sim,directions[:300])
+    before=sim.checksum()
+    copy=sim.clone()
+    first=play(copy,directions[300:])
+    assert sim.checksum()==before
+    assert play(sim,directions[300:])==first